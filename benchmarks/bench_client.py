@@ -0,0 +1,208 @@
+"""
+Throughput, latency and memory benchmarks for the Compute Studio clients.
+
+Runs ``cs_kit.mock_server`` in a subprocess, so that the server's work and
+memory do not show up in the measurements, and exercises ``create``,
+``detail``, ``results`` and ``CSFileSystem._open`` for ``--sims``
+simulations on ``--concurrency`` threads:
+
+.. code-block:: bash
+
+    python benchmarks/bench_client.py --sims 200 --concurrency 16 \\
+        --latency 0.01 --payload-size 1000000
+
+For every operation the report lists the HTTP requests per second, the p50
+and p95 latency of one call and the peak Python heap size while the
+operation ran. Pass ``--host`` to benchmark against an already running
+server instead.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from cs_kit import ComputeStudio, MetricsCollector, PollingPolicy
+from cs_kit.filespec import CSFileSystem
+
+OPERATIONS = ("create", "detail", "results", "open")
+
+
+def start_server(args):
+    cmd = [
+        sys.executable,
+        "-m",
+        "cs_kit.mock_server",
+        "--port",
+        "0",
+        "--latency",
+        str(args.latency),
+    ]
+    if args.payload_size is not None:
+        cmd += ["--payload-size", str(args.payload_size)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    url = proc.stdout.readline().strip()
+    if not url:
+        proc.kill()
+        raise RuntimeError("The mock server did not start.")
+    return proc, url
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def measure(name, func, items, concurrency, metrics):
+    """
+    Call ``func`` on every item and summarize the calls. Tracing memory
+    slows down every allocation, so the calls are timed first and then made
+    again to measure the peak memory.
+    """
+    latencies = []
+
+    def timed(item):
+        start = time.perf_counter()
+        result = func(item)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    before = sum(metrics.to_dict()["requests_total"].values())
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(timed, items))
+    elapsed = time.perf_counter() - start
+    requests = sum(metrics.to_dict()["requests_total"].values()) - before
+
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(func, items))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    report = {
+        "operation": name,
+        "calls": len(items),
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "peak_memory_mb": round(peak / 2**20, 2),
+    }
+    return report, results
+
+
+def run(args, host):
+    metrics = MetricsCollector()
+    client = ComputeStudio(
+        "PSLmodels",
+        "Tax-Brain",
+        api_token="benchmark",
+        host=host,
+        pool_maxsize=args.concurrency,
+        polling_policy=PollingPolicy.fixed(args.poll_interval),
+        hooks=[metrics],
+    )
+    operations = args.operations or OPERATIONS
+    reports = []
+    try:
+        report, sims = measure(
+            "create",
+            lambda i: client.create({"section": {"param": [{"value": i % 4}]}}),
+            list(range(args.sims)),
+            args.concurrency,
+            metrics,
+        )
+        if "create" in operations:
+            reports.append(report)
+        model_pks = [sim["model_pk"] for sim in sims]
+
+        if "detail" in operations:
+            report, _ = measure(
+                "detail", client.detail, model_pks, args.concurrency, metrics
+            )
+            reports.append(report)
+        if "results" in operations:
+            report, _ = measure(
+                "results", client.results, model_pks, args.concurrency, metrics
+            )
+            reports.append(report)
+        if "open" in operations:
+            # CSFileSystem does not use the client's session; count its
+            # requests from the number of calls.
+            def open_outputs(model_pk):
+                fs = CSFileSystem(
+                    "PSLmodels",
+                    "Tax-Brain",
+                    api_token="benchmark",
+                    host=host,
+                    skip_instance_cache=True,
+                )
+                with fs._open(f"{model_pk}/outputs") as f:
+                    return len(f.read())
+
+            report, _ = measure(
+                "CSFileSystem._open", open_outputs, model_pks, args.concurrency, metrics
+            )
+            report["requests"] = len(model_pks)
+            report["requests_per_sec"] = round(len(model_pks) / report["seconds"], 1)
+            reports.append(report)
+    finally:
+        client.close()
+    return reports
+
+
+def print_table(reports):
+    columns = list(reports[0])
+    widths = [
+        max(len(col), *(len(str(report[col])) for report in reports)) for col in columns
+    ]
+    print("  ".join(col.ljust(width) for col, width in zip(columns, widths)))
+    for report in reports:
+        print(
+            "  ".join(
+                str(report[col]).ljust(width) for col, width in zip(columns, widths)
+            )
+        )
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sims", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=None)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument(
+        "--operations", nargs="+", choices=OPERATIONS, help="Defaults to all."
+    )
+    parser.add_argument("--host", help="Use a running server instead.")
+    parser.add_argument("--json", action="store_true", help="Print JSON lines.")
+    args = parser.parse_args(args)
+
+    proc = None
+    host = args.host
+    if host is None:
+        proc, host = start_server(args)
+    try:
+        reports = run(args, host)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    if args.json:
+        for report in reports:
+            print(json.dumps(report))
+    else:
+        print_table(reports)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Time and memory of reads from ``CSFileSystem`` on multi-MB documents.
+
+Runs ``cs_kit.mock_server`` in a subprocess, creates a simulation whose
+adjustment and outputs are about ``--payload-size`` bytes each and reads
+paths of its tree in two ways:
+
+- ``reencode``: the previous read path, which decodes the response with
+  ``json``, picks the value at the path and encodes it again into a
+  ``MemoryFile``. Responses of the inputs are decoded once more to tell
+  whether they can be cached for good.
+- ``fast``: ``CSFileSystem.open``, which passes whole documents through,
+  uses orjson, if it is installed, for the others and decodes each
+  response at most once.
+
+.. code-block:: bash
+
+    python benchmarks/bench_filespec.py --payload-size 8000000 --repeat 10
+
+Every path is read with a warm cache, which only measures the work done on
+the client, and with an empty cache, where each read downloads the
+response again. For every read the report lists the median time of
+``--repeat`` reads and the peak Python heap size while it ran.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from fsspec.implementations.memory import MemoryFile
+
+from bench_client import print_table, start_server
+from cs_kit import ComputeStudio
+from cs_kit.filespec import ENDPOINTS, CSFileSystem, orjson
+from cs_kit.instrumentation import TERMINAL_STATUSES
+
+PATHS = ("inputs", "inputs/adjustment", "outputs")
+
+
+def make_adjustment(payload_size):
+    """An adjustment of about ``payload_size`` bytes of JSON."""
+    param = {"value": 0.123456789, "year": 2020, "MARS": "single"}
+    n = max(payload_size // (len(json.dumps(param)) + 16), 1)
+    return {"policy": {f"param_{i:07d}": [param] for i in range(n)}}
+
+
+def reencode(fs, path):
+    model_pk, parts = fs._parse(path)
+    docs = {}
+
+    def load(resource):
+        endpoint = ENDPOINTS[resource]
+        if endpoint not in docs:
+            key = (model_pk, endpoint)
+            body = fs.cache.get(key)
+            if body is None:
+                r = fs.session.get(fs.sim_url(model_pk) + endpoint)
+                body = r.content
+                if endpoint == "edit/":
+                    final = json.loads(body).get("status") in TERMINAL_STATUSES
+                else:
+                    final = r.status_code == 200
+                fs.cache.set(key, body, final=final)
+            docs[endpoint] = json.loads(body)
+        return docs[endpoint]
+
+    tree = fs._tree(model_pk)
+    tree.load = load
+    data = json.dumps(tree.value(parts, path)).encode("utf-8")
+    with MemoryFile(None, None, data) as f:
+        return f.read()
+
+
+def fast(fs, path):
+    with fs.open(path) as f:
+        return f.read()
+
+
+def measure(method, func, fs, path, repeat, cached):
+    def read():
+        if not cached:
+            fs.cache.clear()
+        return func(fs, path)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(read())
+        times.append(time.perf_counter() - start)
+    # Tracing slows down the reads, so the memory is measured separately.
+    tracemalloc.start()
+    read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "path": path,
+        "cache": "warm" if cached else "empty",
+        "method": method,
+        "bytes": size,
+        "median_ms": round(statistics.median(times) * 1000, 2),
+        "peak_memory_mb": round(peak / 2**20, 2),
+    }
+
+
+def run(args, host):
+    client = ComputeStudio("PSLmodels", "Tax-Brain", api_token="benchmark", host=host)
+    try:
+        sim = client.create(make_adjustment(args.payload_size), wait=False)
+        model_pk = sim.model_pk
+        client.results(model_pk)
+    finally:
+        client.close()
+    fs = CSFileSystem(
+        "PSLmodels", "Tax-Brain", host=host, api_token="benchmark", model_pk=model_pk
+    )
+    for path in PATHS:
+        # Download and cache the documents.
+        fs.cat_file(path)
+
+    reports = []
+    for cached in (True, False):
+        for path in PATHS:
+            before = measure("reencode", reencode, fs, path, args.repeat, cached)
+            after = measure("fast", fast, fs, path, args.repeat, cached)
+            for report in (before, after):
+                speedup = before["median_ms"] / report["median_ms"]
+                report["speedup"] = round(speedup, 1)
+            reports += [before, after]
+    return reports
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--payload-size", type=int, default=4_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print JSON lines.")
+    args = parser.parse_args(args)
+    # start_server reads the latency from the arguments.
+    args.latency = 0.0
+
+    proc, host = start_server(args)
+    try:
+        reports = run(args, host)
+    finally:
+        proc.terminate()
+        proc.wait()
+    if args.json:
+        for report in reports:
+            print(json.dumps(report))
+    else:
+        print(f"JSON codec: {'orjson' if orjson is not None else 'json'}")
+        print_table(reports)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,83 @@
-from .api import ComputeStudio
+"""
+Submodules are imported the first time one of their names is used (PEP 562)
+so that ``import cs_kit`` and the ``csk`` CLI do not pay for loading pandas,
+paramtools, cs-storage, fsspec and aiohttp until they are needed.
+"""
+
+import importlib
+import sys
+from typing import TYPE_CHECKING
+
 from .exceptions import CSKitException, CSKitError, SerializationError, APIException
-from .schemas import Parameters, ErrorsWarnings
-from .validate import CoreTestFunctions
-from .filespec import CSFileSystem
+
+if TYPE_CHECKING:
+    from .api import ComputeStudio, Simulation
+    from .async_api import AsyncComputeStudio
+    from .schemas import Parameters, ErrorsWarnings
+    from .validate import CoreTestFunctions
+    from .filespec import CSFileSystem
+    from .async_filespec import AsyncCSFileSystem
+    from .polling import PollingPolicy
+    from .batch import BatchResult
+    from .monitor import SimulationMonitor
+    from .cache import InputsCache, ResultCache
+    from .submissions import JobJournal, SubmissionIndex
+    from .instrumentation import MetricsCollector, RequestEvent, StateChangeEvent
+    from .compare import ResultComparison
+    from .hedging import HedgingPolicy
+    from .ratelimit import FileTokenBucket, RateLimiter, TokenBucket
 
 __version__ = "1.16.9"
 
+_LAZY = {
+    "ComputeStudio": "api",
+    "Simulation": "api",
+    "AsyncComputeStudio": "async_api",
+    "Parameters": "schemas",
+    "ErrorsWarnings": "schemas",
+    "CoreTestFunctions": "validate",
+    "CSFileSystem": "filespec",
+    "AsyncCSFileSystem": "async_filespec",
+    "PollingPolicy": "polling",
+    "BatchResult": "batch",
+    "SimulationMonitor": "monitor",
+    "ResultCache": "cache",
+    "InputsCache": "cache",
+    "SubmissionIndex": "submissions",
+    "JobJournal": "submissions",
+    "MetricsCollector": "instrumentation",
+    "RequestEvent": "instrumentation",
+    "StateChangeEvent": "instrumentation",
+    "ResultComparison": "compare",
+    "HedgingPolicy": "hedging",
+    "RateLimiter": "ratelimit",
+    "TokenBucket": "ratelimit",
+    "FileTokenBucket": "ratelimit",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+# "cs://" and "cs-async://" URLs are served by CSFileSystem and
+# AsyncCSFileSystem. Installed copies of cs-kit register them through the
+# fsspec.specs entry point; if fsspec is already loaded, also register them
+# here by name, which does not import the filesystem modules.
+if "fsspec" in sys.modules:
+    from fsspec.registry import register_implementation
+
+    register_implementation("cs", "cs_kit.filespec.CSFileSystem")
+    register_implementation("cs-async", "cs_kit.async_filespec.AsyncCSFileSystem")
+
 
 __all__ = [
     "CSKitError",
@@ -14,9 +86,27 @@ __all__ = [
     "ErrorsWarnings",
     "CoreTestFunctions",
     "ComputeStudio",
+    "AsyncComputeStudio",
+    "Simulation",
     "CSKitException",
     "CSKitError",
     "SerializationError",
     "APIException",
     "CSFileSystem",
+    "AsyncCSFileSystem",
+    "PollingPolicy",
+    "BatchResult",
+    "SimulationMonitor",
+    "ResultCache",
+    "InputsCache",
+    "SubmissionIndex",
+    "JobJournal",
+    "MetricsCollector",
+    "RequestEvent",
+    "StateChangeEvent",
+    "ResultComparison",
+    "HedgingPolicy",
+    "RateLimiter",
+    "TokenBucket",
+    "FileTokenBucket",
 ]
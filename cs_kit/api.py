@@ -1,18 +1,30 @@
-from io import StringIO
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+import threading
 import time
-from typing import Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import os
-import warnings
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-try:
-    import pandas as pd
-except ImportError as ie:
-    pd = None
-
+from cs_kit.batch import BatchPoller, BatchResult
+from cs_kit.cache import InputsCache, ResultCache
 from cs_kit.exceptions import APIException
+from cs_kit.hedging import HedgingPolicy
+from cs_kit.instrumentation import Hook, HookDispatcher, RequestEvent, url_template
+from cs_kit.monitor import SimulationMonitor
+from cs_kit.outputs import Outputs
+from cs_kit.polling import PollingPolicy, parse_retry_after
+from cs_kit.ratelimit import RateLimiter
+from cs_kit.streaming import csv_to_parquet, iter_downloadable
+from cs_kit.submissions import JobJournal, SubmissionIndex, submission_key
+
+# Statuses that indicate a transient problem on the server or load balancer.
+RETRY_STATUSES = (500, 502, 503, 504)
+# Statuses of simulations that create(dedupe=True) submits again.
+FAILED_STATUSES = ("FAIL", "WORKER_FAILURE")
 
 
 class ComputeStudio:
@@ -34,19 +46,216 @@ class ComputeStudio:
     you can save it in a file named ``.cs_api_token`` in the home directory of your
     computer. You can also set it as an environment variable or pass it directly
     to the ``ComputeStudio`` class.
+
+    All requests go through a single pooled ``requests.Session``, so connections
+    are kept alive between calls. Idempotent requests (``GET``, ``PUT``) are
+    retried on connection errors and on 500, 502, 503 and 504 responses; the
+    ``POST`` in ``create`` is only retried when the connection could not be
+    established. The session's headers are fixed at construction and
+    urllib3's connection pool is thread-safe, so one client instance can be
+    shared by many worker threads. Set ``pool_maxsize`` to at least the
+    number of threads that use the client at the same time.
+
+    To stay under the server's request quota, pass a
+    :class:`~cs_kit.ratelimit.RateLimiter`. Its buckets can be shared by
+    several clients, and a :class:`~cs_kit.ratelimit.FileTokenBucket` by
+    several processes. To cut the tail latency of status polls and result
+    downloads, pass a :class:`~cs_kit.hedging.HedgingPolicy`.
+
+    .. code-block:: python
+
+        with ComputeStudio("PSLmodels", "TaxBrain", pool_maxsize=32) as client:
+            with ThreadPoolExecutor(32) as pool:
+                details = list(pool.map(client.detail, model_pks))
     """
 
     host = "https://compute.studio"
 
-    def __init__(self, owner: str, title: str, api_token: Optional[str] = None):
+    def __init__(
+        self,
+        owner: str,
+        title: str,
+        api_token: Optional[str] = None,
+        pool_maxsize: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        polling_policy: Optional[PollingPolicy] = None,
+        result_cache: Optional[ResultCache] = None,
+        inputs_cache: Optional[InputsCache] = None,
+        submission_index: Optional[SubmissionIndex] = None,
+        journal: Optional[JobJournal] = None,
+        app_version: Optional[str] = None,
+        hooks: Optional[List[Hook]] = None,
+        host: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        hedging: Optional[HedgingPolicy] = None,
+    ):
         self.owner = owner
         self.title = title
+        self.host = self.get_host(host)
         api_token = self.get_token(api_token)
         self.auth_header = {"Authorization": f"Token {api_token}"}
         self.sim_url = f"{self.host}/{owner}/{title}/api/v1/"
         self.inputs_url = f"{self.host}/{owner}/{title}/api/v1/inputs/"
+        self.pool_maxsize = pool_maxsize
+        self.polling_policy = polling_policy or PollingPolicy()
+        self.result_cache = result_cache
+        self.inputs_cache = inputs_cache
+        self.submission_index = submission_index
+        self.journal = journal
+        self.app_version = app_version
+        self.events = HookDispatcher(hooks)
+        self.rate_limiter = rate_limiter
+        self.hedging = hedging
+        self.session = self._build_session(pool_maxsize, max_retries, backoff_factor)
+        self._executor = None
+        self._monitor = None
+        self._executor_lock = threading.Lock()
 
-    def create(self, adjustment: dict = None, meta_parameters: dict = None):
+    def _build_session(
+        self, pool_maxsize: int, max_retries: int, backoff_factor: float
+    ) -> requests.Session:
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "PUT"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        session = requests.Session()
+        session.headers.update(self.auth_header)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if self.rate_limiter is None and self.hedging is None and not self.events:
+            return self.session.request(method, url, **kwargs)
+        template, model_pk = url_template(self.sim_url, url)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(method, template)
+        start = time.perf_counter()
+        hedged = hedge_won = False
+        try:
+            if self.hedging is not None and self.hedging.applies(method, template):
+                resp, hedged, hedge_won = self.hedging.call(
+                    template,
+                    lambda hedge: self._send(method, url, template, hedge, **kwargs),
+                    discard=requests.Response.close,
+                )
+            else:
+                resp = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            if self.events:
+                latency = time.perf_counter() - start
+                self.events.emit(
+                    RequestEvent(
+                        method, template, None, latency, 0, 1, model_pk, e, hedged
+                    )
+                )
+            raise
+        if not self.events:
+            return resp
+        latency = time.perf_counter() - start
+        if kwargs.get("stream"):
+            nbytes = int(resp.headers.get("Content-Length", 0))
+        else:
+            nbytes = len(resp.content)
+        retries = getattr(resp.raw, "retries", None)
+        attempt = len(retries.history) + 1 if retries is not None else 1
+        self.events.emit(
+            RequestEvent(
+                method,
+                template,
+                resp.status_code,
+                latency,
+                nbytes,
+                attempt,
+                model_pk,
+                hedged=hedged,
+                hedge_won=hedge_won,
+            )
+        )
+        return resp
+
+    def _send(
+        self, method: str, url: str, template: str, hedge: bool, **kwargs
+    ) -> requests.Response:
+        if hedge and self.rate_limiter is not None:
+            self.rate_limiter.acquire(method, template)
+        return self.session.request(method, url, **kwargs)
+
+    def _observe(self, model_pk: int, stage: str, data):
+        """Report the status in ``data`` to the hooks."""
+        if self.events and isinstance(data, dict):
+            self.events.state(model_pk, stage, data.get("status"))
+
+    def add_hook(self, hook: Hook):
+        """
+        Register a callable that receives a :class:`RequestEvent` after every
+        HTTP request and a :class:`StateChangeEvent` whenever a new simulation
+        status is observed.
+        """
+        self.events.hooks.append(hook)
+
+    def _get_polling_policy(
+        self,
+        polling_interval: Optional[float] = None,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> PollingPolicy:
+        if polling_policy is not None:
+            return polling_policy
+        elif polling_interval is not None:
+            return PollingPolicy.fixed(polling_interval)
+        return self.polling_policy
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool used to back :meth:`Simulation.future`."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.pool_maxsize)
+            return self._executor
+
+    @property
+    def monitor(self) -> SimulationMonitor:
+        """
+        :class:`SimulationMonitor` shared by this client that watches
+        simulations from one background thread.
+        """
+        with self._executor_lock:
+            if self._monitor is None:
+                self._monitor = SimulationMonitor(self)
+            return self._monitor
+
+    def close(self):
+        """Close the pooled connections held by this client."""
+        if self._monitor is not None:
+            self._monitor.close()
+            self._monitor = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self.hedging is not None:
+            self.hedging.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def create(
+        self,
+        adjustment: dict = None,
+        meta_parameters: dict = None,
+        wait: bool = True,
+        dedupe: bool = True,
+    ):
         """
         Create a simulation on Compute Studio.
 
@@ -58,49 +267,77 @@ class ComputeStudio:
         meta_parameters: dict
             Meta parameters for the simulation in a ``key:value`` format.
 
+        wait: bool
+            Wait for the inputs to be validated before returning. If ``False``,
+            return a :class:`Simulation` handle right after the simulation is
+            submitted.
+
+        dedupe: bool
+            If the client has a ``submission_index`` and the same adjustment
+            and meta parameters were already submitted, return that simulation
+            instead of creating a new one. Simulations that were deleted or
+            failed are submitted again.
+
         Returns
         --------
-        response: dict
+        response: dict or Simulation
             Response from the Compute Studio server. Use this to get the simulation ID and status.
         """
         adjustment = adjustment or {}
         meta_parameters = meta_parameters or {}
-        resp = requests.post(
-            self.sim_url,
-            json={"adjustment": adjustment, "meta_parameters": meta_parameters},
-            headers=self.auth_header,
-        )
-        if resp.status_code == 201:
-            data = resp.json()
-            pollresp = requests.get(
-                f"{self.sim_url}{data['sim']['model_pk']}/edit/",
-                headers=self.auth_header,
+        sim = None
+        key = None
+        if dedupe and self.submission_index is not None:
+            key = self._submission_key(adjustment, meta_parameters)
+            sim = self._find_submission(key)
+        if sim is None:
+            resp = self._request(
+                "POST",
+                self.sim_url,
+                json={"adjustment": adjustment, "meta_parameters": meta_parameters},
             )
-            polldata = pollresp.json()
-            while pollresp.status_code == 200 and polldata["status"] == "PENDING":
-                time.sleep(3)
-                pollresp = requests.get(
-                    f"{self.sim_url}{data['sim']['model_pk']}/edit/",
-                    headers=self.auth_header,
-                )
-                polldata = pollresp.json()
-            if pollresp.status_code == 200 and polldata["status"] == "SUCCESS":
-                simresp = requests.get(
-                    f"{self.sim_url}{data['sim']['model_pk']}/remote/",
-                    headers=self.auth_header,
-                )
-                return simresp.json()
-            else:
-                raise APIException(pollresp.json())
-        raise APIException(resp.json())
+            if resp.status_code != 201:
+                raise APIException(resp.json())
+            sim = Simulation(self, resp.json()["sim"]["model_pk"])
+            if key is not None:
+                self.submission_index.add(key, sim.model_pk)
+        if not wait:
+            return sim
+        return sim.wait()
+
+    def _submission_key(self, adjustment: dict, meta_parameters: dict) -> str:
+        return submission_key(
+            self.host,
+            self.owner,
+            self.title,
+            adjustment,
+            meta_parameters,
+            self.app_version,
+        )
+
+    def _find_submission(self, key: str) -> Optional["Simulation"]:
+        model_pk = self.submission_index.get(key)
+        if model_pk is None:
+            return None
+        resp = self._request("GET", f"{self.sim_url}{model_pk}/remote/")
+        if resp.status_code == 404 or (
+            resp.status_code in (200, 202)
+            and resp.json().get("status") in FAILED_STATUSES
+        ):
+            # The simulation was deleted or failed, maybe because of a
+            # transient worker failure. Forget it and run a new one.
+            self.submission_index.remove(key)
+            return None
+        return Simulation(self, model_pk)
 
     def detail(
         self,
         model_pk: int,
         include_outputs: bool = False,
         wait: bool = True,
-        polling_interval: int = 5,
+        polling_interval: Optional[float] = None,
         timeout: int = 600,
+        polling_policy: Optional[PollingPolicy] = None,
     ):
         """
         Get detail for a simulation.
@@ -114,18 +351,25 @@ class ComputeStudio:
             Include outputs from the simulation in addition to the simulation metadata.
 
         wait: bool
-            Meta parameters for the simulation in a key:value format.
+            Wait for the simulation to finish.
 
-        polling_interval: int
-            Polling interval dictates how often the status of the results will be checked.
+        polling_interval: float
+            Poll the status of the results at this fixed interval instead of
+            using the polling policy.
 
         timeout: int
             Time in seconds to wait for the simulation to finish.
 
+        polling_policy: PollingPolicy
+            Policy that determines how long to wait between polls. Defaults to
+            the client's ``polling_policy``.
+
         Returns
         --------
         response: dict
-            Response from the Compute Studio server.
+            Response from the Compute Studio server. If the client has a
+            ``result_cache``, completed simulations with outputs are read
+            from and stored in the cache.
 
         """
         if include_outputs:
@@ -133,23 +377,43 @@ class ComputeStudio:
         else:
             url = f"{self.sim_url}{model_pk}/remote/"
 
+        cache_key = None
+        if include_outputs and self.result_cache is not None:
+            cache_key = self.result_cache.key(
+                self.host, self.owner, self.title, model_pk
+            )
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        policy = self._get_polling_policy(polling_interval, polling_policy)
         start = time.time()
+        attempt = 0
         while True:
             if (time.time() - start) > timeout:
                 raise TimeoutError(f"Simulation not ready in under {timeout} seconds.")
 
-            resp = requests.get(url, headers=self.auth_header)
+            resp = self._request("GET", url)
+            if resp.status_code not in (200, 202):
+                raise APIException(resp.json())
+            # Decode the document once; it can be many MB with outputs.
+            data = resp.json()
+            if self.events:
+                self._observe(model_pk, "simulation", data)
 
-            if resp.status_code == 202 and wait:
-                continue  # waiting on the simulation to finish.
-            elif resp.status_code == 202 and not wait:
-                return resp.json()
+            if resp.status_code == 202 and not wait:
+                return data
             elif resp.status_code == 200:
-                return resp.json()
-            else:
-                raise APIException(resp.json())
+                if cache_key is not None and data.get("status") == "SUCCESS":
+                    self.result_cache.set(cache_key, data)
+                return data
 
-            time.sleep(polling_interval)
+            # waiting on the simulation to finish.
+            delay = policy.delay(
+                attempt, parse_retry_after(resp.headers.get("Retry-After"))
+            )
+            time.sleep(max(min(delay, timeout - (time.time() - start)), 0))
+            attempt += 1
 
     def inputs(self, model_pk: Optional[int] = None):
         """
@@ -165,24 +429,65 @@ class ComputeStudio:
         response: dict
             Response from the Compute Studio server.
 
+        If the client has an ``inputs_cache``, the app's inputs documentation
+        is stored in it and revalidated with a conditional request, so an
+        unchanged document is not downloaded again.
+
         """
         if model_pk is None:
-            resp = requests.get(f"{self.sim_url}inputs/", headers=self.auth_header)
+            if self.inputs_cache is not None:
+                return self._cached_inputs()
+            resp = self._request("GET", f"{self.sim_url}inputs/")
             resp.raise_for_status()
             return resp.json()
         else:
-            resp = requests.get(
-                f"{self.sim_url}{model_pk}/edit/", headers=self.auth_header
-            )
+            resp = self._request("GET", f"{self.sim_url}{model_pk}/edit/")
             resp.raise_for_status()
-            return resp.json()
+            data = resp.json()
+            if self.events:
+                self._observe(model_pk, "inputs", data)
+            return data
+
+    def _cached_inputs(self) -> dict:
+        cache = self.inputs_cache
+        key = cache.key(self.host, self.owner, self.title, "inputs")
+        entry = cache.get(key)
+        headers = {}
+        if entry is not None:
+            if cache.is_fresh(entry):
+                return entry["data"]
+            headers = cache.headers(entry)
+        resp = self._request("GET", f"{self.sim_url}inputs/", headers=headers)
+        if resp.status_code == 304 and entry is not None:
+            return cache.revalidated(key, entry)["data"]
+        resp.raise_for_status()
+        entry = {
+            "data": resp.json(),
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched": time.time(),
+        }
+        cache.set(key, entry)
+        return entry["data"]
 
-    def results(self, model_pk: int, timeout: int = 600):
+    def results(
+        self,
+        model_pk: int,
+        timeout: int = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+        eager: bool = False,
+        max_workers: Optional[int] = None,
+        engine: Optional[str] = None,
+        dtype: Optional[dict] = None,
+    ) -> Outputs:
         """
         Retrieve and parse results into the appropriate data structure. Currently,
         CSV outputs are loaded into a pandas `DataFrame`. Other outputs are returned
         as is.
 
+        Outputs are decoded lazily, the first time they are accessed. Set
+        ``eager=True`` to decode all of them up front on a thread pool.
+
         Parameters
         ----------
         model_pk: int
@@ -191,22 +496,460 @@ class ComputeStudio:
         timeout: int
             Time in seconds to wait for the simulation to finish.
 
+        polling_policy: PollingPolicy
+            Policy that determines how long to wait between polls. Defaults to
+            the client's ``polling_policy``.
+
+        eager: bool
+            Decode all outputs before returning.
+
+        max_workers: int
+            Number of threads used to decode outputs when ``eager`` is set.
+
+        engine: str
+            Parser engine passed to ``pandas.read_csv``, e.g. ``"pyarrow"``.
+
+        dtype: dict
+            Column dtypes passed to ``pandas.read_csv``.
+
         Returns
         -------
-        result: dict
-            Dictionary of simulation outputs formated as title:output.
-        """
-        result = self.detail(model_pk, include_outputs=True, wait=True, timeout=timeout)
-        res = {}
-        for output in result["outputs"]["downloadable"]:
-            if output["media_type"] == "CSV" and pd is not None:
-                warnings.warn(
-                    "Install pandas to return CSV output as a pandas DataFrame."
-                )
-                res[output["title"]] = pd.read_csv(StringIO(output["data"]))
-            else:
-                res[output["title"]] = output["data"]
-        return res
+        result: Outputs
+            Mapping of simulation outputs formated as title:output.
+        """
+        result = self.detail(
+            model_pk,
+            include_outputs=True,
+            wait=True,
+            timeout=timeout,
+            polling_policy=polling_policy,
+        )
+        outputs = Outputs(result["outputs"]["downloadable"], engine=engine, dtype=dtype)
+        if eager:
+            outputs.load(max_workers)
+        return outputs
+
+    def download(
+        self,
+        model_pk: int,
+        path: Union[str, Path],
+        title: Optional[str] = None,
+        format: str = "raw",
+        chunk_size: int = 2**16,
+        timeout: int = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> Dict[str, Path]:
+        """
+        Stream the downloadable outputs of a simulation to disk. The response
+        is read in chunks of ``chunk_size`` bytes and each output is written
+        to its file as it arrives, so memory use does not depend on the size
+        of the outputs.
+
+        .. code-block:: python
+
+            client.download(1234, "outputs/")
+            client.download(1234, "table.parquet", title="Table", format="parquet")
+
+        Parameters
+        ----------
+        model_pk: int
+            ID for the simulation.
+
+        path: str or Path
+            Directory to write the outputs to. If ``title`` is set, the file
+            that output is written to.
+
+        title: str
+            Only download the output with this title.
+
+        format: str
+            ``"raw"`` writes every output as is, e.g. CSV outputs as CSV files
+            and images, which the server sends as base64 text, as image files.
+            ``"parquet"`` converts CSV outputs to Parquet files, which requires
+            pyarrow. Other outputs are always written as is.
+
+        chunk_size: int
+            Number of bytes read from the response at a time.
+
+        timeout: int
+            Time in seconds to wait for the simulation to finish.
+
+        polling_policy: PollingPolicy
+            Policy that determines how long to wait between polls. Defaults to
+            the client's ``polling_policy``.
+
+        Returns
+        -------
+        paths: dict
+            Path of each written output formatted as title:path.
+        """
+        if format not in ("raw", "parquet"):
+            raise ValueError(f"format must be 'raw' or 'parquet', not {format!r}.")
+        # Wait on the light-weight remote endpoint before streaming the outputs.
+        self.detail(model_pk, wait=True, timeout=timeout, polling_policy=polling_policy)
+        path = Path(path)
+        directory = path.parent if title is not None else path
+        directory.mkdir(parents=True, exist_ok=True)
+
+        written = {}
+        with self._request("GET", f"{self.sim_url}{model_pk}/", stream=True) as resp:
+            if resp.status_code != 200:
+                raise APIException(resp.json())
+            for output in iter_downloadable(resp.iter_content(chunk_size), directory):
+                tmp = output.pop("path")
+                try:
+                    if title is not None and output.get("title") != title:
+                        continue
+                    is_csv = output.get("media_type") == "CSV"
+                    if title is not None:
+                        dest = path
+                    else:
+                        name = Path(output.get("filename") or output["title"]).name
+                        dest = directory / name
+                        if format == "parquet" and is_csv:
+                            dest = dest.with_suffix(".parquet")
+                    if format == "parquet" and is_csv:
+                        csv_to_parquet(tmp, dest)
+                    else:
+                        os.replace(tmp, dest)
+                    written[output["title"]] = dest
+                finally:
+                    if tmp.exists():
+                        tmp.unlink()
+        if title is not None and not written:
+            raise KeyError(f"Simulation {model_pk} has no output titled {title!r}.")
+        return written
+
+    def create_many(
+        self,
+        items: Iterable[Tuple[dict, dict]],
+        max_workers: Optional[int] = None,
+        results: bool = False,
+        timeout: Optional[int] = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Create many simulations with bounded parallelism.
+
+        .. code-block:: python
+
+            items = [(adjustment, {"year": 2021}) for adjustment in adjustments]
+            for res in client.create_many(items, results=True):
+                if res.error is not None:
+                    print(f"{res.index} failed: {res.error}")
+                else:
+                    outputs[res.index] = res.result
+
+        Parameters
+        ----------
+        items: iterable
+            ``(adjustment, meta_parameters)`` pairs.
+
+        max_workers: int
+            Number of simulations submitted or downloaded at once. Defaults to
+            the client's ``pool_maxsize``.
+
+        results: bool
+            Wait for the simulations to finish and yield their outputs as
+            returned by :meth:`results`. Otherwise, yield the simulation meta
+            data once the inputs are validated, like :meth:`create`.
+
+        timeout: int
+            Time in seconds to wait for each simulation.
+
+        polling_policy: PollingPolicy
+            Policy that spaces out the polling rounds. Defaults to the client's
+            ``polling_policy``.
+
+        Returns
+        -------
+        results: iterator
+            :class:`BatchResult` tuples ``(index, model_pk, result, error)`` in
+            the order that the simulations finish. Failed items are reported in
+            ``error`` and do not stop the batch.
+
+        If the client has a :class:`JobJournal`, the batch records its
+        progress in it. Running the same batch again after a crash resumes
+        polling and downloading the simulations that were already submitted
+        instead of submitting them again.
+        """
+        poller = BatchPoller(
+            self,
+            max_workers or self.pool_maxsize,
+            timeout=timeout,
+            polling_policy=polling_policy,
+            fetch_results=results,
+        )
+        for index, (adjustment, meta_parameters) in enumerate(items):
+            poller.submit(index, adjustment, meta_parameters)
+        return poller.run()
+
+    def results_many(
+        self,
+        model_pks: Iterable[int],
+        max_workers: Optional[int] = None,
+        timeout: Optional[int] = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Retrieve the results of many simulations. The status of all
+        simulations that are still running is checked in a single polling
+        loop and the outputs are downloaded in parallel.
+
+        Parameters
+        ----------
+        model_pks: iterable
+            IDs for the simulations.
+
+        max_workers: int
+            Number of outputs downloaded at once. Defaults to the client's
+            ``pool_maxsize``.
+
+        timeout: int
+            Time in seconds to wait for each simulation.
+
+        polling_policy: PollingPolicy
+            Policy that spaces out the polling rounds. Defaults to the client's
+            ``polling_policy``.
+
+        Returns
+        -------
+        results: iterator
+            :class:`BatchResult` tuples ``(index, model_pk, result, error)`` in
+            the order that the simulations finish.
+        """
+        poller = BatchPoller(
+            self,
+            max_workers or self.pool_maxsize,
+            timeout=timeout,
+            polling_policy=polling_policy,
+            fetch_results=True,
+        )
+        for index, model_pk in enumerate(model_pks):
+            poller.watch(index, model_pk)
+        return poller.run()
+
+    def sweep(
+        self,
+        params: Union[Iterable[str], Dict[str, Optional[list]]],
+        step: float = 1,
+        sample: Optional[int] = None,
+        seed: Optional[int] = None,
+        meta_parameters: Optional[dict] = None,
+        outputs: Optional[Iterable[str]] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[int] = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+    ):
+        """
+        Run a simulation for each point of a grid over the app's parameters
+        and collect the table outputs in one DataFrame.
+
+        .. code-block:: python
+
+            df = client.sweep(
+                {"policy.STD": None, "policy.II_em": [0, 1000, 2000]},
+                meta_parameters={"year": 2021},
+                outputs=["Aggregate Results"],
+            )
+
+        Parameters
+        ----------
+        params: list or dict
+            Parameters to sweep over, as ``"section.param"`` or as a parameter
+            name that is unique across sections. A list, or parameters mapped
+            to ``None``, use :meth:`Parameters.param_grid` to enumerate the
+            values that the app allows. Otherwise, the values are taken from
+            the dict.
+
+        step: float
+            Step size passed to ``param_grid``.
+
+        sample: int
+            Run a random sample of this many points instead of the full grid.
+
+        seed: int
+            Seed for ``sample``.
+
+        meta_parameters: dict
+            Meta parameters used for every simulation.
+
+        outputs: list
+            Titles of the outputs to collect. Defaults to all table outputs.
+
+        max_workers: int
+            Number of simulations submitted or downloaded at once.
+
+        timeout: int
+            Time in seconds to wait for each simulation.
+
+        polling_policy: PollingPolicy
+            Policy that spaces out the polling rounds.
+
+        Returns
+        -------
+        result: pandas.DataFrame
+            Rows of every table output indexed by the swept values, with the
+            output title in the ``output`` column. Duplicate grid points are
+            only run once and failed simulations are reported as warnings.
+        """
+        # paramtools is only needed to enumerate parameter grids.
+        from cs_kit.sweep import run_sweep
+
+        return run_sweep(
+            self,
+            params,
+            step=step,
+            sample=sample,
+            seed=seed,
+            meta_parameters=meta_parameters,
+            outputs=outputs,
+            max_workers=max_workers,
+            timeout=timeout,
+            polling_policy=polling_policy,
+        )
+
+    def compare(
+        self,
+        model_pks: Iterable[int],
+        baseline: Optional[int] = None,
+        outputs: Optional[Iterable[str]] = None,
+        index: Optional[Union[str, List[str]]] = None,
+        keep: bool = True,
+        max_workers: Optional[int] = None,
+        timeout: Optional[int] = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+    ):
+        """
+        Compare the table outputs of many simulations, optionally against a
+        baseline. Results are added to the comparison as each simulation
+        finishes and are then dropped, so the outputs of all simulations are
+        never in memory at once.
+
+        .. code-block:: python
+
+            comparison = client.compare(reform_pks, baseline=baseline_pk)
+            comparison.stack("Aggregate Results")  # indexed by (model_pk, row)
+            comparison.pct_change("Aggregate Results")
+            comparison.summary("Aggregate Results", of="diff")
+
+        Parameters
+        ----------
+        model_pks: iterable
+            IDs for the simulations to compare.
+
+        baseline: int
+            ID for the simulation that the others are compared against.
+
+        outputs: list
+            Titles of the outputs to compare. Defaults to all table outputs.
+
+        index: str or list
+            Columns used to align the rows of each table instead of their
+            position.
+
+        keep: bool
+            Keep the values of every simulation. Set to ``False`` for large
+            sets of simulations to only keep summary statistics.
+
+        max_workers: int
+            Number of outputs downloaded at once.
+
+        timeout: int
+            Time in seconds to wait for each simulation.
+
+        polling_policy: PollingPolicy
+            Policy that spaces out the polling rounds.
+
+        Returns
+        -------
+        comparison: cs_kit.compare.ResultComparison
+            Aligned outputs. Failed simulations are reported as warnings and
+            kept in ``comparison.errors``.
+        """
+        # numpy and pandas are only needed to compare outputs.
+        from cs_kit.compare import compare_results
+
+        return compare_results(
+            self,
+            model_pks,
+            baseline=baseline,
+            outputs=outputs,
+            index=index,
+            keep=keep,
+            max_workers=max_workers,
+            timeout=timeout,
+            polling_policy=polling_policy,
+        )
+
+    def export_parquet(
+        self,
+        model_pks: Union[int, Iterable[int]],
+        path: Union[str, Path],
+        max_workers: Optional[int] = None,
+        timeout: Optional[int] = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+        column_types: Optional[dict] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Write the CSV outputs of one or many simulations to a Parquet dataset
+        partitioned by ``model_pk`` and output title. Each simulation is
+        written as soon as it finishes, so the dataset can be queried while
+        the export is running. See :class:`cs_kit.export.ParquetExporter`.
+
+        .. code-block:: python
+
+            for res in client.export_parquet(model_pks, "tax-brain.parquet"):
+                print(res.model_pk, res.error)
+
+            schema = ParquetExporter("tax-brain.parquet").schema()
+            df = pd.read_parquet(
+                "tax-brain.parquet", schema=schema, filters=[("model_pk", "=", 1234)]
+            )
+
+        Parameters
+        ----------
+        model_pks: int or iterable
+            IDs for the simulations.
+
+        path: str or Path
+            Root directory of the dataset.
+
+        max_workers: int
+            Number of simulations downloaded and written at once. Defaults to
+            the client's ``pool_maxsize``.
+
+        timeout: int
+            Time in seconds to wait for each simulation.
+
+        polling_policy: PollingPolicy
+            Policy that spaces out the polling rounds.
+
+        column_types: dict
+            Arrow types of output columns whose inferred type can differ
+            between simulations.
+
+        Returns
+        -------
+        results: iterator
+            :class:`BatchResult` tuples whose ``result`` is the list of files
+            written for the simulation, in the order that they are written.
+            The export only runs while the iterator is consumed.
+        """
+        # pyarrow is only needed to write Parquet.
+        from cs_kit.export import export_parquet
+
+        if isinstance(model_pks, int):
+            model_pks = [model_pks]
+        return export_parquet(
+            self,
+            model_pks,
+            path,
+            max_workers=max_workers,
+            timeout=timeout,
+            polling_policy=polling_policy,
+            column_types=column_types,
+        )
 
     def update(
         self,
@@ -258,16 +1001,22 @@ class ComputeStudio:
             if val is not None:
                 sim_kwargs[name] = val
 
-        resp = requests.put(
-            f"{self.sim_url}{model_pk}/",
-            json=sim_kwargs,
-            headers=self.auth_header,
-        )
+        resp = self._request("PUT", f"{self.sim_url}{model_pk}/", json=sim_kwargs)
         if resp.status_code == 200:
             return resp.json()
         else:
             raise APIException(resp.json())
 
+    def get_host(self, host):
+        """
+        Retrieve the Compute Studio host. It can be passed as an argument or
+        set as an environment variable at CS_HOST, e.g. to point the client at
+        a local ``cs_kit.mock_server``.
+        """
+        if host:
+            return host.rstrip("/")
+        return os.environ.get("CS_HOST", self.host).rstrip("/")
+
     def get_token(self, api_token):
         """Retrieve the API token"""
         token_file_path = Path.home() / ".cs-api-token"
@@ -284,3 +1033,125 @@ class ComputeStudio:
                 f"this class, as an environment variable at CS_API_TOKEN, "
                 f"or read from {token_file_path}"
             )
+
+
+class Simulation:
+    """
+    Handle for a simulation that was submitted with
+    ``ComputeStudio.create(wait=False)``.
+
+    .. code-block:: python
+
+        sims = [client.create(adj, wait=False) for adj in adjustments]
+        for sim in sims:
+            print(sim.model_pk, sim.status())
+        results = [sim.result() for sim in sims]
+
+    Parameters
+    ----------
+    client: ComputeStudio
+        Client used to submit the simulation.
+
+    model_pk: int
+        ID for the simulation.
+    """
+
+    def __init__(self, client: ComputeStudio, model_pk: int):
+        self.client = client
+        self.model_pk = model_pk
+        self._future = None
+        self._future_lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"Simulation({self.client.owner}/{self.client.title}, "
+            f"model_pk={self.model_pk})"
+        )
+
+    def status(self) -> str:
+        """
+        Current status of the simulation. This is the status of the inputs
+        while they are being validated and the status of the simulation run
+        after that, e.g. ``PENDING``, ``SUCCESS`` or ``FAIL``.
+        """
+        inputs = self.client.inputs(self.model_pk)
+        if inputs["status"] != "SUCCESS":
+            return inputs["status"]
+        return self.client.detail(self.model_pk, wait=False)["status"]
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        Wait for the inputs to be validated.
+
+        Parameters
+        ----------
+        timeout: float
+            Time in seconds to wait. Wait indefinitely if ``None``.
+
+        Returns
+        -------
+        response: dict
+            Simulation meta data from the Compute Studio server. This is the
+            same data that ``create(wait=True)`` returns.
+        """
+        start = time.time()
+        policy = self.client.polling_policy
+        edit_url = f"{self.client.sim_url}{self.model_pk}/edit/"
+        pollresp = self.client._request("GET", edit_url)
+        polldata = pollresp.json()
+        self.client._observe(self.model_pk, "inputs", polldata)
+        attempt = 0
+        while pollresp.status_code == 200 and polldata["status"] == "PENDING":
+            delay = policy.delay(
+                attempt, parse_retry_after(pollresp.headers.get("Retry-After"))
+            )
+            if timeout is not None:
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Simulation inputs not validated in under {timeout} seconds."
+                    )
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            pollresp = self.client._request("GET", edit_url)
+            polldata = pollresp.json()
+            self.client._observe(self.model_pk, "inputs", polldata)
+            attempt += 1
+        if pollresp.status_code == 200 and polldata["status"] == "SUCCESS":
+            simresp = self.client._request(
+                "GET", f"{self.client.sim_url}{self.model_pk}/remote/"
+            )
+            simdata = simresp.json()
+            self.client._observe(self.model_pk, "simulation", simdata)
+            return simdata
+        raise APIException(polldata)
+
+    def result(self, timeout: int = 600):
+        """
+        Wait for the simulation to finish and return its outputs. See
+        :meth:`ComputeStudio.results`. Raises :class:`APIException` if the
+        inputs are invalid, since the simulation will never run.
+        """
+        start = time.time()
+        self.wait(timeout=timeout)
+        remaining = max(timeout - (time.time() - start), 0)
+        return self.client.results(self.model_pk, timeout=remaining)
+
+    def future(self) -> Future:
+        """
+        ``concurrent.futures.Future`` that resolves to the outputs of the
+        simulation, like :meth:`result`. The future runs on the client's
+        thread pool and is only started once per handle.
+        """
+        with self._future_lock:
+            if self._future is None:
+                self._future = self.client.executor.submit(self.result)
+            return self._future
+
+    def watch(self, callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """
+        ``concurrent.futures.Future`` that resolves to the simulation's meta
+        data once it has run. The simulation is polled by the client's
+        shared :class:`SimulationMonitor` instead of a thread of its own.
+        """
+        return self.client.monitor.watch(self.model_pk, callback=callback)
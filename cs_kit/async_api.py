@@ -0,0 +1,328 @@
+import asyncio
+import json
+import time
+from typing import List, Mapping, NamedTuple, Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from cs_kit.api import ComputeStudio, RETRY_STATUSES
+from cs_kit.cache import InputsCache
+from cs_kit.exceptions import APIException
+from cs_kit.instrumentation import Hook, HookDispatcher, RequestEvent, url_template
+from cs_kit.outputs import Outputs
+from cs_kit.polling import PollingPolicy, parse_retry_after
+from cs_kit.ratelimit import RateLimiter
+
+
+class AsyncResponse(NamedTuple):
+    status: int
+    data: dict
+    headers: Mapping[str, str]
+
+
+class AsyncComputeStudio:
+    """
+    asyncio client for the ComputeStudio webapp. It has the same methods as
+    :class:`ComputeStudio`, but they are coroutines, so a single event loop
+    can submit and poll many simulations at once.
+
+    .. code-block:: python
+
+        async with AsyncComputeStudio("PSLmodels", "TaxBrain") as client:
+            sims = await asyncio.gather(
+                *(client.create(adjustment) for adjustment in adjustments)
+            )
+
+    At most ``max_concurrency`` requests are in flight at any time, no matter
+    how many coroutines are using the client. Connections are kept alive and
+    shared between requests. Idempotent requests are retried on connection
+    errors and on 500, 502, 503 and 504 responses.
+
+    Requires `aiohttp <https://docs.aiohttp.org>`_.
+    """
+
+    host = ComputeStudio.host
+    get_host = ComputeStudio.get_host
+    get_token = ComputeStudio.get_token
+
+    def __init__(
+        self,
+        owner: str,
+        title: str,
+        api_token: Optional[str] = None,
+        max_concurrency: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        polling_policy: Optional[PollingPolicy] = None,
+        hooks: Optional[List[Hook]] = None,
+        inputs_cache: Optional[InputsCache] = None,
+        host: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        if aiohttp is None:
+            raise ImportError("Install aiohttp to use AsyncComputeStudio.")
+        self.owner = owner
+        self.title = title
+        self.host = self.get_host(host)
+        api_token = self.get_token(api_token)
+        self.auth_header = {"Authorization": f"Token {api_token}"}
+        self.sim_url = f"{self.host}/{owner}/{title}/api/v1/"
+        self.inputs_url = f"{self.host}/{owner}/{title}/api/v1/inputs/"
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.polling_policy = polling_policy or PollingPolicy()
+        self.events = HookDispatcher(hooks)
+        self.inputs_cache = inputs_cache
+        self.rate_limiter = rate_limiter
+        self._session = None
+        self._semaphore = None
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        # The session and semaphore are bound to the running event loop, so
+        # they are created on first use instead of in __init__.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.auth_header,
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """
+        Make a request and return its status, decoded JSON body and headers.
+        """
+        session = self.session
+        retryable = method in ("GET", "PUT")
+        template, model_pk = url_template(self.sim_url, url)
+        if self.rate_limiter is not None:
+            # Reserve the token without blocking the event loop.
+            wait = self.rate_limiter.reserve(method, template)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    async with session.request(method, url, **kwargs) as resp:
+                        if not (
+                            retryable
+                            and resp.status in RETRY_STATUSES
+                            and attempt < self.max_retries
+                        ):
+                            body = await resp.read()
+                            status, headers = resp.status, resp.headers.copy()
+                            break
+            except aiohttp.ClientConnectionError as e:
+                # Like urllib3, a POST is only retried if it never reached the
+                # server.
+                connect_error = isinstance(e, aiohttp.ClientConnectorError)
+                if attempt >= self.max_retries or not (retryable or connect_error):
+                    latency = time.perf_counter() - start
+                    self.events.emit(
+                        RequestEvent(
+                            method, template, None, latency, 0, attempt + 1, model_pk, e
+                        )
+                    )
+                    raise
+            await asyncio.sleep(self.backoff_factor * (2**attempt))
+            attempt += 1
+        if self.events:
+            latency = time.perf_counter() - start
+            self.events.emit(
+                RequestEvent(
+                    method, template, status, latency, len(body), attempt + 1, model_pk
+                )
+            )
+        return AsyncResponse(status, json.loads(body) if body else None, headers)
+
+    def _observe(self, model_pk: int, stage: str, data):
+        """Report the status in ``data`` to the hooks."""
+        if self.events and isinstance(data, dict):
+            self.events.state(model_pk, stage, data.get("status"))
+
+    def add_hook(self, hook: Hook):
+        """Register a hook. See :meth:`ComputeStudio.add_hook`."""
+        self.events.hooks.append(hook)
+
+    async def close(self):
+        """Close the pooled connections held by this client."""
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def create(self, adjustment: dict = None, meta_parameters: dict = None):
+        """
+        Create a simulation on Compute Studio. See :meth:`ComputeStudio.create`.
+        """
+        adjustment = adjustment or {}
+        meta_parameters = meta_parameters or {}
+        resp = await self._request(
+            "POST",
+            self.sim_url,
+            json={"adjustment": adjustment, "meta_parameters": meta_parameters},
+        )
+        if resp.status != 201:
+            raise APIException(resp.data)
+        model_pk = resp.data["sim"]["model_pk"]
+        edit_url = f"{self.sim_url}{model_pk}/edit/"
+        pollresp = await self._request("GET", edit_url)
+        self._observe(model_pk, "inputs", pollresp.data)
+        attempt = 0
+        while pollresp.status == 200 and pollresp.data["status"] == "PENDING":
+            await asyncio.sleep(
+                self.polling_policy.delay(
+                    attempt, parse_retry_after(pollresp.headers.get("Retry-After"))
+                )
+            )
+            pollresp = await self._request("GET", edit_url)
+            self._observe(model_pk, "inputs", pollresp.data)
+            attempt += 1
+        if pollresp.status == 200 and pollresp.data["status"] == "SUCCESS":
+            simresp = await self._request("GET", f"{self.sim_url}{model_pk}/remote/")
+            self._observe(model_pk, "simulation", simresp.data)
+            return simresp.data
+        raise APIException(pollresp.data)
+
+    async def detail(
+        self,
+        model_pk: int,
+        include_outputs: bool = False,
+        wait: bool = True,
+        polling_interval: Optional[float] = None,
+        timeout: int = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+    ):
+        """
+        Get detail for a simulation. See :meth:`ComputeStudio.detail`.
+        """
+        if include_outputs:
+            url = f"{self.sim_url}{model_pk}/"
+        else:
+            url = f"{self.sim_url}{model_pk}/remote/"
+
+        if polling_policy is None and polling_interval is not None:
+            polling_policy = PollingPolicy.fixed(polling_interval)
+        policy = polling_policy or self.polling_policy
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        attempt = 0
+        while True:
+            if (loop.time() - start) > timeout:
+                raise TimeoutError(f"Simulation not ready in under {timeout} seconds.")
+
+            resp = await self._request("GET", url)
+            if resp.status in (200, 202):
+                self._observe(model_pk, "simulation", resp.data)
+
+            if resp.status == 202 and not wait:
+                return resp.data
+            elif resp.status == 200:
+                return resp.data
+            elif resp.status != 202:
+                raise APIException(resp.data)
+
+            delay = policy.delay(
+                attempt, parse_retry_after(resp.headers.get("Retry-After"))
+            )
+            await asyncio.sleep(max(min(delay, timeout - (loop.time() - start)), 0))
+            attempt += 1
+
+    async def inputs(self, model_pk: Optional[int] = None):
+        """
+        Get the inputs for a simulation or retrieve the inputs documentation
+        for the app. See :meth:`ComputeStudio.inputs`.
+        """
+        if model_pk is None:
+            if self.inputs_cache is not None:
+                return await self._cached_inputs()
+            url = f"{self.sim_url}inputs/"
+        else:
+            url = f"{self.sim_url}{model_pk}/edit/"
+        resp = await self._request("GET", url)
+        if resp.status != 200:
+            raise APIException(resp.data)
+        return resp.data
+
+    async def _cached_inputs(self) -> dict:
+        cache = self.inputs_cache
+        key = cache.key(self.host, self.owner, self.title, "inputs")
+        entry = cache.get(key)
+        headers = {}
+        if entry is not None:
+            if cache.is_fresh(entry):
+                return entry["data"]
+            headers = cache.headers(entry)
+        resp = await self._request("GET", f"{self.sim_url}inputs/", headers=headers)
+        if resp.status == 304 and entry is not None:
+            return cache.revalidated(key, entry)["data"]
+        if resp.status != 200:
+            raise APIException(resp.data)
+        entry = {
+            "data": resp.data,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched": time.time(),
+        }
+        cache.set(key, entry)
+        return entry["data"]
+
+    async def results(
+        self,
+        model_pk: int,
+        timeout: int = 600,
+        polling_policy: Optional[PollingPolicy] = None,
+        eager: bool = False,
+        max_workers: Optional[int] = None,
+        engine: Optional[str] = None,
+        dtype: Optional[dict] = None,
+    ) -> Outputs:
+        """
+        Retrieve and parse results into the appropriate data structure.
+        See :meth:`ComputeStudio.results`. With ``eager=True``, the outputs
+        are decoded in a thread so that the event loop is not blocked.
+        """
+        result = await self.detail(
+            model_pk,
+            include_outputs=True,
+            wait=True,
+            timeout=timeout,
+            polling_policy=polling_policy,
+        )
+        outputs = Outputs(result["outputs"]["downloadable"], engine=engine, dtype=dtype)
+        if eager:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, outputs.load, max_workers)
+        return outputs
+
+    async def update(
+        self,
+        model_pk: int,
+        title: Optional[str] = None,
+        is_public: Optional[bool] = None,
+        notify_on_completion: Optional[bool] = None,
+    ):
+        """
+        Update meta data about a simulation. See :meth:`ComputeStudio.update`.
+        """
+        vals = [
+            ("title", title),
+            ("is_public", is_public),
+            ("notify_on_completion", notify_on_completion),
+        ]
+        sim_kwargs = {name: val for name, val in vals if val is not None}
+        resp = await self._request("PUT", f"{self.sim_url}{model_pk}/", json=sim_kwargs)
+        if resp.status != 200:
+            raise APIException(resp.data)
+        return resp.data
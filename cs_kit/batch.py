@@ -0,0 +1,243 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import time
+from typing import Any, Iterator, List, NamedTuple, Optional
+
+from cs_kit.exceptions import APIException
+
+SUBMITTING = "SUBMITTING"
+VALIDATING = "VALIDATING"
+RUNNING = "RUNNING"
+FETCHING = "FETCHING"
+DONE = "DONE"
+ERROR = "ERROR"
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of one item in a batch. ``index`` is the position of the item in
+    the iterable passed to the batch method. Exactly one of ``result`` and
+    ``error`` is set.
+    """
+
+    index: int
+    model_pk: Optional[int]
+    result: Any = None
+    error: Optional[Exception] = None
+
+
+class _BatchItem:
+    __slots__ = ("index", "model_pk", "stage", "started", "adjustment", "meta", "key")
+
+    def __init__(
+        self, index, stage, model_pk=None, adjustment=None, meta=None, key=None
+    ):
+        self.index = index
+        self.stage = stage
+        self.model_pk = model_pk
+        self.adjustment = adjustment
+        self.meta = meta
+        self.key = key
+        self.started = None
+
+
+class BatchPoller:
+    """
+    Drives many simulations through submission, validation, the model run and
+    the final download. Submissions and downloads run on a thread pool with
+    ``max_workers`` threads while a single loop polls the status of every
+    pending simulation once per round. Rounds are spaced out by the client's
+    polling policy. An item is only submitted once a thread is free for it,
+    so closing the iterator stops the rest of the batch from being submitted.
+
+    If the client has a ``journal``, every submission and status change is
+    recorded in it, and submissions that the journal already knows about are
+    resumed at the stage they had reached instead of being submitted again.
+
+    Use :meth:`ComputeStudio.create_many` and
+    :meth:`ComputeStudio.results_many` instead of using this class directly.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_workers: int,
+        timeout: Optional[float] = 600,
+        polling_policy=None,
+        fetch_results: bool = False,
+    ):
+        self.client = client
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.polling_policy = polling_policy or client.polling_policy
+        self.fetch_results = fetch_results
+        self.journal = client.journal
+        self.items: List[_BatchItem] = []
+
+    def submit(self, index: int, adjustment: dict, meta_parameters: dict):
+        item = _BatchItem(
+            index, SUBMITTING, adjustment=adjustment, meta=meta_parameters
+        )
+        if self.journal is not None:
+            item.key = self.client._submission_key(adjustment, meta_parameters)
+            entry = self.journal.get(item.key)
+            if entry is not None and entry.model_pk is not None:
+                item.model_pk = entry.model_pk
+                item.stage = self._resume_stage(entry.status)
+        self.items.append(item)
+
+    def _resume_stage(self, status: str) -> str:
+        if status in (FETCHING, DONE):
+            return FETCHING
+        elif status == RUNNING:
+            return RUNNING if self.fetch_results else FETCHING
+        # Re-check the inputs of items that failed: the error may have been
+        # a timeout and otherwise the check reports it again.
+        return VALIDATING
+
+    def _record(self, item: _BatchItem, status: str, error: Optional[Exception] = None):
+        if self.journal is not None and item.key is not None:
+            self.journal.record(
+                item.key,
+                status,
+                model_pk=item.model_pk,
+                error=None if error is None else repr(error),
+            )
+
+    def watch(self, index: int, model_pk: int):
+        self.items.append(_BatchItem(index, RUNNING, model_pk=model_pk))
+
+    def _submit(self, item: _BatchItem) -> int:
+        self._record(item, SUBMITTING)
+        return self.client.create(item.adjustment, item.meta, wait=False).model_pk
+
+    def _check(self, item: _BatchItem):
+        try:
+            if item.stage == VALIDATING:
+                resp = self.client._request(
+                    "GET", f"{self.client.sim_url}{item.model_pk}/edit/"
+                )
+                data = resp.json()
+                self.client._observe(item.model_pk, "inputs", data)
+                if resp.status_code != 200 or data["status"] not in (
+                    "PENDING",
+                    "SUCCESS",
+                ):
+                    raise APIException(data)
+                if data["status"] == "PENDING":
+                    return None
+                return RUNNING if self.fetch_results else FETCHING
+            else:
+                resp = self.client._request(
+                    "GET", f"{self.client.sim_url}{item.model_pk}/remote/"
+                )
+                if resp.status_code in (200, 202):
+                    self.client._observe(item.model_pk, "simulation", resp.json())
+                if resp.status_code == 202:
+                    return None
+                elif resp.status_code != 200:
+                    raise APIException(resp.json())
+                return FETCHING
+        except Exception as e:
+            return e
+
+    def _fetch(self, item: _BatchItem):
+        if self.fetch_results:
+            return self.client.results(
+                item.model_pk, polling_policy=self.polling_policy
+            )
+        resp = self.client._request(
+            "GET", f"{self.client.sim_url}{item.model_pk}/remote/"
+        )
+        return resp.json()
+
+    def run(self) -> Iterator[BatchResult]:
+        # Submissions and downloads are started lazily, at most max_workers
+        # at a time, so that closing the generator early leaves the rest of
+        # the batch alone. Status checks have a pool of their own so that a
+        # polling round never waits behind them.
+        pool = ThreadPoolExecutor(self.max_workers)
+        checks = ThreadPoolExecutor(self.max_workers)
+        queued = deque(
+            item for item in self.items if item.stage in (SUBMITTING, FETCHING)
+        )
+        jobs = {}
+        try:
+            polling = [
+                item for item in self.items if item.stage not in (SUBMITTING, FETCHING)
+            ]
+            now = time.time()
+            for item in polling:
+                item.started = now
+            attempt = 0
+            next_poll = time.time()
+
+            while queued or jobs or polling:
+                while queued and len(jobs) < self.max_workers:
+                    item = queued.popleft()
+                    func = self._submit if item.stage == SUBMITTING else self._fetch
+                    jobs[pool.submit(func, item)] = item
+
+                for job in [job for job in jobs if job.done()]:
+                    item = jobs.pop(job)
+                    try:
+                        value = job.result()
+                    except Exception as e:
+                        self._record(item, ERROR, e)
+                        yield BatchResult(item.index, item.model_pk, error=e)
+                        continue
+                    if item.stage == SUBMITTING:
+                        item.model_pk = value
+                        item.stage = VALIDATING
+                        item.started = time.time()
+                        self._record(item, VALIDATING)
+                        polling.append(item)
+                        # Poll new simulations at the fastest rate again.
+                        attempt = 0
+                    else:
+                        self._record(item, DONE)
+                        yield BatchResult(item.index, item.model_pk, result=value)
+
+                if polling and time.time() >= next_poll:
+                    still_polling = []
+                    for item, stage in zip(polling, checks.map(self._check, polling)):
+                        if isinstance(stage, Exception):
+                            self._record(item, ERROR, stage)
+                            yield BatchResult(item.index, item.model_pk, error=stage)
+                        elif stage == FETCHING:
+                            item.stage = FETCHING
+                            self._record(item, FETCHING)
+                            # Finish simulations before submitting new ones.
+                            queued.appendleft(item)
+                        elif (
+                            self.timeout is not None
+                            and time.time() - item.started > self.timeout
+                        ):
+                            error = TimeoutError(
+                                f"Simulation not ready in under {self.timeout} seconds."
+                            )
+                            self._record(item, ERROR, error)
+                            yield BatchResult(item.index, item.model_pk, error=error)
+                        else:
+                            if stage is not None and stage != item.stage:
+                                item.stage = stage
+                                self._record(item, stage)
+                            still_polling.append(item)
+                    polling = still_polling
+                    next_poll = time.time() + self.polling_policy.delay(attempt)
+                    attempt += 1
+                    continue
+
+                # Sleep until the next polling round, waking up early to hand
+                # back finished jobs, to start queued ones and to start
+                # polling new submissions.
+                delay = max(next_poll - time.time(), 0) if polling else None
+                if jobs:
+                    wait(list(jobs), timeout=delay, return_when=FIRST_COMPLETED)
+                elif polling:
+                    time.sleep(delay)
+        finally:
+            for job in jobs:
+                job.cancel()
+            checks.shutdown()
+            pool.shutdown()
@@ -0,0 +1,316 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Hashable, Optional, Union
+
+
+class ResultCache:
+    """
+    On-disk cache for the outputs of completed simulations. A finished
+    simulation's outputs never change, so a cache hit skips the network
+    entirely.
+
+    Entries are stored as one JSON file per simulation, keyed by
+    ``(host, owner, title, model_pk)``. Files are written to a temporary file
+    and atomically moved into place, so several processes can share one cache
+    directory. Once the cache grows past ``max_size`` bytes, the least
+    recently used entries are evicted.
+
+    .. code-block:: python
+
+        client = ComputeStudio("PSLmodels", "Tax-Brain", result_cache=ResultCache())
+        client.results(1234)  # downloads the outputs
+        client.results(1234)  # reads them from disk
+
+    Parameters
+    ----------
+    path: str or Path
+        Cache directory. Defaults to ``~/.cache/cs-kit/results``.
+
+    max_size: int
+        Maximum size of the cache in bytes.
+    """
+
+    suffix = ".json"
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, max_size: int = 2**30):
+        if path is None:
+            path = Path.home() / ".cache" / "cs-kit" / "results"
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(path={str(self.path)!r}, max_size={self.max_size})"
+        )
+
+    @staticmethod
+    def key(host: str, owner: str, title: str, model_pk: int) -> str:
+        return hashlib.sha256(
+            json.dumps([host, owner, title, str(model_pk)]).encode("utf-8")
+        ).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}{self.suffix}"
+
+    def get(self, key: str):
+        """Return the cached entry for ``key`` or ``None`` on a miss."""
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                data = json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            # Missing, concurrently evicted or otherwise unreadable.
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            # Bump the modification time so that LRU eviction keeps this entry.
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, key: str, data):
+        """Atomically write ``data`` to the cache and evict old entries."""
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(data).encode("utf-8"))
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits ``max_size``."""
+        entries = []
+        for path in self.path.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                # Another process evicted it first.
+                pass
+            else:
+                with self._lock:
+                    self.evictions += 1
+            total -= size
+
+    def clear(self):
+        for path in self.path.glob(f"*{self.suffix}"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @property
+    def size(self) -> int:
+        return sum(path.stat().st_size for path in self.path.glob(f"*{self.suffix}"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class InputsCache(ResultCache):
+    """
+    In-process and on-disk cache for the inputs documentation of apps. Unlike
+    simulation outputs, an app's inputs change when a new version of the app
+    is released, so cached documents are revalidated with the server using
+    their ``ETag`` or ``Last-Modified`` header. An unchanged document costs a
+    ``304 Not Modified`` response instead of a full download.
+
+    .. code-block:: python
+
+        client = ComputeStudio(
+            "PSLmodels", "Tax-Brain", inputs_cache=InputsCache(ttl=300)
+        )
+        client.inputs()  # downloads the inputs
+        client.inputs()  # no request for the next five minutes
+
+    Documents read from the cache are shared between calls and should not be
+    modified.
+
+    Parameters
+    ----------
+    path: str or Path
+        Cache directory. Defaults to ``~/.cache/cs-kit/inputs``.
+
+    ttl: float
+        Seconds after a download or revalidation during which a cached
+        document is used without asking the server. By default, every call
+        revalidates.
+
+    max_size: int
+        Maximum size of the on-disk cache in bytes.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = None,
+        max_size: int = 2**28,
+    ):
+        if path is None:
+            path = Path.home() / ".cache" / "cs-kit" / "inputs"
+        super().__init__(path, max_size=max_size)
+        self.ttl = ttl
+        self.revalidations = 0
+        self._memory = {}
+
+    def get(self, key: str):
+        """
+        Return the cached entry for ``key`` or ``None`` on a miss. Entries
+        are dicts with the ``data``, ``etag``, ``last_modified`` and
+        ``fetched`` time of the document.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            with self._lock:
+                self.hits += 1
+            return entry
+        entry = super().get(key)
+        if entry is not None:
+            self._memory[key] = entry
+        return entry
+
+    def set(self, key: str, entry: dict):
+        self._memory[key] = entry
+        super().set(key, entry)
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Whether ``entry`` can be used without revalidating it."""
+        return self.ttl is not None and time.time() - entry["fetched"] < self.ttl
+
+    def headers(self, entry: dict) -> dict:
+        """Conditional request headers that revalidate ``entry``."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, key: str, entry: dict) -> dict:
+        """Record that the server confirmed that ``entry`` is unchanged."""
+        entry = dict(entry, fetched=time.time())
+        with self._lock:
+            self.revalidations += 1
+        self.set(key, entry)
+        return entry
+
+    def clear(self):
+        self._memory.clear()
+        super().clear()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            stats["revalidations"] = self.revalidations
+        return stats
+
+
+class DocumentCache:
+    """
+    In-memory LRU cache of API response bodies, keyed by
+    ``(model_pk, endpoint)``. Documents of simulations that are still running
+    expire after ``ttl`` seconds. Documents that are marked as final, because
+    their simulation has completed, never change and are kept until the
+    cache has to make room.
+
+    Parameters
+    ----------
+    ttl: float
+        Seconds that a document which is not final is used for.
+
+    max_size: int
+        Maximum total size of the cached documents in bytes. Documents that
+        are larger are not cached.
+    """
+
+    def __init__(self, ttl: float = 10.0, max_size: int = 2**27):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(ttl={self.ttl}, max_size={self.max_size})"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return the cached document for ``key`` or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                data, expires = entry
+                if expires is None or time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return data
+                del self._entries[key]
+                self.size -= len(data)
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, data: bytes, final: bool = False):
+        """Cache ``data`` and evict the least recently used documents."""
+        expires = None if final else time.monotonic() + self.ttl
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            if len(data) > self.max_size or not (final or self.ttl > 0):
+                return
+            self._entries[key] = (data, expires)
+            self.size += len(data)
+            while self.size > self.max_size:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
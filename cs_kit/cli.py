@@ -1,11 +1,10 @@
 from pathlib import Path
 import argparse
 from getpass import getpass
+import os
 
 import requests
 
-from cs_kit import buildpacks
-
 functionstemplate = """# Write or import your Compute Studio functions here.
 
 
@@ -120,7 +119,7 @@ def cs_token(subparsers: argparse._SubParsersAction = None):
     parser.add_argument(
         "--host",
         help="Use another Compute Studio host besides https://compute.studio",
-        default="https://compute.studio",
+        default=os.environ.get("CS_HOST", "https://compute.studio"),
     )
     if subparsers is None:
         args = parser.parse_args()
@@ -131,12 +130,19 @@ def cs_token(subparsers: argparse._SubParsersAction = None):
         )
 
 
+def _build_env(args):
+    # Imported here so that other commands do not load yaml.
+    from cs_kit import buildpacks
+
+    buildpacks.build_env()
+
+
 def build_env(subparsers: argparse._SubParsersAction):
     parser = subparsers.add_parser(
         "build-env",
         description="Build packages for Compute Studio app using available configuration files.",
     )
-    parser.set_defaults(func=lambda args: buildpacks.build_env())
+    parser.set_defaults(func=_build_env)
 
 
 def cli():
@@ -0,0 +1,307 @@
+"""
+Compare the table outputs of many simulations, e.g. reforms against a
+baseline, with vectorized NumPy operations.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+import warnings
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ("count", "mean", "std", "min", "max")
+
+
+class _RunningStats:
+    """
+    Element-wise count, mean, variance, min and max of a stream of arrays
+    with the same shape, updated with Welford's algorithm. ``NaN`` values
+    are skipped.
+    """
+
+    def __init__(self, shape):
+        self.count = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.nan)
+        self.max = np.full(shape, np.nan)
+
+    def update(self, values: np.ndarray):
+        seen = ~np.isnan(values)
+        self.count += seen
+        delta = np.where(seen, values - self.mean, 0.0)
+        self.mean += np.divide(
+            delta, self.count, out=np.zeros_like(delta), where=self.count > 0
+        )
+        self.m2 += np.where(seen, delta * (values - self.mean), 0.0)
+        self.min = np.fmin(self.min, values)
+        self.max = np.fmax(self.max, values)
+
+    def result(self) -> Dict[str, np.ndarray]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self.m2 / (self.count - 1))
+        std[self.count < 2] = np.nan
+        mean = np.where(self.count > 0, self.mean, np.nan)
+        return {
+            "count": self.count,
+            "mean": mean,
+            "std": std,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+def pct_change(values: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """
+    ``(values - base) / base``, broadcast over leading axes of ``values``,
+    with ``NaN`` where ``base`` is zero.
+    """
+    base = np.broadcast_to(base, values.shape)
+    out = np.full(values.shape, np.nan)
+    return np.divide(values - base, base, out=out, where=base != 0)
+
+
+class _Table:
+    """Layout of one output title and what has been collected for it."""
+
+    def __init__(self, frame: "pd.DataFrame"):
+        self.index = frame.index
+        self.columns = frame.columns
+        self.stats = {}
+        self.model_pks = []
+        self.arrays = []
+
+    def align(self, frame: "pd.DataFrame") -> np.ndarray:
+        return frame.reindex(index=self.index, columns=self.columns).to_numpy(
+            dtype=float, na_value=np.nan
+        )
+
+    def frame(self, data: np.ndarray, model_pks: List[int]) -> "pd.DataFrame":
+        """Stack ``data`` with shape (simulations, rows, columns) into a frame."""
+        index = pd.MultiIndex.from_product(
+            [model_pks, self.index],
+            names=["model_pk"] + [name for name in self.index.names],
+        )
+        return pd.DataFrame(
+            data.reshape(-1, len(self.columns)), index=index, columns=self.columns
+        )
+
+
+class ResultComparison:
+    """
+    Aligns the table outputs that have the same title across simulations
+    and compares them element-wise. Simulations are added one at a time, so
+    only the numeric values of the compared tables are kept, never the full
+    outputs of every simulation; with ``keep=False`` only running summary
+    statistics are kept and memory does not grow with the number of
+    simulations.
+
+    Tables are aligned on their index and numeric columns. The layout of
+    each title is taken from the baseline, or else from the first
+    simulation that has it; rows and columns that other simulations lack
+    are ``NaN`` and extra ones are dropped.
+
+    .. code-block:: python
+
+        comparison = client.compare(reform_pks, baseline=baseline_pk)
+        comparison.diff("Aggregate Results")  # indexed by (model_pk, row)
+        comparison.summary("Aggregate Results", of="pct_change")
+
+    Parameters
+    ----------
+    baseline: Mapping
+        Outputs of the simulation that the others are compared against.
+
+    outputs: list
+        Titles of the outputs to compare. Defaults to all table outputs.
+
+    index: str or list
+        Columns used as the row labels of each table instead of its position,
+        e.g. a column with the name of each row.
+
+    keep: bool
+        Keep the aligned values of every simulation, which :meth:`stack`,
+        :meth:`diff` and :meth:`pct_change` need. Otherwise, only the
+        statistics for :meth:`summary` are kept.
+    """
+
+    def __init__(
+        self,
+        baseline: Optional[Mapping] = None,
+        outputs: Optional[Iterable[str]] = None,
+        index: Optional[Union[str, List[str]]] = None,
+        keep: bool = True,
+    ):
+        self.outputs = list(outputs) if outputs is not None else None
+        self.index = index
+        self.keep = keep
+        self.errors = {}
+        self._tables: Dict[str, _Table] = {}
+        self._baseline = {}
+        if baseline is not None:
+            for title, frame in self._frames(baseline):
+                table = self._tables[title] = _Table(frame)
+                self._baseline[title] = table.align(frame)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.titles})"
+
+    @property
+    def titles(self) -> List[str]:
+        return list(self._tables)
+
+    def _frames(self, results: Mapping):
+        titles = self.outputs if self.outputs is not None else list(results)
+        for title in titles:
+            if title not in results:
+                continue
+            frame = results[title]
+            if not isinstance(frame, pd.DataFrame):
+                continue
+            if self.index is not None:
+                frame = frame.set_index(self.index)
+            yield title, frame.select_dtypes("number")
+
+    def add(self, model_pk: int, results: Mapping):
+        """Add the outputs of a simulation, e.g. from ``client.results``."""
+        for title, frame in self._frames(results):
+            table = self._tables.get(title)
+            if table is None:
+                table = self._tables[title] = _Table(frame)
+            values = table.align(frame)
+            kinds = {"value": values}
+            base = self._baseline.get(title)
+            if base is not None:
+                kinds["diff"] = values - base
+                kinds["pct_change"] = pct_change(values, base)
+            for kind, data in kinds.items():
+                if kind not in table.stats:
+                    table.stats[kind] = _RunningStats(data.shape)
+                table.stats[kind].update(data)
+            table.model_pks.append(model_pk)
+            if self.keep:
+                table.arrays.append(values)
+
+    def _reorder(self, model_pks: List[int]):
+        """Sort the collected simulations into the order of ``model_pks``."""
+        order = {model_pk: i for i, model_pk in enumerate(model_pks)}
+        for table in self._tables.values():
+            positions = sorted(
+                range(len(table.model_pks)), key=lambda i: order[table.model_pks[i]]
+            )
+            table.model_pks = [table.model_pks[i] for i in positions]
+            if table.arrays:
+                table.arrays = [table.arrays[i] for i in positions]
+
+    def _table(self, title: str) -> _Table:
+        if title not in self._tables:
+            raise KeyError(f"No table output titled {title!r} was compared.")
+        return self._tables[title]
+
+    def arrays(self, title: str) -> np.ndarray:
+        """
+        Values of ``title`` for every simulation as an array with shape
+        (simulations, rows, columns), in the order of ``model_pks(title)``.
+        """
+        table = self._table(title)
+        if not self.keep:
+            raise ValueError("Values are only kept if the comparison has keep=True.")
+        if not table.arrays:
+            return np.empty((0, len(table.index), len(table.columns)))
+        return np.stack(table.arrays)
+
+    def model_pks(self, title: str) -> List[int]:
+        """IDs of the simulations that have ``title``, in the order they were added."""
+        return list(self._table(title).model_pks)
+
+    def baseline(self, title: str) -> "pd.DataFrame":
+        table = self._table(title)
+        if title not in self._baseline:
+            raise ValueError(f"There is no baseline for {title!r}.")
+        return pd.DataFrame(
+            self._baseline[title], index=table.index, columns=table.columns
+        )
+
+    def stack(self, title: str) -> "pd.DataFrame":
+        """Values of ``title`` for every simulation, indexed by ``(model_pk, row)``."""
+        return self._table(title).frame(self.arrays(title), self.model_pks(title))
+
+    def diff(self, title: str) -> "pd.DataFrame":
+        """Difference from the baseline, indexed by ``(model_pk, row)``."""
+        base = self.baseline(title).to_numpy()
+        return self._table(title).frame(
+            self.arrays(title) - base, self.model_pks(title)
+        )
+
+    def pct_change(self, title: str) -> "pd.DataFrame":
+        """
+        Relative change from the baseline, ``(value - baseline) / baseline``,
+        indexed by ``(model_pk, row)``.
+        """
+        base = self.baseline(title).to_numpy()
+        return self._table(title).frame(
+            pct_change(self.arrays(title), base), self.model_pks(title)
+        )
+
+    def summary(self, title: str, of: str = "value") -> "pd.DataFrame":
+        """
+        Element-wise statistics across simulations, indexed by
+        ``(statistic, row)`` for the statistics in ``STATISTICS``.
+
+        Parameters
+        ----------
+        title: str
+            Title of the output.
+
+        of: str
+            ``"value"``, or ``"diff"`` or ``"pct_change"`` to summarize the
+            changes from the baseline.
+        """
+        table = self._table(title)
+        if of not in ("value", "diff", "pct_change"):
+            raise ValueError(f"of must be 'value', 'diff' or 'pct_change', not {of!r}.")
+        if of != "value" and title not in self._baseline:
+            raise ValueError(f"There is no baseline for {title!r}.")
+        if of not in table.stats:
+            table.stats[of] = _RunningStats((len(table.index), len(table.columns)))
+        result = table.stats[of].result()
+        data = np.stack([result[stat] for stat in STATISTICS])
+        return table.frame(data, list(STATISTICS)).rename_axis(
+            index={"model_pk": "statistic"}
+        )
+
+
+def compare_results(
+    client,
+    model_pks: Iterable[int],
+    baseline: Optional[int] = None,
+    outputs: Optional[Iterable[str]] = None,
+    index: Optional[Union[str, List[str]]] = None,
+    keep: bool = True,
+    max_workers: Optional[int] = None,
+    timeout: Optional[int] = 600,
+    polling_policy=None,
+) -> ResultComparison:
+    """See :meth:`ComputeStudio.compare`."""
+    base = None
+    if baseline is not None:
+        base = client.results(baseline, timeout=timeout, polling_policy=polling_policy)
+    comparison = ResultComparison(base, outputs=outputs, index=index, keep=keep)
+    del base
+    model_pks = list(model_pks)
+    finished = {}
+    for res in client.results_many(
+        model_pks,
+        max_workers=max_workers,
+        timeout=timeout,
+        polling_policy=polling_policy,
+    ):
+        if res.error is not None:
+            warnings.warn(f"Simulation {res.model_pk} failed: {res.error}")
+            comparison.errors[res.model_pk] = res.error
+            continue
+        finished[res.index] = res.model_pk
+        comparison.add(res.model_pk, res.result)
+    # Results arrive in the order the simulations finish.
+    comparison._reorder([finished[index] for index in sorted(finished)])
+    return comparison
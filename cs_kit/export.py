@@ -0,0 +1,220 @@
+"""
+Export simulation outputs to a Parquet dataset that can be queried
+out-of-core with pyarrow or pandas.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import quote
+
+from cs_kit.batch import BatchResult
+from cs_kit.submissions import canonical_json
+
+
+def metadata_columns(inputs: dict) -> Dict[str, object]:
+    """
+    Flatten the adjustment and meta parameters of a simulation into columns.
+    Parameters with a single unlabeled value become ``adjustment.section.param``
+    columns holding that value; other parameters hold their value list as
+    JSON. The full adjustment is kept as JSON in the ``adjustment`` column.
+
+    Numbers are always floats, so that a column has the same type in every
+    simulation, e.g. when one simulation sets a rate to ``0`` and another to
+    ``0.1``.
+    """
+    adjustment = inputs.get("adjustment") or {}
+    columns = {"adjustment": canonical_json(adjustment)}
+    for section, params in adjustment.items():
+        for param, values in (params or {}).items():
+            columns[f"adjustment.{section}.{param}"] = _scalar(values, unwrap=True)
+    for name, value in (inputs.get("meta_parameters") or {}).items():
+        columns[f"meta_parameters.{name}"] = _scalar(value)
+    return columns
+
+
+def _scalar(value, unwrap=False):
+    if (
+        unwrap
+        and isinstance(value, list)
+        and len(value) == 1
+        and isinstance(value[0], dict)
+        and list(value[0]) == ["value"]
+    ):
+        value = value[0]["value"]
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return canonical_json(value)
+
+
+class ParquetExporter:
+    """
+    Writes the CSV outputs of simulations to a Parquet dataset with one file
+    per simulation and output, using Hive-style partitioning:
+
+    .. code-block:: text
+
+        path/model_pk=1234/output=Aggregate%20Results/part-0.parquet
+
+    Each file has the columns of the output table followed by the
+    simulation's adjustment and meta parameters (see
+    :func:`metadata_columns`). Files are written atomically, so the dataset
+    can be read while simulations are still being added, and exporting a
+    simulation again replaces its files.
+
+    Simulations that adjust different parameters have different columns.
+    :meth:`dataset` and :meth:`schema` merge the columns of all files; pass
+    the schema on when reading the dataset with other tools, since they
+    take the columns of the first file:
+
+    .. code-block:: python
+
+        import pandas as pd
+
+        df = pd.read_parquet(
+            path,
+            schema=exporter.schema(),
+            filters=[("output", "=", "Aggregate Results")],
+        )
+
+    Parameters
+    ----------
+    path: str or Path
+        Root directory of the dataset.
+
+    column_types: dict
+        Arrow types of output columns, passed to ``pyarrow.csv``. Set these if
+        a column's inferred type can differ between simulations.
+    """
+
+    def __init__(self, path: Union[str, Path], column_types: Optional[dict] = None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Install pyarrow to export outputs as Parquet.")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.column_types = column_types
+
+    def __repr__(self):
+        return f"{type(self).__name__}(path={str(self.path)!r})"
+
+    def partition(self, model_pk: int, title: str) -> Path:
+        return self.path / f"model_pk={model_pk}" / f"output={quote(title, safe='')}"
+
+    def write(
+        self, model_pk: int, outputs, inputs: Optional[dict] = None
+    ) -> List[Path]:
+        """
+        Write the CSV outputs of a simulation.
+
+        Parameters
+        ----------
+        model_pk: int
+            ID for the simulation.
+
+        outputs: Outputs or list
+            Outputs from :meth:`ComputeStudio.results` or the
+            ``outputs.downloadable`` list from the server.
+
+        inputs: dict
+            Inputs of the simulation from :meth:`ComputeStudio.inputs`.
+
+        Returns
+        -------
+        paths: list
+            The files that were written.
+        """
+        import pyarrow as pa
+        from pyarrow import csv
+        import pyarrow.parquet as pq
+
+        if hasattr(outputs, "raw"):
+            outputs = [outputs.raw(title) for title in outputs]
+        metadata = metadata_columns(inputs or {})
+        convert_options = csv.ConvertOptions(column_types=self.column_types or {})
+        paths = []
+        for output in outputs:
+            if output["media_type"] != "CSV":
+                continue
+            table = csv.read_csv(
+                io.BytesIO(output["data"].encode("utf-8")),
+                convert_options=convert_options,
+            )
+            for name, value in metadata.items():
+                table = table.append_column(name, pa.array([value] * table.num_rows))
+            directory = self.partition(model_pk, output["title"])
+            directory.mkdir(parents=True, exist_ok=True)
+            # Readers of the dataset skip files that start with a dot.
+            tmp = directory / f".part-0.parquet.{os.getpid()}.tmp"
+            pq.write_table(table, tmp)
+            dest = directory / "part-0.parquet"
+            os.replace(tmp, dest)
+            paths.append(dest)
+        return paths
+
+    def schema(self):
+        """
+        Schema with the columns of every file in the dataset, where columns
+        that a file does not have are read as nulls.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(self.path, format="parquet", partitioning="hive")
+        return pa.unify_schemas(
+            [dataset.schema]
+            + [fragment.physical_schema for fragment in dataset.get_fragments()]
+        )
+
+    def dataset(self):
+        """The exported outputs as a ``pyarrow.dataset.Dataset``."""
+        import pyarrow.dataset as ds
+
+        return ds.dataset(
+            self.path, schema=self.schema(), format="parquet", partitioning="hive"
+        )
+
+
+def export_parquet(
+    client,
+    model_pks: Iterable[int],
+    path: Union[str, Path],
+    max_workers: Optional[int] = None,
+    timeout: Optional[int] = 600,
+    polling_policy=None,
+    column_types: Optional[dict] = None,
+) -> Iterator[BatchResult]:
+    """See :meth:`ComputeStudio.export_parquet`."""
+    exporter = ParquetExporter(path, column_types=column_types)
+    max_workers = max_workers or client.pool_maxsize
+
+    def write(res: BatchResult) -> BatchResult:
+        try:
+            inputs = client.inputs(res.model_pk)
+            paths = exporter.write(res.model_pk, res.result, inputs)
+        except Exception as e:
+            return res._replace(result=None, error=e)
+        return res._replace(result=paths)
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        jobs = []
+        for res in client.results_many(
+            model_pks,
+            max_workers=max_workers,
+            timeout=timeout,
+            polling_policy=polling_policy,
+        ):
+            if res.error is not None:
+                yield res
+                continue
+            jobs.append(pool.submit(write, res))
+            # Hand back the simulations that are already on disk.
+            while jobs and jobs[0].done():
+                yield jobs.pop(0).result()
+        for job in jobs:
+            yield job.result()
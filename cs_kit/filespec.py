@@ -1,4 +1,7 @@
 import json
+import os
+from urllib.parse import quote
+import warnings
 
 from fsspec.spec import AbstractFileSystem
 from fsspec.registry import register_implementation
@@ -6,8 +9,281 @@ from fsspec.utils import infer_storage_options
 from fsspec.implementations.memory import MemoryFile
 import requests
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class CSFileSystem(AbstractFileSystem):
+from cs_kit.api import ComputeStudio
+from cs_kit.cache import DocumentCache
+from cs_kit.hedging import HedgingPolicy
+from cs_kit.instrumentation import TERMINAL_STATUSES, url_template
+
+# Endpoint under the simulation's URL that serves each top-level resource.
+ENDPOINTS = {
+    None: "remote/",
+    "inputs": "edit/",
+    "outputs": "",
+    "owner": "",
+    "title": "",
+}
+
+
+def loads(body):
+    """Decode a JSON document, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def dumps(value):
+    """
+    Encode ``value`` as compact UTF-8 JSON. orjson writes the bytes directly
+    instead of building a ``str`` first; the fallback writes the same bytes,
+    so sizes and byte ranges do not depend on whether orjson is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def cache_response(cache, model_pk, endpoint, status_code, body):
+    """
+    Cache the body of a response of ``endpoint``. It is final, and never
+    expires, once the simulation, or the validation of its inputs, has
+    completed.
+
+    Telling whether inputs are final means decoding them; the decoded
+    document is returned so that it is not decoded again. Bodies that are too
+    large to be cached are not decoded.
+    """
+    final, doc = False, None
+    if len(body) <= cache.max_size:
+        if endpoint == "edit/":
+            try:
+                doc = loads(body)
+            except ValueError:
+                pass
+            final = isinstance(doc, dict) and doc.get("status") in TERMINAL_STATUSES
+        else:
+            # The server answers 202 until the simulation has completed.
+            final = status_code == 200
+    cache.set((model_pk, endpoint), body, final=final)
+    return doc
+
+
+def output_name(output):
+    """
+    File name of an output: its title with the extension of its media type,
+    e.g. ``Aggregate Results.csv``.
+    """
+    ext = os.path.splitext(output.get("filename") or "")[1]
+    if not ext:
+        # cs-storage is only needed to look up the extension.
+        from cs_storage import get_serializer
+
+        try:
+            ext = "." + get_serializer(output["media_type"]).ext
+        except KeyError:
+            ext = ""
+    return quote(output["title"], safe=" ") + ext
+
+
+def output_bytes(output):
+    """
+    The raw bytes of an output, as cs-storage would write them to a file:
+    text as UTF-8 and images and other binary outputs decoded from base64.
+    """
+    from cs_storage import get_serializer
+
+    data = output["data"]
+    try:
+        serializer = get_serializer(output["media_type"])
+    except KeyError:
+        serializer = None
+    if serializer is not None:
+        return serializer.serialize(data)
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return dumps(data)
+
+
+class SimulationTree:
+    """
+    Directory tree of one simulation, read from its documents.
+    ``fetch(endpoint)`` returns the body of an endpoint under the
+    simulation's URL, see ``ENDPOINTS``, and the decoded document if it is
+    already at hand, or ``None``. Each body is decoded at most once, and not
+    at all if it is read whole. The raw bytes of outputs are kept in
+    ``cache``, so that ranged reads of an output only decode it once.
+    """
+
+    def __init__(self, model_pk, sim_url, fetch, cache=None):
+        self.model_pk = model_pk
+        self.sim_url = sim_url
+        self.fetch = fetch
+        self.cache = cache
+        self.docs = {}
+
+    def body(self, endpoint):
+        body, doc = self.fetch(endpoint)
+        if doc is not None:
+            self.docs[endpoint] = doc
+        return body
+
+    def load(self, resource):
+        """The decoded document that serves a top-level resource."""
+        endpoint = ENDPOINTS[resource]
+        if endpoint not in self.docs:
+            body = self.body(endpoint)
+            if endpoint not in self.docs:
+                self.docs[endpoint] = loads(body)
+        return self.docs[endpoint]
+
+    def _outputs(self, path):
+        outputs = self.load("outputs").get("outputs")
+        if not outputs:
+            # The simulation has not finished yet.
+            raise FileNotFoundError(path)
+        return outputs["downloadable"]
+
+    def value(self, parts, path):
+        """The data at ``parts``, which reads return as JSON."""
+        resource = parts[0] if parts else None
+        if resource not in ENDPOINTS:
+            raise FileNotFoundError(path)
+        if resource == "inputs":
+            result = self.load(resource)
+            for key in parts[1:]:
+                if not isinstance(result, dict) or key not in result:
+                    raise FileNotFoundError(path)
+                result = result[key]
+            return result
+        if resource == "outputs":
+            outputs = self._outputs(path)
+            if len(parts) == 1:
+                return outputs
+            for output in outputs:
+                if len(parts) == 2 and output_name(output) == parts[1]:
+                    return output
+            raise FileNotFoundError(path)
+        if len(parts) > 1:
+            raise FileNotFoundError(path)
+        data = self.load(resource)
+        if resource is None:
+            return dict(data, outputs=self.sim_url)
+        return {resource: data[resource]}
+
+    def children(self, parts, path):
+        """
+        Names of the entries under ``parts`` if it is a directory, or
+        ``None`` if it is a file.
+        """
+        if not parts:
+            return ["inputs", "outputs", "owner", "title"]
+        if parts == ["inputs"]:
+            return list(self.load("inputs"))
+        if parts == ["inputs", "adjustment"]:
+            return list(self.value(parts, path) or {})
+        if parts == ["outputs"]:
+            return [output_name(output) for output in self._outputs(path)]
+        # Raises FileNotFoundError if there is no such file.
+        self.value(parts, path)
+        return None
+
+    @staticmethod
+    def is_output(parts):
+        return len(parts) == 2 and parts[0] == "outputs"
+
+    def read(self, parts, path):
+        """
+        Contents of a file: the raw bytes of an output, and JSON for
+        everything else.
+        """
+        if parts == ["inputs"]:
+            # The whole document: pass the response through as is.
+            return self.body(ENDPOINTS["inputs"])
+        if not self.is_output(parts):
+            return dumps(self.value(parts, path))
+        key = (self.model_pk, "/".join(parts))
+        data = self.cache.get(key) if self.cache is not None else None
+        if data is None:
+            data = output_bytes(self.value(parts, path))
+            if self.cache is not None:
+                # Outputs only exist once the simulation has completed.
+                self.cache.set(key, data, final=True)
+        return data
+
+    def info(self, parts, path):
+        name = "/".join([str(self.model_pk)] + parts)
+        if self.children(parts, path) is not None:
+            return {"name": name, "size": 0, "type": "directory"}
+        info = {"name": name, "size": len(self.read(parts, path)), "type": "file"}
+        if self.is_output(parts):
+            info["media_type"] = self.value(parts, path)["media_type"]
+        return info
+
+    def ls(self, parts, path, detail=True):
+        children = self.children(parts, path)
+        if children is None:
+            entries = [self.info(parts, path)]
+        else:
+            entries = [self.info(parts + [child], path) for child in children]
+        if detail:
+            return entries
+        return [entry["name"] for entry in entries]
+
+
+class CSPaths:
+    """
+    URL and path handling shared by :class:`CSFileSystem` and
+    :class:`cs_kit.async_filespec.AsyncCSFileSystem`.
+    """
+
+    host = ComputeStudio.host
+    url = "{host}/{owner}/{title}/api/v1/{model_pk}/"
+    # Parts that paths without a simulation ID are relative to.
+    prefix = ()
+
+    get_host = ComputeStudio.get_host
+
+    @classmethod
+    def _strip_protocol(cls, path):
+        opts = infer_storage_options(path)
+        if "username" not in opts:
+            return super()._strip_protocol(path)
+        return (opts["host"] + opts["path"]).rstrip("/")
+
+    @staticmethod
+    def _get_kwargs_from_urls(path):
+        opts = infer_storage_options(path)
+        return {"owner": opts["username"], "title": opts["password"]}
+
+    def _parse(self, path):
+        """Split ``path`` into the simulation ID and the parts below it."""
+        parts = [part for part in self._strip_protocol(path).split("/") if part]
+        if parts and parts[0].isdigit():
+            return int(parts[0]), parts[1:]
+        if self.model_pk is None:
+            raise FileNotFoundError(path)
+        return int(self.model_pk), list(self.prefix) + parts
+
+    def sim_url(self, model_pk):
+        return self.url.format(
+            host=self.host, owner=self.owner, title=self.title, model_pk=model_pk
+        )
+
+    def _open(self, path, mode="rb", block_size=None, **kwargs):
+        if mode != "rb":
+            raise NotImplementedError
+        # The contents are resolved once and kept by the file, so reading it
+        # in blocks does not download the document again, even if it does not
+        # fit in the cache. Directories of the tree can be read as well, as
+        # the JSON of everything below them.
+        return MemoryFile(None, None, self.cat_file(path))
+
+
+class CSFileSystem(CSPaths, AbstractFileSystem):
     """
     Interface to data on Compute Studio
 
@@ -19,6 +295,7 @@ class CSFileSystem(AbstractFileSystem):
     - cs://owner:title@model-pk/input/adjustment/section : get specific section of adjustment
     - cs://owner:title@model-pk/input/meta_parameters : get meta_parameters
     - cs://owner:title@model-pk/outputs : get outputs from reform
+    - cs://owner:title@model-pk/outputs/output-title.csv : get the raw data of one output
     - cs://owner:title@model-pk/owner : get owner of simulation
     - cs://owner:title@model-pk/title : get title of simulation
 
@@ -28,106 +305,131 @@ class CSFileSystem(AbstractFileSystem):
     with fsspec.open("cs://PSLmodels:Tax-Brain@1234", api_token=api_token) as f:
         result = f.read()
 
+    Requests go to https://compute.studio unless another host is passed as
+    the ``host`` storage option or set in the CS_HOST environment variable.
+    Pass ``hedging=True``, or a :class:`~cs_kit.hedging.HedgingPolicy`, to
+    send a second request when a read is slower than usual.
+
+    One filesystem instance serves all simulations of an app, and paths are
+    relative to the app: ``1234/inputs/adjustment``. Each response is cached
+    by simulation and endpoint, so opening several paths under the inputs
+    of a simulation downloads them once. Responses of completed simulations
+    never change and are kept until the cache is full; others are refreshed
+    after ``cache_ttl`` seconds. Set ``cache_max_size=0`` to disable the
+    cache.
+
+    The paths of a simulation form a directory tree, so ``ls``, ``info``,
+    ``glob``, ``walk`` and ``cat`` work as on any other filesystem:
+
+    .. code-block:: python
+
+        fs = fsspec.filesystem("cs", owner="PSLmodels", title="Tax-Brain")
+        fs.ls("1234/inputs/adjustment")  # one file per section
+        fs.glob("1234/outputs/*")
+
+    ``inputs``, ``inputs/adjustment`` and ``outputs`` are directories that
+    can also be read as a whole, and ``info`` reports the size in bytes of
+    every file.
+
+    Each output is a file named after its title and media type, e.g.
+    ``outputs/Aggregate Results.csv``, that holds its raw data. Opened files
+    can be seeked and read in blocks, so they can be passed to readers
+    directly:
+
+    .. code-block:: python
+
+        df = pd.read_csv("cs://PSLmodels:Tax-Brain@1234/outputs/Aggregate Results.csv")
+
     Modified version of the GitHub fsspec implementation:
     - https://filesystem-spec.readthedocs.io/en/latest/api.html#id0
     """
 
-    url = "https://compute.studio/{owner}/{title}/api/v1/{model_pk}/"
     protocol = "cs"
 
     def __init__(
         self,
         owner,
         title,
-        model_pk,
+        model_pk=None,
+        api_token=None,
+        host=None,
+        hedging=None,
+        cache_ttl=10.0,
+        cache_max_size=2**27,
         resource=None,
         field=None,
         section=None,
-        api_token=None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.owner = owner
         self.title = title
         self.model_pk = model_pk
-        self.resource = resource
-        self.field = field
-        self.section = section
         self.api_token = api_token
+        self.host = self.get_host(host)
+        prefix = tuple(part for part in (resource, field, section) if part)
+        if prefix:
+            # Filesystems used to be bound to one resource of one simulation.
+            warnings.warn(
+                "The resource, field and section arguments of CSFileSystem "
+                f"are deprecated; open the path {'/'.join(prefix)!r} instead.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            self.prefix = prefix
+        if hedging is True:
+            hedging = HedgingPolicy()
+        self.hedging = hedging or None
+        self.cache = DocumentCache(ttl=cache_ttl, max_size=cache_max_size)
+        self.session = requests.Session()
+        if api_token is not None:
+            self.session.headers["Authorization"] = f"Token {api_token}"
 
-    @classmethod
-    def _strip_protocol(cls, path):
-        opts = infer_storage_options(path)
-        if "username" not in opts:
-            return super()._strip_protocol(path)
-        return opts["path"].lstrip("/")
-
-    @staticmethod
-    def _get_kwargs_from_urls(path):
-        opts = infer_storage_options(path)
-        out = {"owner": opts["username"], "title": opts["password"]}
-        if opts["host"]:
-            out["model_pk"] = opts["host"]
-
-        path = opts["path"]
-        if len(path) > 0:
-            parts = path[1:].split("/")
+    def _fetch(self, model_pk, endpoint):
+        """
+        Body of ``endpoint`` under the simulation's URL, from the cache if
+        possible, and the decoded document if it had to be decoded; see
+        :func:`cache_response`.
+        """
+        body = self.cache.get((model_pk, endpoint))
+        if body is not None:
+            return body, None
+        url = self.sim_url(model_pk) + endpoint
+        if self.hedging is not None:
+            app_url = f"{self.host}/{self.owner}/{self.title}/api/v1/"
+            template, _ = url_template(app_url, url)
+            r, _, _ = self.hedging.call(
+                template,
+                lambda hedge: self.session.get(url),
+                discard=requests.Response.close,
+            )
         else:
-            parts = []
-
-        if len(parts) > 0 and parts[0] in ("inputs", "outputs", "owner", "title"):
-            out["resource"] = parts[0]
-
-        if len(parts) > 1 and parts[1] in ("adjustment", "meta_parameters", "title"):
-            out["field"] = parts[1]
-
-        if len(parts) > 2 and parts[1] == "adjustment":
-            out["section"] = parts[2]
-
-        return out
+            r = self.session.get(url)
+        if r.status_code == 404:
+            raise FileNotFoundError(url)
+        r.raise_for_status()
+        body = r.content
+        return body, cache_response(self.cache, model_pk, endpoint, r.status_code, body)
 
-    def _open(self, path, mode="rb", block_size=None, **kwargs):
-        if mode != "rb":
-            raise NotImplementedError
-        base_url = self.url.format(
-            owner=self.owner, title=self.title, model_pk=self.model_pk,
+    def _tree(self, model_pk):
+        return SimulationTree(
+            model_pk,
+            self.sim_url(model_pk),
+            lambda endpoint: self._fetch(model_pk, endpoint),
+            self.cache,
         )
 
-        if self.resource == "inputs":
-            url = base_url + "edit/"
-        elif self.resource is None:
-            url = base_url + "remote/"
-        else:
-            url = base_url
+    def info(self, path, **kwargs):
+        model_pk, parts = self._parse(path)
+        return self._tree(model_pk).info(parts, path)
 
-        if self.api_token is not None:
-            headers = {"Authorization": f"Token {self.api_token}"}
-        else:
-            headers = None
-
-        r = requests.get(url, headers=headers)
-        if r.status_code == 404:
-            raise FileNotFoundError(path)
-        r.raise_for_status()
+    def ls(self, path, detail=True, **kwargs):
+        model_pk, parts = self._parse(path)
+        return self._tree(model_pk).ls(parts, path, detail=detail)
 
-        data = r.json()
-        if self.resource == "inputs" and self.field is None:
-            result = data
-        elif self.resource == "inputs" and self.field != "adjustment":
-            result = data[self.field]
-        elif self.resource == "inputs" and self.field == "adjustment":
-            result = data[self.field]
-            if self.section is not None:
-                result = result[self.section]
-        elif self.resource == "outputs":
-            result = data["outputs"]["downloadable"]
-        elif self.resource in ("title", "owner"):
-            result = {self.resource: data[self.resource]}
-        elif self.resource is None:
-            result = dict(data, outputs=base_url)
-        else:
-            raise FileNotFoundError()
-        return MemoryFile(None, None, json.dumps(result).encode("utf-8"))
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        model_pk, parts = self._parse(path)
+        return self._tree(model_pk).read(parts, path)[start:end]
 
 
 register_implementation("cs", CSFileSystem)
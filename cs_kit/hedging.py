@@ -0,0 +1,202 @@
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+from cs_kit.instrumentation import LATENCY_BUCKETS, Histogram
+from cs_kit.ratelimit import endpoint_class
+
+T = TypeVar("T")
+
+
+class HedgingPolicy:
+    """
+    Hedged requests for idempotent ``GET`` requests: if a request has not
+    answered after the ``quantile`` of the latencies observed for its
+    endpoint, a second, identical request is sent. The first response to
+    arrive is used. The other request is cancelled if it has not been sent
+    yet; a request that is already in flight is left to finish, and its
+    response is then closed and discarded.
+
+    .. code-block:: python
+
+        client = ComputeStudio(
+            "PSLmodels", "Tax-Brain", hedging=HedgingPolicy(quantile=0.95)
+        )
+
+    Hedging trades a few extra requests for a shorter tail: with
+    ``quantile=0.95``, about one in twenty requests is sent twice.
+
+    Parameters
+    ----------
+    quantile: float
+        Quantile of the observed latencies after which a request is hedged.
+
+    endpoints: iterable
+        Endpoint classes that are hedged; see
+        :func:`cs_kit.ratelimit.endpoint_class`. By default, status polls and
+        downloads of results.
+
+    initial_delay: float
+        Delay used until ``min_samples`` latencies have been observed for an
+        endpoint.
+
+    min_samples: int
+        Number of latencies observed before the quantile is used.
+
+    min_delay, max_delay: float
+        Bounds on the delay before a hedge is sent.
+
+    max_workers: int
+        Number of threads that send hedges at once. Primary requests do not
+        wait for these threads.
+
+    buckets: tuple
+        Bounds of the latency histogram that the quantile is read from.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        endpoints: Iterable[str] = ("poll", "download"),
+        initial_delay: float = 1.0,
+        min_samples: int = 20,
+        min_delay: float = 0.01,
+        max_delay: float = 30.0,
+        max_workers: int = 32,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.quantile = quantile
+        self.endpoints = frozenset(endpoints)
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_workers = max_workers
+        self.latency: Dict[str, Histogram] = defaultdict(lambda: Histogram(buckets))
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(quantile={self.quantile}, "
+            f"endpoints={sorted(self.endpoints)})"
+        )
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="cs-kit-hedge"
+                )
+            return self._executor
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def applies(self, method: str, url: str) -> bool:
+        """Whether requests to the URL template ``url`` are hedged."""
+        return method == "GET" and endpoint_class(method, url) in self.endpoints
+
+    def observe(self, url: str, latency: float):
+        with self._lock:
+            self.latency[url].observe(latency)
+
+    def delay(self, url: str) -> float:
+        """Seconds to wait for a request to ``url`` before hedging it."""
+        with self._lock:
+            hist = self.latency.get(url)
+            if hist is None or hist.count < self.min_samples:
+                delay = self.initial_delay
+            else:
+                delay = hist.quantile(self.quantile)
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def call(
+        self,
+        url: str,
+        send: Callable[[bool], T],
+        discard: Optional[Callable[[T], None]] = None,
+    ) -> Tuple[T, bool, bool]:
+        """
+        Call ``send(False)`` and, if it has not returned after
+        :meth:`delay`, ``send(True)`` as well.
+
+        The primary request starts right away on a thread of its own, so the
+        delay only counts the time it has been running. Only hedges use the
+        bounded executor, so they never queue behind primary requests.
+
+        Parameters
+        ----------
+        url: str
+            URL template used to look up the latency of the endpoint.
+
+        send: callable
+            Makes the request. It is called with ``True`` for the hedge.
+
+        discard: callable
+            Called with the result of the request that lost the race, e.g. to
+            close its connection.
+
+        Returns
+        -------
+        result: tuple
+            The first result, whether a hedge was sent and whether the hedge
+            won.
+        """
+
+        def attempt(hedge):
+            start = time.perf_counter()
+            result = send(hedge)
+            self.observe(url, time.perf_counter() - start)
+            return result
+
+        primary = Future()
+        primary.set_running_or_notify_cancel()
+        threading.Thread(
+            target=_run,
+            args=(primary, attempt, False),
+            name="cs-kit-request",
+            daemon=True,
+        ).start()
+        done, _ = wait([primary], timeout=self.delay(url))
+        if done:
+            return primary.result(), False, False
+        hedge = self.executor.submit(attempt, True)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    _cancel(loser, discard)
+                return future.result(), True, future is hedge
+        raise error
+
+
+def _run(future, func, *args):
+    try:
+        result = func(*args)
+    except BaseException as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+def _cancel(future, discard):
+    if future.cancel() or discard is None:
+        return
+
+    def _discard(future):
+        if not future.cancelled() and future.exception() is None:
+            discard(future.result())
+
+    future.add_done_callback(_discard)
@@ -0,0 +1,372 @@
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+import re
+import threading
+import time
+import warnings
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(2**exp for exp in range(10, 31, 2))
+POLL_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Number of finished simulations that are remembered, so that observing one
+# again is not reported as a new status.
+FINISHED_SIMULATIONS = 1024
+# Endpoints that report the status of a simulation.
+_POLL_ENDPOINTS = ("/{model_pk}/", "/{model_pk}/edit/", "/{model_pk}/remote/")
+
+TERMINAL_STATUSES = ("SUCCESS", "FAIL", "WORKER_FAILURE")
+
+_MODEL_PK = re.compile(r"^(\d+)/")
+
+
+class RequestEvent(NamedTuple):
+    """
+    Fired after every HTTP request. ``url`` is a template of the request path
+    such as ``/{owner}/{title}/api/v1/{model_pk}/remote/`` so that events can
+    be aggregated across simulations. ``attempt`` counts the retries that
+    happened inside the request, starting at 1. ``status`` is ``None`` and
+    ``error`` is set if the request failed without a response. ``hedged`` is
+    set if a second, hedged request was sent and ``hedge_won`` if its
+    response was the one used; ``latency`` covers both.
+    """
+
+    method: str
+    url: str
+    status: Optional[int]
+    latency: float
+    bytes: int
+    attempt: int
+    model_pk: Optional[int] = None
+    error: Optional[Exception] = None
+    hedged: bool = False
+    hedge_won: bool = False
+
+
+class StateChangeEvent(NamedTuple):
+    """
+    Fired when the client observes a new status for a simulation. ``stage`` is
+    ``"inputs"`` while the inputs are being validated and ``"simulation"``
+    for the model run.
+    """
+
+    model_pk: int
+    stage: str
+    previous: Optional[str]
+    status: str
+    timestamp: float
+
+
+Hook = Callable[[object], None]
+
+
+def url_template(sim_url: str, url: str) -> Tuple[str, Optional[int]]:
+    """
+    Split ``url`` into a path template and the simulation ID that it refers
+    to, if any.
+    """
+    if not url.startswith(sim_url):
+        return url, None
+    rest = url[len(sim_url) :]
+    model_pk = None
+    match = _MODEL_PK.match(rest)
+    if match is not None:
+        model_pk = int(match.group(1))
+        rest = "{model_pk}/" + rest[match.end() :]
+    return "/{owner}/{title}/api/v1/" + rest, model_pk
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket that contains quantile ``q``, or ``None``
+        if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsCollector:
+    """
+    Hook that aggregates request and simulation events into histograms and
+    counters.
+
+    .. code-block:: python
+
+        metrics = MetricsCollector()
+        client = ComputeStudio("PSLmodels", "Tax-Brain", hooks=[metrics])
+        client.results(1234)
+        print(metrics.to_prometheus())
+
+    Metrics are labelled by HTTP method and URL template:
+
+    - ``request_duration_seconds``: histogram of request latency.
+    - ``response_size_bytes``: histogram of response body sizes.
+    - ``requests_total``: requests by status code.
+    - ``retries_total``: retries that happened inside requests.
+    - ``request_errors_total``: requests that failed without a response.
+    - ``hedges_total``: hedged requests that were sent.
+    - ``hedge_wins_total``: hedged requests that answered first.
+    - ``state_changes_total``: observed simulation statuses by stage.
+    - ``polls_per_simulation``: histogram of the status checks a simulation
+      took until it reached a terminal status.
+    """
+
+    namespace = "cs_kit"
+
+    def __init__(
+        self,
+        latency_buckets=LATENCY_BUCKETS,
+        size_buckets=SIZE_BUCKETS,
+        poll_buckets=POLL_BUCKETS,
+    ):
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets
+        self._lock = threading.Lock()
+        self.latency: Dict[tuple, Histogram] = defaultdict(
+            lambda: Histogram(latency_buckets)
+        )
+        self.size: Dict[tuple, Histogram] = defaultdict(lambda: Histogram(size_buckets))
+        self.requests: Dict[tuple, int] = defaultdict(int)
+        self.retries: Dict[tuple, int] = defaultdict(int)
+        self.errors: Dict[tuple, int] = defaultdict(int)
+        self.hedges: Dict[tuple, int] = defaultdict(int)
+        self.hedge_wins: Dict[tuple, int] = defaultdict(int)
+        self.state_changes: Dict[tuple, int] = defaultdict(int)
+        self.polls = Histogram(poll_buckets)
+        self._polls_by_sim: Dict[int, int] = defaultdict(int)
+        self._finished: "OrderedDict[int, None]" = OrderedDict()
+
+    def __call__(self, event):
+        if isinstance(event, RequestEvent):
+            self.on_request(event)
+        elif isinstance(event, StateChangeEvent):
+            self.on_state_change(event)
+
+    def on_request(self, event: RequestEvent):
+        labels = (event.method, event.url)
+        with self._lock:
+            self.latency[labels].observe(event.latency)
+            self.retries[labels] += event.attempt - 1
+            if event.hedged:
+                self.hedges[labels] += 1
+                self.hedge_wins[labels] += event.hedge_won
+            if event.status is None:
+                self.errors[labels] += 1
+                return
+            self.size[labels].observe(event.bytes)
+            self.requests[labels + (event.status,)] += 1
+            if (
+                event.method == "GET"
+                and event.url.endswith(_POLL_ENDPOINTS)
+                and event.model_pk not in self._finished
+            ):
+                self._polls_by_sim[event.model_pk] += 1
+
+    def on_state_change(self, event: StateChangeEvent):
+        with self._lock:
+            self.state_changes[(event.stage, event.status)] += 1
+            if event.stage == "simulation" and event.status in TERMINAL_STATUSES:
+                polls = self._polls_by_sim.pop(event.model_pk, 0)
+                self.polls.observe(polls)
+                _remember(self._finished, event.model_pk)
+
+    def to_dict(self) -> dict:
+        """Snapshot of all metrics as plain Python data."""
+        with self._lock:
+            return {
+                "request_duration_seconds": {
+                    labels: hist.to_dict() for labels, hist in self.latency.items()
+                },
+                "response_size_bytes": {
+                    labels: hist.to_dict() for labels, hist in self.size.items()
+                },
+                "requests_total": dict(self.requests),
+                "retries_total": dict(self.retries),
+                "request_errors_total": dict(self.errors),
+                "hedges_total": dict(self.hedges),
+                "hedge_wins_total": dict(self.hedge_wins),
+                "state_changes_total": dict(self.state_changes),
+                "polls_per_simulation": self.polls.to_dict(),
+            }
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        ns = self.namespace
+        request_labels = ("method", "url")
+        lines = []
+        with self._lock:
+            _histograms(
+                lines,
+                f"{ns}_request_duration_seconds",
+                "Latency of Compute Studio API requests.",
+                request_labels,
+                self.latency,
+            )
+            _histograms(
+                lines,
+                f"{ns}_response_size_bytes",
+                "Size of Compute Studio API response bodies.",
+                request_labels,
+                self.size,
+            )
+            _counters(
+                lines,
+                f"{ns}_requests_total",
+                "Compute Studio API requests by status code.",
+                request_labels + ("status",),
+                self.requests,
+            )
+            _counters(
+                lines,
+                f"{ns}_retries_total",
+                "Retries of Compute Studio API requests.",
+                request_labels,
+                self.retries,
+            )
+            _counters(
+                lines,
+                f"{ns}_request_errors_total",
+                "Compute Studio API requests that failed without a response.",
+                request_labels,
+                self.errors,
+            )
+            _counters(
+                lines,
+                f"{ns}_hedges_total",
+                "Hedged Compute Studio API requests.",
+                request_labels,
+                self.hedges,
+            )
+            _counters(
+                lines,
+                f"{ns}_hedge_wins_total",
+                "Hedged Compute Studio API requests that answered first.",
+                request_labels,
+                self.hedge_wins,
+            )
+            _counters(
+                lines,
+                f"{ns}_state_changes_total",
+                "Observed simulation status changes.",
+                ("stage", "status"),
+                self.state_changes,
+            )
+            _histograms(
+                lines,
+                f"{ns}_polls_per_simulation",
+                "Status checks until a simulation finished.",
+                (),
+                {(): self.polls},
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _counters(lines, name, help, label_names, values):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} counter")
+    for labels, value in sorted(values.items(), key=lambda item: str(item[0])):
+        lines.append(f"{name}{_labels(label_names, labels)} {value}")
+
+
+def _histograms(lines, name, help, label_names, histograms):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, hist in sorted(histograms.items(), key=lambda item: str(item[0])):
+        data = hist.to_dict()
+        for bound, count in data["buckets"]:
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(
+                f"{name}_bucket{_labels(label_names, labels, [('le', le)])} {count}"
+            )
+        lines.append(f"{name}_sum{_labels(label_names, labels)} {data['sum']}")
+        lines.append(f"{name}_count{_labels(label_names, labels)} {data['count']}")
+
+
+class HookDispatcher:
+    """
+    Fans events out to hooks and remembers the last status of each
+    simulation so that only changes are reported. Once a stage reaches a
+    terminal status, it moves to a bounded list of the most recently
+    finished simulations, so memory does not grow with every simulation.
+    """
+
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks or [])
+        self._statuses: Dict[Tuple[int, str], str] = {}
+        self._finished: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.hooks)
+
+    def emit(self, event):
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                # Broken instrumentation must not break the client.
+                warnings.warn(f"Hook {hook!r} raised {e!r}.")
+
+    def state(self, model_pk: int, stage: str, status: Optional[str]):
+        if not self.hooks or status is None:
+            return
+        key = (model_pk, stage)
+        with self._lock:
+            previous = self._statuses.get(key, self._finished.get(key))
+            if previous == status:
+                return
+            if status in TERMINAL_STATUSES:
+                self._statuses.pop(key, None)
+                _remember(self._finished, key, status)
+            else:
+                self._finished.pop(key, None)
+                self._statuses[key] = status
+        self.emit(StateChangeEvent(model_pk, stage, previous, status, time.time()))
+
+
+def _remember(finished: OrderedDict, key, value=None):
+    """Add ``key`` to a bounded LRU of finished simulations."""
+    finished[key] = value
+    finished.move_to_end(key)
+    while len(finished) > FINISHED_SIMULATIONS:
+        finished.popitem(last=False)
@@ -0,0 +1,341 @@
+"""
+Local stand-in for the Compute Studio simulation API, for tests and
+benchmarks that should not hit https://compute.studio.
+
+.. code-block:: bash
+
+    python -m cs_kit.mock_server --port 8000 --latency 0.02 --payload-size 1000000
+
+.. code-block:: python
+
+    with MockCSServer(latency=0.02).start() as server:
+        client = ComputeStudio("PSLmodels", "Tax-Brain", host=server.url, api_token="x")
+        client.create()
+"""
+
+import argparse
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import socket
+import sys
+import threading
+import time
+from typing import List, Optional
+
+
+class MockCSHandler(BaseHTTPRequestHandler):
+    """
+    Implements the create, detail, remote, edit, update and inputs endpoints.
+    Simulations are kept in memory on the server object and complete
+    ``server.run_time`` seconds after they are created.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY every
+    # response waits for the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            self.server.open_sockets.add(self.connection)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.open_sockets.discard(self.connection)
+        super().finish()
+
+    def send_json(self, status, data, headers=None):
+        body = b"" if data is None else json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def route(self):
+        server = self.server
+        with server.lock:
+            if server.record_requests:
+                server.requests.append((self.command, self.path))
+            if server.fail_next:
+                server.fail_next -= 1
+                return 503, {"detail": "unavailable"}
+        parts = [part for part in self.path.split("/") if part]
+        # /<owner>/<title>/api/v1/...
+        if len(parts) < 4:
+            return 404, {"detail": "Not found."}
+        owner, title, rest = parts[0], parts[1], parts[4:]
+        if self.command == "POST" and rest == []:
+            return 201, {"sim": server.create(owner, title, self.read_json())}
+        if rest == ["inputs"]:
+            if self.headers.get("If-None-Match") == server.inputs_etag():
+                return 304, None
+            return 200, server.inputs_doc
+        if not rest or not rest[0].isdigit() or int(rest[0]) not in server.sims:
+            return 404, {"detail": "Not found."}
+        sim = server.sims[int(rest[0])]
+        if self.command == "PUT":
+            sim.update(self.read_json())
+            return 200, server.remote(sim)
+        if rest[1:] == ["edit"]:
+            return 200, server.edit(sim)
+        if rest[1:] == ["remote"]:
+            return server.status_code(sim), server.remote(sim)
+        if rest[1:] == []:
+            return server.status_code(sim), server.detail(sim)
+        return 404, {"detail": "Not found."}
+
+    def handle_request(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        with self.server.lock:
+            stall = self.server.stall_next > 0
+            self.server.stall_next -= stall
+        if stall:
+            time.sleep(self.server.stall)
+        status, data = self.route()
+        headers = {}
+        if status == 202 and self.server.retry_after is not None:
+            headers["Retry-After"] = self.server.retry_after
+        if self.path.endswith("/inputs/"):
+            headers["ETag"] = self.server.inputs_etag()
+        self.send_json(status, data, headers)
+
+    do_GET = do_POST = do_PUT = handle_request
+
+
+def make_outputs(payload_size: Optional[int] = None) -> List[dict]:
+    """
+    Outputs of a mock simulation: a CSV table and a Markdown message. If
+    ``payload_size`` is set, the table is padded to about that many bytes.
+    """
+    table = "a,b\n1,2\n3,4\n"
+    if payload_size is not None:
+        row = "1234567890,0.123456789\n"
+        table = "a,b\n" + row * max(payload_size // len(row), 1)
+    return [
+        {
+            "title": "Table",
+            "media_type": "CSV",
+            "filename": "table.csv",
+            "data": table,
+        },
+        {
+            "title": "Message",
+            "media_type": "Markdown",
+            "filename": "message.md",
+            "data": "# hello",
+        },
+    ]
+
+
+class MockCSServer(ThreadingHTTPServer):
+    """
+    Mock Compute Studio server.
+
+    Parameters
+    ----------
+    host: str
+        Interface to listen on.
+
+    port: int
+        Port to listen on. By default, a free port is picked.
+
+    run_time: float
+        Seconds until a new simulation finishes. A simulation's
+        ``run_time`` meta parameter overrides it.
+
+    latency: float
+        Seconds added to the handling of every request.
+
+    payload_size: int
+        Approximate size in bytes of the CSV output of each simulation.
+
+    record_requests: bool
+        Keep a list of ``(method, path)`` for every request in
+        ``requests``.
+    """
+
+    daemon_threads = True
+    # Many clients connect at once; the default backlog of 5 drops their
+    # SYNs, which costs a one-second retransmit.
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        run_time: float = 0.0,
+        latency: float = 0.0,
+        payload_size: Optional[int] = None,
+        record_requests: bool = True,
+    ):
+        super().__init__((host, port), MockCSHandler)
+        self.lock = threading.Lock()
+        self.run_time = run_time
+        self.latency = latency
+        self.inputs_time = 0.0
+        self.sims = {}
+        self.last_pk = 0
+        self.record_requests = record_requests
+        self.requests = []
+        self.connections = 0
+        self.open_sockets = set()
+        self.fail_next = 0
+        # The next ``stall_next`` requests take ``stall`` extra seconds.
+        self.stall_next = 0
+        self.stall = 0.0
+        self.retry_after = None
+        self.outputs = make_outputs(payload_size)
+        self.inputs_doc = {
+            "meta_parameters": {},
+            "model_parameters": {
+                "section": {
+                    "param": {
+                        "title": "Param",
+                        "description": "A parameter.",
+                        "type": "int",
+                        "value": [{"value": 1}],
+                        "validators": {"range": {"min": 0, "max": 3}},
+                    }
+                }
+            },
+        }
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockCSServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        # End the handler threads of keep-alive connections that clients
+        # still hold open.
+        with self.lock:
+            sockets = list(self.open_sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.server_close()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle_error(self, request, client_address):
+        # Clients that hang up, e.g. on the losing request of a hedge, are
+        # not an error.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def inputs_etag(self):
+        doc = json.dumps(self.inputs_doc, sort_keys=True).encode("utf-8")
+        return f'"{hashlib.sha256(doc).hexdigest()[:16]}"'
+
+    def create(self, owner, title, data):
+        with self.lock:
+            self.last_pk += 1
+            model_pk = self.last_pk
+            self.sims[model_pk] = {
+                "model_pk": model_pk,
+                "owner": owner,
+                "title": title,
+                "adjustment": data.get("adjustment", {}),
+                "meta_parameters": data.get("meta_parameters", {}),
+                "created": time.time(),
+            }
+        return self.remote(self.sims[model_pk])
+
+    def done(self, sim):
+        if sim["meta_parameters"].get("invalid"):
+            # Simulations with invalid inputs never run.
+            return False
+        run_time = sim["meta_parameters"].get("run_time", self.run_time)
+        return time.time() - sim["created"] >= run_time
+
+    def status_code(self, sim):
+        return 200 if self.done(sim) else 202
+
+    def remote(self, sim):
+        return {
+            "model_pk": sim["model_pk"],
+            "owner": sim["owner"],
+            "title": sim["title"],
+            # Tests can set a simulation's "status", e.g. to WORKER_FAILURE.
+            "status": sim.get("status") or ("SUCCESS" if self.done(sim) else "PENDING"),
+        }
+
+    def edit(self, sim):
+        if time.time() - sim["created"] < self.inputs_time:
+            status = "PENDING"
+        elif sim["meta_parameters"].get("invalid"):
+            status = "FAIL"
+        else:
+            status = "SUCCESS"
+        return {
+            "status": status,
+            "adjustment": sim["adjustment"],
+            "meta_parameters": sim["meta_parameters"],
+        }
+
+    def detail(self, sim):
+        outputs = {"downloadable": self.outputs} if self.done(sim) else None
+        return dict(self.remote(sim), outputs=outputs)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run a mock Compute Studio server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--run-time", type=float, default=0.0, help="Seconds until simulations finish."
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every request."
+    )
+    parser.add_argument(
+        "--payload-size", type=int, default=None, help="Bytes of CSV output."
+    )
+    args = parser.parse_args(args)
+    server = MockCSServer(
+        args.host,
+        args.port,
+        run_time=args.run_time,
+        latency=args.latency,
+        payload_size=args.payload_size,
+        record_requests=False,
+    )
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+from concurrent.futures import Future, InvalidStateError
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from cs_kit.exceptions import APIException
+from cs_kit.polling import parse_retry_after
+
+VALIDATING = "VALIDATING"
+RUNNING = "RUNNING"
+
+
+class _Watch:
+    __slots__ = ("model_pk", "stage", "attempt", "started", "future", "token")
+
+    def __init__(self, model_pk: int, future: Future):
+        self.model_pk = model_pk
+        self.stage = VALIDATING
+        self.attempt = 0
+        self.started = time.time()
+        self.future = future
+        self.token = None
+
+
+class SimulationMonitor:
+    """
+    Watches any number of simulations from a single background thread and
+    resolves a ``concurrent.futures.Future`` for each of them when it
+    finishes. Unlike calling ``detail(wait=True)`` on many threads, every
+    simulation shares one polling loop:
+
+    - Each simulation is polled on its own backoff schedule from the
+      polling policy, honoring ``Retry-After``.
+    - Watching a simulation that is already watched returns the same future
+      instead of adding a second poll schedule.
+    - At most ``max_rate`` status requests are sent per second in total.
+    - Finished simulations drop out of the poll set.
+
+    .. code-block:: python
+
+        monitor = SimulationMonitor(client)
+        futures = [
+            monitor.watch(sim.model_pk, callback=lambda f: print(f.result()))
+            for sim in sims
+        ]
+        concurrent.futures.wait(futures)
+
+    A future resolves to the simulation's meta data once the simulation has
+    run, like ``detail(wait=True)``. It fails with an ``APIException`` if
+    the inputs are invalid and with a ``TimeoutError`` after ``timeout``
+    seconds. Cancelling a future stops watching its simulation.
+
+    Parameters
+    ----------
+    client: ComputeStudio
+        Client used to check the status of the simulations.
+
+    polling_policy: PollingPolicy
+        Policy that spaces out the checks of each simulation. Defaults to the
+        client's ``polling_policy``.
+
+    max_rate: float
+        Maximum number of status requests per second.
+
+    timeout: float
+        Time in seconds to wait for each simulation. Wait indefinitely if
+        ``None``.
+    """
+
+    def __init__(
+        self,
+        client,
+        polling_policy=None,
+        max_rate: float = 10.0,
+        timeout: Optional[float] = None,
+    ):
+        self.client = client
+        self.polling_policy = polling_policy or client.polling_policy
+        self.max_rate = max_rate
+        self.timeout = timeout
+        self._watches: Dict[int, _Watch] = {}
+        self._schedule: List[tuple] = []
+        self._tokens = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.client!r}, watching={len(self)})"
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._watches)
+
+    def __contains__(self, model_pk: int) -> bool:
+        with self._cond:
+            return model_pk in self._watches
+
+    def watch(
+        self, model_pk: int, callback: Optional[Callable[[Future], None]] = None
+    ) -> Future:
+        """
+        Start watching a simulation.
+
+        Parameters
+        ----------
+        model_pk: int
+            ID for the simulation.
+
+        callback: callable
+            Called with the future once the simulation has finished. It runs
+            on the monitor's thread and should return quickly.
+
+        Returns
+        -------
+        future: concurrent.futures.Future
+            Future that resolves to the simulation's meta data.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The monitor is closed.")
+            watch = self._watches.get(model_pk)
+            if watch is None:
+                watch = _Watch(model_pk, Future())
+                watch.future.add_done_callback(
+                    lambda _, watch=watch: self._forget(watch)
+                )
+                self._watches[model_pk] = watch
+                self._schedule_check(watch, time.time())
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="cs-kit-monitor", daemon=True
+                    )
+                    self._thread.start()
+                self._cond.notify()
+        if callback is not None:
+            watch.future.add_done_callback(callback)
+        return watch.future
+
+    def unwatch(self, model_pk: int):
+        """Stop watching a simulation and cancel its future."""
+        with self._cond:
+            watch = self._watches.pop(model_pk, None)
+        if watch is not None:
+            watch.future.cancel()
+
+    def close(self):
+        """Stop the background thread and cancel the futures that are pending."""
+        with self._cond:
+            self._closed = True
+            watches = list(self._watches.values())
+            self._watches.clear()
+            self._cond.notify()
+        for watch in watches:
+            watch.future.cancel()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _forget(self, watch: _Watch):
+        # Drops cancelled futures from the poll set.
+        with self._cond:
+            if self._watches.get(watch.model_pk) is watch:
+                del self._watches[watch.model_pk]
+
+    def _schedule_check(self, watch: _Watch, when: float):
+        watch.token = next(self._tokens)
+        heapq.heappush(self._schedule, (when, watch.token, watch.model_pk))
+
+    def _next_due(self) -> Optional[_Watch]:
+        """Wait for the next simulation that is due for a check."""
+        with self._cond:
+            while not self._closed:
+                while self._schedule:
+                    when, token, model_pk = self._schedule[0]
+                    watch = self._watches.get(model_pk)
+                    if watch is None or watch.token != token:
+                        # Unwatched or rescheduled since this entry was added.
+                        heapq.heappop(self._schedule)
+                        continue
+                    break
+                if not self._schedule:
+                    self._cond.wait()
+                    continue
+                delay = when - time.time()
+                if delay <= 0:
+                    heapq.heappop(self._schedule)
+                    return watch
+                self._cond.wait(delay)
+            return None
+
+    def _run(self):
+        last_check = 0.0
+        while True:
+            watch = self._next_due()
+            if watch is None:
+                return
+            wait = last_check + 1 / self.max_rate - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            last_check = time.time()
+            stage = watch.stage
+            try:
+                done, data, retry_after = self._check(watch)
+            except Exception as e:
+                self._finish(watch, error=e)
+                continue
+            if done:
+                self._finish(watch, result=data)
+                continue
+            if self.timeout is not None and time.time() - watch.started > self.timeout:
+                error = TimeoutError(
+                    f"Simulation not ready in under {self.timeout} seconds."
+                )
+                self._finish(watch, error=error)
+                continue
+            if watch.stage != stage:
+                # The inputs were just validated; check on the run right away.
+                delay = 0.0
+            else:
+                delay = self.polling_policy.delay(watch.attempt, retry_after)
+                watch.attempt += 1
+            with self._cond:
+                if self._watches.get(watch.model_pk) is watch:
+                    self._schedule_check(watch, time.time() + delay)
+
+    def _check(self, watch: _Watch):
+        """
+        Send one status check for a simulation. Returns whether it finished,
+        the meta data from the server and the ``Retry-After`` delay.
+        """
+        client = self.client
+        if watch.stage == VALIDATING:
+            resp = client._request("GET", f"{client.sim_url}{watch.model_pk}/edit/")
+            data = resp.json()
+            client._observe(watch.model_pk, "inputs", data)
+            if resp.status_code != 200 or data["status"] not in ("PENDING", "SUCCESS"):
+                raise APIException(data)
+            if data["status"] == "SUCCESS":
+                watch.stage = RUNNING
+                watch.attempt = 0
+            return False, data, parse_retry_after(resp.headers.get("Retry-After"))
+        resp = client._request("GET", f"{client.sim_url}{watch.model_pk}/remote/")
+        data = resp.json()
+        if resp.status_code not in (200, 202):
+            raise APIException(data)
+        client._observe(watch.model_pk, "simulation", data)
+        return (
+            resp.status_code == 200,
+            data,
+            parse_retry_after(resp.headers.get("Retry-After")),
+        )
+
+    def _finish(self, watch: _Watch, result=None, error=None):
+        with self._cond:
+            if self._watches.get(watch.model_pk) is not watch:
+                return
+            del self._watches[watch.model_pk]
+        try:
+            if error is not None:
+                watch.future.set_exception(error)
+            else:
+                watch.future.set_result(result)
+        except InvalidStateError:
+            # The caller cancelled the future while it was being checked.
+            pass
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
+from io import StringIO
+import threading
+from typing import Iterator, List, Mapping, Optional
+import warnings
+
+
+def _pandas():
+    """
+    pandas, or ``None`` if it is not installed. pandas is imported the first
+    time a CSV output is decoded so that the API client starts quickly.
+    """
+    global pd
+    if "pd" not in globals():
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+    return pd
+
+
+def _has_pandas() -> bool:
+    if "pd" in globals():
+        return pd is not None
+    return importlib.util.find_spec("pandas") is not None
+
+
+def __getattr__(name):
+    if name == "pd":
+        return _pandas()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class Outputs(Mapping):
+    """
+    Read-only mapping of output title to output for a simulation. CSV outputs
+    are decoded into a pandas ``DataFrame`` the first time they are accessed;
+    other outputs are returned as is.
+
+    .. code-block:: python
+
+        outputs = client.results(1234)
+        outputs["Aggregate Results"]  # only this table is parsed
+
+        outputs = client.results(1234, eager=True, engine="pyarrow")
+
+    Parameters
+    ----------
+    downloadable: list
+        The ``outputs.downloadable`` list from the Compute Studio server.
+
+    engine: str
+        Parser engine passed to ``pandas.read_csv``, e.g. ``"pyarrow"``.
+
+    dtype: dict
+        Column dtypes passed to ``pandas.read_csv``.
+    """
+
+    def __init__(
+        self,
+        downloadable: List[dict],
+        engine: Optional[str] = None,
+        dtype: Optional[dict] = None,
+    ):
+        self._outputs = {output["title"]: output for output in downloadable}
+        self.engine = engine
+        self.dtype = dtype
+        self._decoded = {}
+        self._lock = threading.Lock()
+        if not _has_pandas() and any(self._is_csv(title) for title in self._outputs):
+            warnings.warn("Install pandas to return CSV output as a pandas DataFrame.")
+
+    def _is_csv(self, title: str) -> bool:
+        return self._outputs[title]["media_type"] == "CSV"
+
+    def _decode(self, title: str):
+        output = self._outputs[title]
+        pd = _pandas() if self._is_csv(title) else None
+        if pd is not None:
+            kwargs = {}
+            if self.engine is not None:
+                kwargs["engine"] = self.engine
+            if self.dtype is not None:
+                kwargs["dtype"] = self.dtype
+            return pd.read_csv(StringIO(output["data"]), **kwargs)
+        return output["data"]
+
+    def __getitem__(self, title: str):
+        if title in self._decoded:
+            return self._decoded[title]
+        value = self._decode(title)
+        with self._lock:
+            # Keep the first decoded value if two threads raced on this title.
+            return self._decoded.setdefault(title, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._outputs)
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self._outputs)})"
+
+    def raw(self, title: str) -> dict:
+        """The undecoded output, including its ``media_type`` and ``filename``."""
+        return self._outputs[title]
+
+    def load(self, max_workers: Optional[int] = None) -> "Outputs":
+        """Decode all outputs that have not been accessed yet on a thread pool."""
+        pending = [title for title in self._outputs if title not in self._decoded]
+        if pending:
+            with ThreadPoolExecutor(max_workers) as pool:
+                for _ in pool.map(self.__getitem__, pending):
+                    pass
+        return self
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+from typing import Optional
+
+
+class PollingPolicy:
+    """
+    Exponential backoff with jitter for polling a simulation's status.
+
+    The n-th wait (starting at zero) is ``initial * factor ** n`` seconds,
+    capped at ``max_interval`` and scaled by a random factor in
+    ``[1 - jitter, 1 + jitter]`` so that many clients do not poll in lock
+    step. If the server sends a ``Retry-After`` header, that value is used
+    instead.
+
+    Any object with a ``delay(attempt, retry_after)`` method can be passed
+    where a ``PollingPolicy`` is expected.
+
+    .. code-block:: python
+
+        client = ComputeStudio(
+            "PSLmodels", "Tax-Brain",
+            polling_policy=PollingPolicy(initial=2, max_interval=60),
+        )
+
+    Parameters
+    ----------
+    initial: float
+        Seconds to wait before the first re-poll.
+
+    factor: float
+        Growth factor applied after each poll.
+
+    max_interval: float
+        Upper bound on the wait between two polls.
+
+    jitter: float
+        Fraction of the wait that is randomized.
+    """
+
+    def __init__(
+        self,
+        initial: float = 1.0,
+        factor: float = 1.5,
+        max_interval: float = 30.0,
+        jitter: float = 0.2,
+    ):
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+
+    def __repr__(self):
+        return (
+            f"PollingPolicy(initial={self.initial}, factor={self.factor}, "
+            f"max_interval={self.max_interval}, jitter={self.jitter})"
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before poll number ``attempt + 1``.
+        """
+        if retry_after is not None:
+            return max(retry_after, 0.0)
+        interval = min(self.initial * self.factor**attempt, self.max_interval)
+        if self.jitter:
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return interval
+
+    @classmethod
+    def fixed(cls, interval: float) -> "PollingPolicy":
+        """Poll at a fixed interval without backoff or jitter."""
+        return cls(initial=interval, factor=1.0, max_interval=interval, jitter=0.0)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header, which is either a number of seconds or an
+    HTTP date. Returns ``None`` if the header is missing or malformed.
+    """
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return (when - datetime.now(timezone.utc)).total_seconds()
@@ -0,0 +1,228 @@
+import os
+from pathlib import Path
+import struct
+import threading
+import time
+from typing import Optional, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ENDPOINT_CLASSES = ("submit", "poll", "download", "other")
+
+# Token count and time of the last refill, stored in the bucket file.
+_STATE = struct.Struct("<dd")
+
+
+def endpoint_class(method: str, url: str) -> str:
+    """
+    Classify a request by what it does: ``submit`` creates a simulation,
+    ``poll`` checks a status, ``download`` fetches a simulation with its
+    outputs and ``other`` is everything else, e.g. the inputs documentation
+    and updates. ``url`` is a URL template from
+    :func:`cs_kit.instrumentation.url_template`.
+    """
+    if method == "POST":
+        return "submit"
+    if url.endswith(("/edit/", "/remote/")):
+        return "poll"
+    if method == "GET" and url.endswith("/{model_pk}/"):
+        return "download"
+    return "other"
+
+
+class TokenBucket:
+    """
+    Token bucket shared by the threads of one process. Tokens are added at
+    ``rate`` per second up to ``burst``; each request takes one.
+
+    Requests reserve their token up front, so the bucket can go into debt
+    and waiting requests are let through in the order they arrived.
+
+    Parameters
+    ----------
+    rate: float
+        Requests per second.
+
+    burst: float
+        Number of requests that can be made at once after the bucket has
+        been idle. Defaults to ``rate``, and at least one.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(rate={self.rate}, burst={self.burst})"
+
+    def _take(self, tokens, now, state):
+        """Refill ``state`` up to ``now`` and take ``tokens`` from it."""
+        available, updated = state
+        available = min(self.burst, available + (now - updated) * self.rate)
+        available -= tokens
+        return max(-available / self.rate, 0.0), (available, now)
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take ``tokens`` and return the seconds to wait before using them."""
+        with self._lock:
+            wait, (self._tokens, self._updated) = self._take(
+                tokens, time.monotonic(), (self._tokens, self._updated)
+            )
+        return wait
+
+    def acquire(self, tokens: float = 1):
+        """Block until ``tokens`` are available and take them."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a small file that is locked on every
+    request, so all processes on a machine, or on a shared POSIX file
+    system, that use the same ``path`` share one quota.
+
+    .. code-block:: python
+
+        limiter = RateLimiter(FileTokenBucket("/tmp/cs-kit.bucket", rate=10, burst=20))
+
+    Parameters
+    ----------
+    path: str or Path
+        File that holds the bucket. It is created if it does not exist.
+
+    rate: float
+        Requests per second across all processes.
+
+    burst: float
+        Number of requests that can be made at once after the bucket has
+        been idle.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], rate: float, burst: Optional[float] = None
+    ):
+        if fcntl is None:
+            raise ImportError("FileTokenBucket requires fcntl, i.e. a POSIX system.")
+        super().__init__(rate, burst)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = None
+        self._pid = None
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(path={str(self.path)!r}, rate={self.rate}, "
+            f"burst={self.burst})"
+        )
+
+    def _file(self) -> int:
+        # flock locks belong to the open file, which a forked child shares
+        # with its parent, so each process opens the file itself.
+        if self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock:
+            fd = self._file()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                data = os.pread(fd, _STATE.size, 0)
+                now = time.time()
+                if len(data) == _STATE.size:
+                    state = _STATE.unpack(data)
+                else:
+                    state = (self.burst, now)
+                wait, state = self._take(tokens, now, state)
+                os.pwrite(fd, _STATE.pack(*state), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        return wait
+
+    def close(self):
+        if self._fd is not None and self._pid == os.getpid():
+            os.close(self._fd)
+        self._fd = self._pid = None
+
+
+class RateLimiter:
+    """
+    Client-side rate limit for the Compute Studio API. Pass one bucket to
+    limit all requests, or buckets per endpoint class (see
+    :func:`endpoint_class`) to limit, e.g., submissions and status polls
+    separately. Requests of a class without its own bucket use ``default``;
+    if that is not set either, they are not limited.
+
+    .. code-block:: python
+
+        client = ComputeStudio(
+            "PSLmodels", "Tax-Brain",
+            rate_limiter=RateLimiter(
+                submit=TokenBucket(rate=1, burst=5),
+                poll=FileTokenBucket("/tmp/cs-poll.bucket", rate=20),
+            ),
+        )
+
+    The limit applies to the requests made by the client. Retries that
+    urllib3 makes inside a request are spaced out by its backoff instead.
+
+    Parameters
+    ----------
+    default: TokenBucket
+        Bucket for all requests that have no bucket of their own.
+
+    submit, poll, download, other: TokenBucket
+        Buckets for each endpoint class.
+    """
+
+    def __init__(
+        self,
+        default: Optional[TokenBucket] = None,
+        submit: Optional[TokenBucket] = None,
+        poll: Optional[TokenBucket] = None,
+        download: Optional[TokenBucket] = None,
+        other: Optional[TokenBucket] = None,
+    ):
+        self.default = default
+        self.buckets = {
+            "submit": submit,
+            "poll": poll,
+            "download": download,
+            "other": other,
+        }
+
+    def __repr__(self):
+        buckets = {name: bucket for name, bucket in self.buckets.items() if bucket}
+        if self.default is not None:
+            buckets["default"] = self.default
+        args = ", ".join(f"{name}={bucket!r}" for name, bucket in buckets.items())
+        return f"{type(self).__name__}({args})"
+
+    def bucket(self, method: str, url: str) -> Optional[TokenBucket]:
+        bucket = self.buckets[endpoint_class(method, url)]
+        return bucket if bucket is not None else self.default
+
+    def reserve(self, method: str, url: str) -> float:
+        """
+        Take a token for a request and return the seconds to wait before
+        sending it.
+        """
+        bucket = self.bucket(method, url)
+        return bucket.reserve() if bucket is not None else 0.0
+
+    def acquire(self, method: str, url: str):
+        """Block until a request may be sent."""
+        wait = self.reserve(method, url)
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,311 @@
+"""
+Incremental reader for simulation documents that streams the ``data`` of each
+downloadable output to disk without holding the whole document in memory.
+"""
+
+import base64
+import json
+import os
+from pathlib import Path
+import re
+import tempfile
+from typing import Iterable, Iterator, Optional
+
+_WHITESPACE = b" \t\r\n"
+_STRUCTURE = re.compile(rb'["\[\]{}]')
+_SCALAR_END = re.compile(rb"[\s,\]}]")
+# Characters and escape sequences up to the closing quote of a string.
+_STRING_BODY = re.compile(rb'(?:[^"\\]+|\\.)*', re.DOTALL)
+# Longest escape sequence: a surrogate pair written as two \uXXXX escapes.
+_MAX_ESCAPE = 12
+
+
+class _ByteStream:
+    """Pull parser over an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self.buf = b""
+        self.pos = 0
+
+    def _fill(self):
+        for chunk in self._chunks:
+            if chunk:
+                self.buf = self.buf[self.pos :] + chunk
+                self.pos = 0
+                return
+        raise ValueError("Unexpected end of JSON document.")
+
+    def peek(self) -> bytes:
+        """Skip whitespace and return the next byte without consuming it."""
+        while True:
+            buf = self.buf
+            while self.pos < len(buf) and buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(buf):
+                return buf[self.pos : self.pos + 1]
+            self._fill()
+
+    def expect(self, char: bytes):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}.")
+        self.pos += 1
+
+    def _safe_cut(self) -> int:
+        """
+        Last position in the buffer where a partial string can be split
+        without breaking an escape sequence or a UTF-8 character.
+        """
+        buf = self.buf
+        cut = len(buf)
+        backslash = buf.rfind(b"\\", max(self.pos, cut - _MAX_ESCAPE), cut)
+        if backslash != -1:
+            while backslash > self.pos and buf[backslash - 1] == 0x5C:
+                backslash -= 1
+            cut = backslash
+            # Keep the two halves of a surrogate pair together.
+            if cut - 6 >= self.pos and re.match(
+                rb"\\u[dD][89abAB]", buf[cut - 6 : cut - 2]
+            ):
+                cut -= 6
+        # Do not split a multi-byte UTF-8 character.
+        lead = cut
+        while lead > max(self.pos, cut - 4) and 0x80 <= buf[lead - 1] < 0xC0:
+            lead -= 1
+        if lead > self.pos and buf[lead - 1] >= 0xC0:
+            width = 2 if buf[lead - 1] < 0xE0 else 3 if buf[lead - 1] < 0xF0 else 4
+            if lead - 1 + width > cut:
+                cut = lead - 1
+        return cut
+
+    @staticmethod
+    def _decode(piece: bytes, decode: bool) -> bytes:
+        if not decode or b"\\" not in piece:
+            return piece
+        return json.loads(b'"' + piece + b'"').encode("utf-8")
+
+    def iter_string(self, decode: bool = True) -> Iterator[bytes]:
+        """
+        Yield the UTF-8 encoded contents of the string at the current
+        position in pieces. The opening quote must already be consumed.
+        """
+        while True:
+            buf = self.buf
+            quote = _STRING_BODY.match(buf, self.pos).end()
+            if quote < len(buf) and buf[quote] == 0x22:
+                piece = buf[self.pos : quote]
+                self.pos = quote + 1
+                if piece:
+                    yield self._decode(piece, decode)
+                return
+            cut = self._safe_cut()
+            if cut > self.pos:
+                piece = buf[self.pos : cut]
+                self.pos = cut
+                yield self._decode(piece, decode)
+            self._fill()
+
+    def read_string(self) -> str:
+        self.expect(b'"')
+        return b"".join(self.iter_string()).decode("utf-8")
+
+    def skip_value(self):
+        char = self.peek()
+        if char == b'"':
+            self.pos += 1
+            for _ in self.iter_string(decode=False):
+                pass
+        elif char in (b"{", b"["):
+            self.pos += 1
+            depth = 1
+            while depth:
+                match = _STRUCTURE.search(self.buf, self.pos)
+                if match is None:
+                    self.pos = len(self.buf)
+                    self._fill()
+                    continue
+                self.pos = match.end()
+                char = match.group()
+                if char == b'"':
+                    for _ in self.iter_string(decode=False):
+                        pass
+                elif char in (b"{", b"["):
+                    depth += 1
+                else:
+                    depth -= 1
+        else:
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match is not None:
+                    self.pos = match.start()
+                    return
+                try:
+                    self._fill()
+                except ValueError:
+                    # A scalar at the very end of the document.
+                    self.pos = len(self.buf)
+                    return
+
+    def iter_keys(self) -> Iterator[str]:
+        """
+        Yield the keys of the object at the current position. The caller must
+        consume each value before asking for the next key.
+        """
+        self.expect(b"{")
+        if self.peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(b":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == b"}":
+                return
+            elif char != b",":
+                raise ValueError(f"Expected ',' or '}}' but found {char!r}.")
+
+    def iter_items(self) -> Iterator[None]:
+        """
+        Step through the items of the array at the current position. The
+        caller must consume each item.
+        """
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self.pos += 1
+            if char == b"]":
+                return
+            elif char != b",":
+                raise ValueError(f"Expected ',' or ']' but found {char!r}.")
+
+
+class _Base64Writer:
+    """
+    Decodes base64 text that arrives in pieces and writes the bytes to ``f``,
+    holding back the characters of an incomplete 4-character group.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.rest = b""
+
+    def write(self, piece: bytes):
+        data = self.rest + piece.translate(None, _WHITESPACE)
+        cut = len(data) - len(data) % 4
+        self.f.write(base64.b64decode(data[:cut]))
+        self.rest = data[cut:]
+
+    def close(self):
+        if self.rest:
+            # Raises binascii.Error for a truncated group.
+            self.f.write(base64.b64decode(self.rest))
+            self.rest = b""
+
+
+def _is_base64(media_type: Optional[str]) -> bool:
+    """Whether cs-storage stores outputs of ``media_type`` as base64 text."""
+    if media_type is None:
+        return False
+    from cs_storage import Base64Serializer, get_serializer
+
+    try:
+        return isinstance(get_serializer(media_type), Base64Serializer)
+    except KeyError:
+        return False
+
+
+def _decode_file(path: Path, chunk_size: int = 2**16):
+    """Decode the base64 text in ``path`` in place, one chunk at a time."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with open(path, "rb") as src, open(fd, "wb") as dest:
+            writer = _Base64Writer(dest)
+            for chunk in iter(lambda: src.read(chunk_size), b""):
+                writer.write(chunk)
+            writer.close()
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink()
+        raise
+
+
+def iter_downloadable(
+    chunks: Iterable[bytes], directory: Optional[Path] = None
+) -> Iterator[dict]:
+    """
+    Read a simulation document from ``chunks`` and yield the metadata of each
+    of its downloadable outputs. The ``data`` of each output is written to a
+    temporary file in ``directory`` whose path is in the ``path`` key. The
+    caller owns the temporary file and should move or remove it.
+
+    Binary outputs such as images, which the document holds as base64 text,
+    are decoded, so the files hold the same bytes as
+    :func:`cs_kit.filespec.output_bytes`.
+
+    Memory use is bounded by the chunk size, no matter how large the outputs
+    are.
+    """
+    stream = _ByteStream(chunks)
+    for key in stream.iter_keys():
+        if key != "outputs" or stream.peek() != b"{":
+            stream.skip_value()
+            continue
+        for outputs_key in stream.iter_keys():
+            if outputs_key != "downloadable" or stream.peek() != b"[":
+                stream.skip_value()
+                continue
+            for _ in stream.iter_items():
+                yield _read_output(stream, directory)
+
+
+def _read_output(stream: _ByteStream, directory: Optional[Path]) -> dict:
+    output = {}
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    decoded = False
+    try:
+        with open(fd, "wb") as f:
+            for key in stream.iter_keys():
+                if stream.peek() != b'"':
+                    stream.skip_value()
+                elif key == "data":
+                    stream.pos += 1
+                    # The media type usually comes before the data, so it
+                    # can be decoded while it streams.
+                    decoded = _is_base64(output.get("media_type"))
+                    writer = _Base64Writer(f) if decoded else f
+                    for piece in stream.iter_string():
+                        writer.write(piece)
+                    if decoded:
+                        writer.close()
+                else:
+                    output[key] = stream.read_string()
+        if not decoded and _is_base64(output.get("media_type")):
+            _decode_file(Path(tmp))
+    except BaseException:
+        Path(tmp).unlink()
+        raise
+    output["path"] = Path(tmp)
+    return output
+
+
+def csv_to_parquet(src: Path, dest: Path, block_size: int = 2**20):
+    """
+    Convert the CSV file ``src`` to a Parquet file at ``dest`` one block at a
+    time. Column types are inferred from the first block.
+    """
+    try:
+        from pyarrow import csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Install pyarrow to write outputs as Parquet.")
+    reader = csv.open_csv(src, read_options=csv.ReadOptions(block_size=block_size))
+    with pq.ParquetWriter(dest, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
@@ -0,0 +1,212 @@
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional, Union
+
+
+def canonical_json(data) -> str:
+    """Serialize ``data`` so that equal documents produce equal strings."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def submission_key(
+    host: str,
+    owner: str,
+    title: str,
+    adjustment: Optional[dict],
+    meta_parameters: Optional[dict],
+    app_version: Optional[str] = None,
+) -> str:
+    """
+    Content hash of a simulation submission. Two submissions with the same
+    key run the same model on the same inputs.
+    """
+    return hashlib.sha256(
+        canonical_json(
+            [host, owner, title, adjustment or {}, meta_parameters or {}, app_version]
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+class SubmissionIndex:
+    """
+    SQLite index from the content hash of a submission to the simulation that
+    was created for it. With an index, ``ComputeStudio.create`` returns the
+    existing simulation for an adjustment that was already run instead of
+    running it again.
+
+    .. code-block:: python
+
+        client = ComputeStudio(
+            "PSLmodels", "Tax-Brain",
+            submission_index=SubmissionIndex(),
+            app_version="3.1.0",
+        )
+
+    The hash covers the host, owner, title, adjustment, meta parameters and
+    the client's ``app_version``. Set ``app_version`` so that runs on a new
+    release of the model are not matched with runs on an old one.
+
+    Parameters
+    ----------
+    path: str or Path
+        SQLite database file. Defaults to ``~/.cache/cs-kit/submissions.sqlite3``.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        if path is None:
+            path = Path.home() / ".cache" / "cs-kit" / "submissions.sqlite3"
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS submissions (
+                    key TEXT PRIMARY KEY,
+                    model_pk INTEGER NOT NULL,
+                    created REAL NOT NULL
+                )
+                """)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(path={str(self.path)!r})"
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT model_pk FROM submissions WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def add(self, key: str, model_pk: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?)",
+                (key, model_pk, time.time()),
+            )
+
+    def remove(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM submissions WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+class JournalEntry(NamedTuple):
+    key: str
+    model_pk: Optional[int]
+    status: str
+    error: Optional[str]
+    created: float
+    updated: float
+
+
+class JobJournal:
+    """
+    SQLite journal of the simulations in a batch. ``create_many`` records
+    every submission and every change of its status as it happens, keyed by
+    the content hash of the submission (see :func:`submission_key`). If the
+    process dies, re-running the same batch with the same journal skips the
+    work that was already done: simulations that were submitted are polled
+    and downloaded instead of being submitted again.
+
+    .. code-block:: python
+
+        client = ComputeStudio("PSLmodels", "Tax-Brain", journal=JobJournal("batch.db"))
+        for res in client.create_many(items, results=True):
+            ...
+
+    Statuses are the stages of a batch item: ``SUBMITTING`` (the request to
+    create the simulation was sent), ``VALIDATING``, ``RUNNING``,
+    ``FETCHING``, ``DONE`` and ``ERROR``. An item that was still
+    ``SUBMITTING`` is submitted again on resume, because it is not known
+    whether the server received it. Combine the journal with a
+    ``submission_index`` to catch those duplicates as well.
+
+    Parameters
+    ----------
+    path: str or Path
+        SQLite database file. Defaults to ``~/.cache/cs-kit/journal.sqlite3``.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        if path is None:
+            path = Path.home() / ".cache" / "cs-kit" / "journal.sqlite3"
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False
+        )
+        with self._lock, self._conn:
+            # Every status change is a write; WAL keeps them cheap.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    key TEXT PRIMARY KEY,
+                    model_pk INTEGER,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(path={str(self.path)!r})"
+
+    def get(self, key: str) -> Optional[JournalEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE key = ?", (key,)
+            ).fetchone()
+        return JournalEntry(*row) if row is not None else None
+
+    def record(
+        self,
+        key: str,
+        status: str,
+        model_pk: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        """Set the status of ``key``, keeping its ``model_pk`` if none is given."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    model_pk = COALESCE(excluded.model_pk, jobs.model_pk),
+                    status = excluded.status,
+                    error = excluded.error,
+                    updated = excluded.updated
+                """,
+                (key, model_pk, status, error, now, now),
+            )
+
+    def entries(self, status: Optional[str] = None) -> List[JournalEntry]:
+        query, params = "SELECT * FROM jobs", ()
+        if status is not None:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created", params).fetchall()
+        return [JournalEntry(*row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
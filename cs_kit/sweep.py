@@ -0,0 +1,166 @@
+import itertools
+import json
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import warnings
+
+from cs_kit.schemas import Parameters
+
+
+def find_param(model_parameters: dict, name: str) -> Tuple[str, str]:
+    """
+    Resolve ``name`` to a ``(section, param)`` pair. ``name`` is either
+    ``"section.param"`` or a parameter name that is unique across sections.
+    """
+    if "." in name:
+        section, param = name.split(".", 1)
+        if param not in model_parameters.get(section, {}):
+            raise KeyError(f"Parameter {name!r} is not in the app's inputs.")
+        return section, param
+    sections = [
+        section for section, params in model_parameters.items() if name in params
+    ]
+    if len(sections) != 1:
+        raise KeyError(
+            f"Parameter {name!r} was found in {len(sections)} sections. "
+            f"Use 'section.{name}' to refer to it."
+        )
+    return sections[0], name
+
+
+def param_values(
+    model_parameters: dict,
+    params: Union[Iterable[str], Dict[str, Optional[list]]],
+    step=1,
+) -> Dict[Tuple[str, str], list]:
+    """
+    Values to sweep over for each parameter. Parameters mapped to ``None``, or
+    passed as a list of names, are expanded with :meth:`Parameters.param_grid`.
+    """
+    if not isinstance(params, dict):
+        params = {name: None for name in params}
+    values = {}
+    for name, vals in params.items():
+        section, param = find_param(model_parameters, name)
+        if vals is None:
+            section_params = type(
+                f"Params{section}",
+                (Parameters,),
+                {"defaults": model_parameters[section]},
+            )()
+            vals = section_params.param_grid(param, step=step)
+        values[(section, param)] = list(vals)
+    return values
+
+
+def iter_grid(
+    values: Dict[Tuple[str, str], list],
+    sample: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Iterator[tuple]:
+    """
+    Yield points of the Cartesian product of ``values``. If ``sample`` is set,
+    yield that many points drawn without replacement, without building the
+    full grid.
+    """
+    grids = list(values.values())
+    if sample is None:
+        yield from itertools.product(*grids)
+        return
+    sizes = [len(grid) for grid in grids]
+    total = 1
+    for size in sizes:
+        total *= size
+    for flat in random.Random(seed).sample(range(total), min(sample, total)):
+        point = []
+        for grid, size in zip(reversed(grids), reversed(sizes)):
+            flat, i = divmod(flat, size)
+            point.append(grid[i])
+        yield tuple(reversed(point))
+
+
+def build_adjustments(
+    values: Dict[Tuple[str, str], list], points: Iterable[tuple]
+) -> List[Tuple[tuple, dict]]:
+    """Build the adjustment for each grid point, dropping duplicates."""
+    seen = set()
+    adjustments = []
+    for point in points:
+        adjustment = {}
+        for (section, param), value in zip(values, point):
+            adjustment.setdefault(section, {})[param] = [{"value": value}]
+        key = json.dumps(adjustment, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            adjustments.append((point, adjustment))
+    return adjustments
+
+
+def tidy_results(names: List[str], results: Iterable[Tuple[tuple, dict]], outputs=None):
+    """
+    Stack the table outputs of each simulation into one DataFrame indexed by
+    the swept parameter values, with the output title in the ``output``
+    column.
+    """
+    import pandas as pd
+
+    frames = []
+    for point, res in results:
+        for title in res:
+            if outputs is not None and title not in outputs:
+                continue
+            value = res[title]
+            if not isinstance(value, pd.DataFrame):
+                continue
+            frame = value.assign(output=title)
+            for name, val in zip(names, point):
+                frame[name] = val
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=names + ["output"]).set_index(names)
+    df = pd.concat(frames, ignore_index=True)
+    leading = names + ["output"]
+    columns = leading + [col for col in df.columns if col not in leading]
+    return df[columns].set_index(names)
+
+
+def run_sweep(
+    client,
+    params,
+    step=1,
+    sample=None,
+    seed=None,
+    meta_parameters=None,
+    outputs=None,
+    max_workers=None,
+    timeout=600,
+    polling_policy=None,
+):
+    """See :meth:`ComputeStudio.sweep`."""
+    if not isinstance(params, dict):
+        params = list(params)
+    names = list(params)
+    model_parameters = client.inputs()["model_parameters"]
+    values = param_values(model_parameters, params, step=step)
+    adjustments = build_adjustments(values, iter_grid(values, sample=sample, seed=seed))
+
+    items = [(adjustment, meta_parameters or {}) for _, adjustment in adjustments]
+    results = []
+    for res in client.create_many(
+        items,
+        max_workers=max_workers,
+        results=True,
+        timeout=timeout,
+        polling_policy=polling_policy,
+    ):
+        point = adjustments[res.index][0]
+        if res.error is not None:
+            warnings.warn(
+                f"Simulation for {dict(zip(names, point))} failed: {res.error}"
+            )
+            continue
+        results.append((res.index, point, res.result))
+    results.sort(key=lambda res: res[0])
+    return tidy_results(
+        names, [(point, res) for _, point, res in results], outputs=outputs
+    )
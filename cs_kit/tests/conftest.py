@@ -0,0 +1,18 @@
+import pytest
+
+from cs_kit import ComputeStudio
+from cs_kit.mock_server import MockCSServer
+
+
+@pytest.fixture
+def cs_server():
+    server = MockCSServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(cs_server, monkeypatch):
+    monkeypatch.setattr(ComputeStudio, "host", cs_server.url)
+    with ComputeStudio("PSLmodels", "Tax-Brain", api_token="abc123") as client:
+        yield client
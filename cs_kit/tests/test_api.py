@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+
+from cs_kit import ComputeStudio, Simulation, APIException
+
+
+def test_create_and_detail(client, cs_server):
+    sim = client.create({"section": {"param": [{"value": 2}]}})
+    assert sim["status"] == "SUCCESS"
+
+    detail = client.detail(sim["model_pk"], include_outputs=True)
+    assert detail["outputs"]["downloadable"] == cs_server.outputs
+
+    inputs = client.inputs(sim["model_pk"])
+    assert inputs["adjustment"] == {"section": {"param": [{"value": 2}]}}
+
+
+def test_update(client):
+    sim = client.create()
+    resp = client.update(sim["model_pk"], title="hello world")
+    assert resp["model_pk"] == sim["model_pk"]
+
+    with pytest.raises(APIException):
+        client.update(999, title="hello world")
+
+
+def test_connections_are_reused(client, cs_server):
+    sim = client.create()
+    for _ in range(10):
+        client.detail(sim["model_pk"])
+    assert len(cs_server.requests) > 10
+    assert cs_server.connections == 1
+
+
+def test_shared_across_threads(cs_server, monkeypatch):
+    monkeypatch.setattr(ComputeStudio, "host", cs_server.url)
+    client = ComputeStudio("PSLmodels", "Tax-Brain", api_token="abc", pool_maxsize=4)
+    sim = client.create()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(client.detail, [sim["model_pk"]] * 40))
+    client.close()
+    assert all(res["model_pk"] == sim["model_pk"] for res in results)
+    assert cs_server.connections <= 4
+
+
+def test_retries_transient_errors(cs_server, monkeypatch):
+    monkeypatch.setattr(ComputeStudio, "host", cs_server.url)
+    client = ComputeStudio("PSLmodels", "Tax-Brain", api_token="abc", backoff_factor=0)
+    sim = client.create()
+
+    cs_server.fail_next = 2
+    assert client.detail(sim["model_pk"])["status"] == "SUCCESS"
+
+    client = ComputeStudio(
+        "PSLmodels", "Tax-Brain", api_token="abc", max_retries=0, backoff_factor=0
+    )
+    cs_server.fail_next = 1
+    with pytest.raises(APIException):
+        client.detail(sim["model_pk"])
+
+
+def test_create_no_wait(client, cs_server):
+    cs_server.run_time = 0.2
+    sims = [
+        client.create({"section": {"param": [{"value": i}]}}, wait=False)
+        for i in range(3)
+    ]
+    assert all(isinstance(sim, Simulation) for sim in sims)
+    assert [sim.model_pk for sim in sims] == [1, 2, 3]
+    assert sims[0].status() == "PENDING"
+
+    futures = [sim.future() for sim in sims]
+    assert sims[0].future() is futures[0]
+    assert [f.result(timeout=5)["Message"] for f in futures] == ["# hello"] * 3
+
+    assert sims[1].wait(timeout=5)["model_pk"] == 2
+    assert sims[2].result()["Message"] == "# hello"
+    assert sims[2].status() == "SUCCESS"
+
+
+def test_create_no_wait_invalid(client, cs_server):
+    sim = client.create(meta_parameters={"invalid": True}, wait=False)
+    start = time.time()
+    with pytest.raises(APIException):
+        sim.result(timeout=5)
+    with pytest.raises(APIException):
+        sim.future().result(timeout=5)
+    assert time.time() - start < 2
+
+
+def test_host(cs_server, monkeypatch):
+    client = ComputeStudio(
+        "PSLmodels", "Tax-Brain", api_token="abc", host=cs_server.url
+    )
+    assert client.sim_url == f"{cs_server.url}/PSLmodels/Tax-Brain/api/v1/"
+    assert client.create()["status"] == "SUCCESS"
+
+    monkeypatch.setenv("CS_HOST", cs_server.url + "/")
+    assert ComputeStudio("o", "t", api_token="abc").host == cs_server.url
+    monkeypatch.delenv("CS_HOST")
+    assert ComputeStudio("o", "t", api_token="abc").host == "https://compute.studio"
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from cs_kit import AsyncComputeStudio, APIException, InputsCache  # noqa: E402
+
+
+@pytest.fixture
+def aclient(cs_server, monkeypatch):
+    monkeypatch.setattr(AsyncComputeStudio, "host", cs_server.url)
+    return AsyncComputeStudio(
+        "PSLmodels", "Tax-Brain", api_token="abc123", max_concurrency=8
+    )
+
+
+def test_async_create_results(aclient, cs_server):
+    async def run():
+        async with aclient:
+            sim = await aclient.create({"section": {"param": [{"value": 2}]}})
+            inputs = await aclient.inputs(sim["model_pk"])
+            results = await aclient.results(sim["model_pk"])
+            updated = await aclient.update(sim["model_pk"], is_public=True)
+            with pytest.raises(APIException):
+                await aclient.update(999, is_public=True)
+            return sim, inputs, results, updated
+
+    sim, inputs, results, updated = asyncio.run(run())
+    assert sim["status"] == "SUCCESS"
+    assert inputs["adjustment"] == {"section": {"param": [{"value": 2}]}}
+    assert list(results["Table"].columns) == ["a", "b"]
+    assert results["Message"] == "# hello"
+    assert updated["model_pk"] == sim["model_pk"]
+
+
+def test_async_many_simulations(aclient, cs_server):
+    cs_server.run_time = 0.3
+
+    async def run():
+        async with aclient:
+            sims = await asyncio.gather(*(aclient.create() for _ in range(50)))
+            return await asyncio.gather(
+                *(aclient.detail(sim["model_pk"], polling_interval=0.1) for sim in sims)
+            )
+
+    start = time.time()
+    details = asyncio.run(run())
+    # 50 simulations that each take 0.3 seconds are polled concurrently.
+    assert time.time() - start < 5
+    assert {detail["status"] for detail in details} == {"SUCCESS"}
+    assert cs_server.connections <= 8
+
+
+def test_async_retries(aclient, cs_server):
+    aclient.backoff_factor = 0
+
+    async def run():
+        async with aclient:
+            sim = await aclient.create()
+            cs_server.fail_next = 2
+            return await aclient.detail(sim["model_pk"])
+
+    assert asyncio.run(run())["status"] == "SUCCESS"
+
+
+def test_async_inputs_cache(aclient, cs_server, tmp_path):
+    aclient.inputs_cache = InputsCache(tmp_path)
+
+    async def run():
+        async with aclient:
+            return [await aclient.inputs() for _ in range(3)]
+
+    docs = asyncio.run(run())
+    assert all(doc == cs_server.inputs_doc for doc in docs)
+    assert aclient.inputs_cache.stats()["revalidations"] == 2
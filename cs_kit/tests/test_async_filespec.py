@@ -0,0 +1,62 @@
+import json
+import time
+
+import fsspec
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from cs_kit.async_filespec import AsyncCSFileSystem  # noqa: E402 registers cs-async://
+
+
+def test_cat_many(cs_server):
+    for _ in range(20):
+        cs_server.create("o", "t", {"adjustment": {"policy": {}}})
+    cs_server.latency = 0.1
+    fs = AsyncCSFileSystem("o", "t", host=cs_server.url, skip_instance_cache=True)
+    paths = [f"{model_pk}/outputs/Table.csv" for model_pk in range(1, 21)]
+    start = time.monotonic()
+    data = fs.cat(paths)
+    # 20 requests of 100ms each, 10 at a time.
+    assert time.monotonic() - start < 1
+    assert sorted(data) == sorted(paths)
+    table = cs_server.outputs[0]["data"].encode()
+    assert all(value == table for value in data.values())
+    assert cs_server.connections <= 10
+
+    cs_server.requests[:] = []
+    data = fs.cat(
+        ["1/inputs/adjustment/policy", "1/inputs/meta_parameters", "1/inputs/status"]
+    )
+    assert json.loads(data["1/inputs/adjustment/policy"]) == {}
+    # The concurrent reads share one request.
+    assert cs_server.requests == [("GET", "/o/t/api/v1/1/edit/")]
+
+
+def test_tree(cs_server):
+    cs_server.create("o", "t", {"adjustment": {"policy": {}, "behavior": {}}})
+    fs = AsyncCSFileSystem("o", "t", host=cs_server.url, max_concurrency=2)
+    assert fs.ls("1", detail=False) == ["1/inputs", "1/outputs", "1/owner", "1/title"]
+    assert fs.glob("1/inputs/adjustment/*") == [
+        "1/inputs/adjustment/behavior",
+        "1/inputs/adjustment/policy",
+    ]
+    table = "1/outputs/Table.csv"
+    assert fs.info(table)["size"] == len(fs.cat_file(table))
+    with fs.open(table, block_size=4) as f:
+        assert f.read() == fs.cat_file(table)
+    assert fs.exists("1/owner")
+    assert not fs.exists("2/owner")
+    with fsspec.open("cs-async://o:t@1/title", "r", host=cs_server.url) as f:
+        assert json.loads(f.read()) == {"title": "t"}
+
+
+def test_output_file_without_cache(cs_server):
+    cs_server.create("o", "t", {"adjustment": {}})
+    fs = AsyncCSFileSystem(
+        "o", "t", host=cs_server.url, cache_max_size=0, skip_instance_cache=True
+    )
+    with fs.open("1/outputs/Table.csv") as f:
+        blocks = list(iter(lambda: f.read(2), b""))
+    assert b"".join(blocks) == cs_server.outputs[0]["data"].encode()
+    assert cs_server.requests == [("GET", "/o/t/api/v1/1/")]
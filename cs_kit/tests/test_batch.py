@@ -0,0 +1,58 @@
+from cs_kit import BatchResult, PollingPolicy, APIException
+
+
+def test_create_many(client, cs_server):
+    client.polling_policy = PollingPolicy(initial=0.05, max_interval=0.1)
+    cs_server.inputs_time = 0.1
+    items = [
+        ({"section": {"param": [{"value": 1}]}}, {}),
+        ({"section": {"param": [{"value": 2}]}}, {"invalid": True}),
+        ({"section": {"param": [{"value": 3}]}}, {}),
+    ]
+    results = sorted(client.create_many(items, max_workers=2))
+    assert [res.index for res in results] == [0, 1, 2]
+    assert all(isinstance(res, BatchResult) for res in results)
+    assert results[0].result["status"] == "SUCCESS"
+    assert isinstance(results[1].error, APIException)
+    assert results[1].result is None
+    assert results[2].error is None
+
+
+def test_create_many_completion_order(client, cs_server):
+    client.polling_policy = PollingPolicy(initial=0.05, max_interval=0.1)
+    items = [({}, {"run_time": run_time}) for run_time in (0.9, 0.1, 0.5)]
+    results = list(client.create_many(items, results=True))
+    assert [res.index for res in results] == [1, 2, 0]
+    assert all(res.result["Message"] == "# hello" for res in results)
+
+
+def test_create_many_close(client, cs_server):
+    client.polling_policy = PollingPolicy(initial=0.05, max_interval=0.1)
+    cs_server.latency = 0.05
+    items = [({"section": {"param": [{"value": i}]}}, {}) for i in range(20)]
+    results = client.create_many(items, max_workers=2)
+    next(results)
+    results.close()
+    posts = [path for method, path in cs_server.requests if method == "POST"]
+    assert 0 < len(posts) < 10
+
+
+def test_results_many(client, cs_server):
+    client.polling_policy = PollingPolicy(initial=0.05, max_interval=0.2)
+    sims = [client.create(meta_parameters={"run_time": 0.5}) for _ in range(20)]
+    cs_server.requests[:] = []
+    model_pks = [sim["model_pk"] for sim in sims] + [999]
+    results = list(client.results_many(model_pks, max_workers=4))
+    assert sorted(res.model_pk for res in results) == model_pks
+    errors = [res for res in results if res.error is not None]
+    assert [res.index for res in errors] == [20]
+    remote_polls = [path for _, path in cs_server.requests if "remote" in path]
+    # One status check per pending simulation per round.
+    assert len(remote_polls) < 20 * 10
+
+
+def test_batch_timeout(client, cs_server):
+    client.polling_policy = PollingPolicy(initial=0.05, max_interval=0.1)
+    sim = client.create(meta_parameters={"run_time": 5})
+    (res,) = client.results_many([sim["model_pk"]], timeout=0.2)
+    assert isinstance(res.error, TimeoutError)
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import time
+
+from cs_kit import ComputeStudio, InputsCache, ResultCache
+from cs_kit.cache import DocumentCache
+
+
+def test_result_cache_lru(tmp_path):
+    cache = ResultCache(tmp_path, max_size=250)
+    keys = [ResultCache.key("http://host", "o", "t", i) for i in range(3)]
+    assert len(set(keys)) == 3
+    assert cache.get(keys[0]) is None
+
+    for i, key in enumerate(keys[:2]):
+        cache.set(key, {"data": "x" * 100})
+        os.utime(cache._file(key), (i, i))
+    # Reading the oldest entry makes it the most recently used.
+    assert cache.get(keys[0]) == {"data": "x" * 100}
+    cache.set(keys[2], {"data": "y" * 100})
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.stats() == {"hits": 3, "misses": 2, "evictions": 1}
+    assert cache.size <= 250
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_result_cache_concurrent_writes(tmp_path):
+    cache = ResultCache(tmp_path)
+    key = ResultCache.key("http://host", "o", "t", 1)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: cache.set(key, {"i": i}), range(50)))
+    assert cache.get(key)["i"] in range(50)
+
+
+def test_client_uses_result_cache(client, cs_server, tmp_path):
+    client.result_cache = ResultCache(tmp_path)
+    sim = client.create()
+    cs_server.requests[:] = []
+    first = client.results(sim["model_pk"])
+    second = client.detail(sim["model_pk"], include_outputs=True)
+    assert len(cs_server.requests) == 1
+    assert first["Message"] == "# hello"
+    assert second["outputs"]["downloadable"] == cs_server.outputs
+    assert client.result_cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_inputs_cache_revalidates(client, cs_server, tmp_path):
+    client.inputs_cache = InputsCache(tmp_path)
+    first = client.inputs()
+    second = client.inputs()
+    assert first == second == cs_server.inputs_doc
+    assert client.inputs_cache.stats()["revalidations"] == 1
+
+    cs_server.inputs_doc["meta_parameters"] = {"year": {"value": [{"value": 2020}]}}
+    assert client.inputs()["meta_parameters"] == cs_server.inputs_doc["meta_parameters"]
+    assert client.inputs_cache.stats()["revalidations"] == 1
+
+    # A new process reads the document from disk and revalidates it.
+    other = ComputeStudio(
+        "PSLmodels", "Tax-Brain", api_token="abc", inputs_cache=InputsCache(tmp_path)
+    )
+    cs_server.requests[:] = []
+    assert other.inputs() == cs_server.inputs_doc
+    assert other.inputs_cache.stats() == {
+        "hits": 1,
+        "misses": 0,
+        "evictions": 0,
+        "revalidations": 1,
+    }
+    assert len(cs_server.requests) == 1
+
+
+def test_inputs_cache_ttl(client, cs_server, tmp_path):
+    client.inputs_cache = InputsCache(tmp_path, ttl=0.2)
+    client.inputs()
+    cs_server.requests[:] = []
+    for _ in range(5):
+        client.inputs()
+    assert cs_server.requests == []
+
+    time.sleep(0.25)
+    client.inputs()
+    assert len(cs_server.requests) == 1
+    assert client.inputs_cache.stats()["revalidations"] == 1
+
+
+def test_document_cache():
+    cache = DocumentCache(ttl=0.1, max_size=10)
+    cache.set((1, "edit/"), b"1234", final=True)
+    cache.set((1, "remote/"), b"1234")
+    assert cache.get((1, "remote/")) == b"1234"
+    time.sleep(0.15)
+    assert cache.get((1, "remote/")) is None
+    assert cache.get((1, "edit/")) == b"1234"
+
+    cache.set((2, "edit/"), b"123456", final=True)
+    cache.set((3, "edit/"), b"123", final=True)
+    # The least recently used document made room.
+    assert cache.get((1, "edit/")) is None
+    assert cache.get((2, "edit/")) == b"123456"
+    cache.set((4, ""), b"x" * 11, final=True)
+    assert cache.get((4, "")) is None
+    assert cache.size == 9
+    assert cache.stats() == {"hits": 3, "misses": 3, "evictions": 1}
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cs_kit import PollingPolicy, ResultComparison
+
+
+def _results(scale, rows=("x", "y")):
+    table = pd.DataFrame(
+        {
+            "label": list(rows),
+            "a": [1.0, 2.0][: len(rows)],
+            "b": [0.0, 4.0][: len(rows)],
+        }
+    )
+    table[["a", "b"]] *= scale
+    return {"Table": table, "Message": "# hello"}
+
+
+def test_compare_stack_and_diff():
+    comparison = ResultComparison(_results(1), index="label")
+    comparison.add(1, _results(2))
+    comparison.add(2, _results(3))
+    assert comparison.titles == ["Table"]
+    assert comparison.arrays("Table").shape == (2, 2, 2)
+
+    stacked = comparison.stack("Table")
+    assert stacked.index.names == ["model_pk", "label"]
+    assert stacked.loc[(2, "y"), "a"] == 6.0
+
+    diff = comparison.diff("Table")
+    assert diff.loc[(1, "x")].tolist() == [1.0, 0.0]
+    assert diff.loc[(2, "y")].tolist() == [4.0, 8.0]
+
+    pct = comparison.pct_change("Table")
+    assert pct.loc[(2, "x"), "a"] == 2.0
+    # The baseline is zero.
+    assert np.isnan(pct.loc[(2, "x"), "b"])
+
+
+def test_compare_summary():
+    comparison = ResultComparison(_results(1), index="label", keep=False)
+    for model_pk, scale in enumerate([1, 2, 3, 6]):
+        comparison.add(model_pk, _results(scale))
+    summary = comparison.summary("Table")
+    assert summary.index.names == ["statistic", "label"]
+    values = np.array([1, 2, 3, 6]) * 2.0
+    assert summary.loc[("count", "y"), "a"] == 4
+    assert summary.loc[("mean", "y"), "a"] == pytest.approx(values.mean())
+    assert summary.loc[("std", "y"), "a"] == pytest.approx(values.std(ddof=1))
+    assert summary.loc[("min", "y"), "a"] == 2.0
+    assert summary.loc[("max", "y"), "a"] == 12.0
+    diff = comparison.summary("Table", of="diff")
+    assert diff.loc[("mean", "y"), "a"] == pytest.approx(values.mean() - 2.0)
+    with pytest.raises(ValueError):
+        comparison.stack("Table")
+
+
+def test_compare_alignment():
+    comparison = ResultComparison(outputs=["Table"], index="label")
+    comparison.add(1, _results(1))
+    comparison.add(2, _results(1, rows=("y",)))
+    stacked = comparison.stack("Table")
+    assert stacked.loc[(2, "y"), "a"] == 1.0
+    assert np.isnan(stacked.loc[(2, "x"), "a"])
+    summary = comparison.summary("Table")
+    assert summary.loc[("count", "x"), "a"] == 1
+    with pytest.raises(ValueError):
+        comparison.diff("Table")
+    with pytest.raises(KeyError):
+        comparison.stack("Message")
+
+
+def test_client_compare(client, cs_server):
+    client.polling_policy = PollingPolicy.fixed(0.05)
+    baseline = client.create(wait=False).model_pk
+    model_pks = [client.create(wait=False).model_pk for _ in range(3)]
+    comparison = client.compare(model_pks, baseline=baseline)
+    assert comparison.model_pks("Table") == model_pks
+    diff = comparison.diff("Table")
+    assert diff.index.get_level_values("model_pk").unique().tolist() == model_pks
+    assert (diff.to_numpy() == 0).all()
+    assert comparison.summary("Table").loc["mean"].to_numpy().tolist() == [
+        [1.0, 2.0],
+        [3.0, 4.0],
+    ]
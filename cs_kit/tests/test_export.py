@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import pandas as pd  # noqa: E402
+import pyarrow.dataset as ds  # noqa: E402
+
+from cs_kit import PollingPolicy  # noqa: E402
+from cs_kit.export import ParquetExporter, metadata_columns  # noqa: E402
+
+
+def test_metadata_columns():
+    columns = metadata_columns(
+        {
+            "adjustment": {
+                "policy": {
+                    "STD": [{"value": 1000}],
+                    "II_rt1": [{"year": 2020, "value": 0.1}],
+                }
+            },
+            "meta_parameters": {"year": 2020, "data_source": "CPS"},
+        }
+    )
+    assert columns["adjustment.policy.STD"] == 1000
+    assert columns["adjustment.policy.II_rt1"] == '[{"value":0.1,"year":2020}]'
+    assert columns["meta_parameters.year"] == 2020
+    assert columns["meta_parameters.data_source"] == "CPS"
+    assert columns["adjustment"].startswith('{"policy":')
+
+
+def test_export_parquet(client, cs_server, tmp_path):
+    client.polling_policy = PollingPolicy.fixed(0.05)
+    model_pks = [
+        client.create({"section": {"param": [{"value": i}]}}, wait=False).model_pk
+        for i in range(3)
+    ]
+    results = list(client.export_parquet(model_pks + [999], tmp_path / "out"))
+    errors = [res for res in results if res.error is not None]
+    assert [res.model_pk for res in errors] == [999]
+    written = sorted(res.result[0] for res in results if res.error is None)
+    assert written == [
+        tmp_path / "out" / f"model_pk={pk}" / "output=Table" / "part-0.parquet"
+        for pk in model_pks
+    ]
+
+    df = pd.read_parquet(tmp_path / "out").sort_values(["model_pk", "a"])
+    assert len(df) == 6
+    assert list(df["adjustment.section.param"]) == [0, 0, 1, 1, 2, 2]
+    assert df["adjustment.section.param"].dtype == "float64"
+    assert list(df["a"]) == [1, 3] * 3
+
+    dataset = ParquetExporter(tmp_path / "out").dataset()
+    table = dataset.to_table(filter=ds.field("model_pk") == model_pks[1])
+    assert table.num_rows == 2
+
+    # Exporting a simulation again replaces its files.
+    list(client.export_parquet(model_pks[0], tmp_path / "out"))
+    assert len(pd.read_parquet(tmp_path / "out")) == 6
+    assert not list((tmp_path / "out").rglob("*.tmp"))
+
+
+def test_export_differing_adjustments(tmp_path):
+    exporter = ParquetExporter(tmp_path)
+    outputs = [{"title": "Table", "media_type": "CSV", "data": "x\n1\n2\n"}]
+    adjustments = [
+        {"s": {"p": [{"value": 1}]}},
+        {"s": {"p": [{"value": 1.5}]}},
+        {"s": {"q": [{"value": True}]}},
+    ]
+    for model_pk, adjustment in enumerate(adjustments, 1):
+        exporter.write(model_pk, outputs, {"adjustment": adjustment})
+
+    schema = exporter.schema()
+    assert str(schema.field("adjustment.s.p").type) == "double"
+    assert str(schema.field("adjustment.s.q").type) == "bool"
+    df = pd.read_parquet(tmp_path, schema=schema).sort_values(["model_pk", "x"])
+    assert df["adjustment.s.p"].tolist()[:4] == [1.0, 1.0, 1.5, 1.5]
+    assert df["adjustment.s.p"].iloc[4:].isna().all()
+    assert df["adjustment.s.q"].tolist()[4:] == [True, True]
+    table = exporter.dataset().to_table()
+    assert table.num_rows == 6
+    assert "adjustment.s.q" in table.column_names
+
+
+def test_output_titles_are_escaped(tmp_path):
+    exporter = ParquetExporter(tmp_path)
+    outputs = [
+        {"title": "Tax / Year", "media_type": "CSV", "data": "x\n1\n"},
+        {"title": "Chart", "media_type": "PNG", "data": "..."},
+    ]
+    paths = exporter.write(1, outputs)
+    assert len(paths) == 1
+    table = exporter.dataset().to_table()
+    assert table.column("output").to_pylist() == ["Tax / Year"]
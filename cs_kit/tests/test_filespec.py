@@ -1,11 +1,14 @@
 import io
 import json
+import time
+
 import fsspec
 
 import pandas as pd
 import paramtools
+import pytest
 
-import cs_kit
+from cs_kit.filespec import CSFileSystem  # registers the cs:// protocol
 
 
 def test_get_inputs():
@@ -40,3 +43,200 @@ def test_get_owner():
 def test_get_title():
     data = paramtools.read_json("cs://PSLmodels:Tax-Brain@47517/title")
     assert data == {"title": "Test TB after updates"}
+
+
+def test_host(cs_server):
+    cs_server.run_time = 0
+    cs_server.create("PSLmodels", "Tax-Brain", {"adjustment": {"section": {}}})
+    url = "cs://PSLmodels:Tax-Brain@1/inputs/adjustment"
+    with fsspec.open(url, "r", host=cs_server.url) as f:
+        assert json.loads(f.read()) == {"section": {}}
+    data = paramtools.read_json(
+        "cs://PSLmodels:Tax-Brain@1/outputs", storage_options={"host": cs_server.url}
+    )
+    assert data == cs_server.outputs
+
+
+def test_cache(cs_server):
+    adjustment = {"policy": {"a": 1}, "behavior": {}}
+    cs_server.create(
+        "o", "t", {"adjustment": adjustment, "meta_parameters": {"run_time": 10}}
+    )
+    cs_server.create("o", "t", {"meta_parameters": {"year": 2020}})
+    cs_server.requests[:] = []
+    paths = [
+        "cs://o:t@1/inputs/adjustment/policy",
+        "cs://o:t@1/inputs/meta_parameters",
+        "cs://o:t@1/inputs/adjustment/behavior",
+        "cs://o:t@2/inputs/meta_parameters",
+    ]
+    fs = None
+    for path in paths:
+        of = fsspec.open(path, "r", host=cs_server.url, cache_ttl=0.2)
+        with of as f:
+            assert json.loads(f.read()) is not None
+        assert fs is None or of.fs is fs
+        fs = of.fs
+    assert cs_server.requests == [
+        ("GET", "/o/t/api/v1/1/edit/"),
+        ("GET", "/o/t/api/v1/2/edit/"),
+    ]
+
+    # Simulation 1 is still running, so only its inputs are cached for good.
+    fs.cat("1/title")
+    fs.cat("1/owner")
+    assert len(cs_server.requests) == 3
+    with pytest.raises(FileNotFoundError):
+        fs.cat("1/outputs")
+    time.sleep(0.25)
+    fs.cat("1/title")
+    fs.cat("2/outputs")
+    time.sleep(0.25)
+    fs.cat("2/outputs")
+    fs.cat("1/inputs")
+    assert cs_server.requests[2:] == [
+        ("GET", "/o/t/api/v1/1/"),
+        ("GET", "/o/t/api/v1/1/"),
+        ("GET", "/o/t/api/v1/2/"),
+    ]
+    assert fs.cache.stats()["hits"] == 6
+
+
+def test_cache_disabled(cs_server):
+    cs_server.create("o", "t", {})
+    fs = CSFileSystem("o", "t", host=cs_server.url, cache_max_size=0)
+    fs.cat("1/owner")
+    fs.cat("1/title")
+    assert len(cs_server.requests) == 2
+    assert len(fs.cache) == 0
+
+
+def test_tree(cs_server):
+    adjustment = {"policy": {"STD": [{"value": 0}]}, "behavior": {}}
+    cs_server.create("o", "t", {"adjustment": adjustment})
+    fs = CSFileSystem("o", "t", host=cs_server.url)
+    assert fs.ls("1", detail=False) == ["1/inputs", "1/outputs", "1/owner", "1/title"]
+    assert fs.isdir("1/inputs")
+    assert fs.ls("1/inputs/adjustment", detail=False) == [
+        "1/inputs/adjustment/policy",
+        "1/inputs/adjustment/behavior",
+    ]
+    info = fs.info("1/inputs/adjustment/policy")
+    assert info["type"] == "file"
+    assert info["size"] == len(fs.cat_file("1/inputs/adjustment/policy"))
+    policy = fs.cat_file("1/inputs/adjustment/policy")
+    assert json.loads(policy) == adjustment["policy"]
+    assert fs.cat_file("1/inputs/adjustment/policy", start=2, end=5) == policy[2:5]
+    assert fs.exists("1/inputs/meta_parameters")
+    assert not fs.exists("1/inputs/adjustment/nope")
+    assert not fs.exists("1/nope")
+
+    assert fs.glob("1/outputs/*") == ["1/outputs/Message.md", "1/outputs/Table.csv"]
+    assert json.loads(fs.cat("1/outputs")) == cs_server.outputs
+    files = fs.find("1")
+    assert "1/inputs/adjustment/behavior" in files
+    assert "1/owner" in files
+    # The whole tree comes from the inputs and the detail of the simulation.
+    assert cs_server.requests == [
+        ("GET", "/o/t/api/v1/1/edit/"),
+        ("GET", "/o/t/api/v1/1/"),
+    ]
+
+    opened = fsspec.open_files("cs://o:t@1/outputs/*", host=cs_server.url)
+    assert [of.path for of in opened] == [
+        "1/outputs/Message.md",
+        "1/outputs/Table.csv",
+    ]
+
+
+def test_output_files(cs_server):
+    pd = pytest.importorskip("pandas")
+    cs_server.create("o", "t", {"adjustment": {}})
+    fs = CSFileSystem("o", "t", host=cs_server.url, skip_instance_cache=True)
+    table = cs_server.outputs[0]["data"].encode()
+    assert fs.cat_file("1/outputs/Table.csv") == table
+    assert fs.cat_file("1/outputs/Table.csv", start=3, end=9) == table[3:9]
+    info = fs.info("1/outputs/Table.csv")
+    assert info["size"] == len(table)
+    assert info["media_type"] == "CSV"
+    assert fs.cat_file("1/outputs/Message.md") == b"# hello"
+    with fs.open("1/outputs/Table.csv", block_size=4) as f:
+        assert f.read(5) == table[:5]
+        f.seek(2)
+        assert f.read() == table[2:]
+    with pytest.raises(FileNotFoundError):
+        fs.open("1/outputs/Table")
+
+    df = pd.read_csv(
+        "cs://o:t@1/outputs/Table.csv", storage_options={"host": cs_server.url}
+    )
+    assert df.to_csv(index=False).encode() == table
+
+
+def test_output_file_without_cache(cs_server):
+    cs_server.create("o", "t", {"adjustment": {}})
+    fs = CSFileSystem("o", "t", host=cs_server.url, cache_max_size=0)
+    table = cs_server.outputs[0]["data"].encode()
+    with fs.open("1/outputs/Table.csv") as f:
+        blocks = list(iter(lambda: f.read(2), b""))
+    assert b"".join(blocks) == table
+    # The document is downloaded once when the file is opened.
+    assert cs_server.requests == [("GET", "/o/t/api/v1/1/")]
+
+
+@pytest.mark.parametrize("codec", ["orjson", "json"])
+def test_read_fast_path(cs_server, monkeypatch, codec):
+    import requests
+
+    import cs_kit.filespec
+
+    if codec == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(cs_kit.filespec, "orjson", None)
+    adjustment = {"policy": {"STD": [{"value": 0}]}}
+    cs_server.create("o", "t", {"adjustment": adjustment})
+    fs = CSFileSystem("o", "t", host=cs_server.url, skip_instance_cache=True)
+    body = requests.get(f"{cs_server.url}/o/t/api/v1/1/edit/").content
+    # The whole document is passed through without decoding it.
+    assert fs.cat_file("1/inputs") == body
+    assert json.loads(fs.cat_file("1/inputs/adjustment")) == adjustment
+    assert fs.cat_file("1/owner") == b'{"owner":"o"}'
+    value = {"a": [1, 2.5, None], "é": "ü"}
+    assert cs_kit.filespec.dumps(value) == '{"a":[1,2.5,null],"é":"ü"}'.encode()
+
+
+def test_read_decodes_once(cs_server, monkeypatch):
+    import cs_kit.filespec
+
+    decoded = []
+    loads = cs_kit.filespec.loads
+    monkeypatch.setattr(
+        cs_kit.filespec, "loads", lambda body: decoded.append(body) or loads(body)
+    )
+    cs_server.create("o", "t", {"adjustment": {"policy": {}}})
+    fs = CSFileSystem("o", "t", host=cs_server.url, skip_instance_cache=True)
+    # The inputs are decoded to tell whether they are final, and that
+    # document is reused.
+    assert json.loads(fs.cat_file("1/inputs/adjustment")) == {"policy": {}}
+    assert len(decoded) == 1
+
+    decoded[:] = []
+    fs = CSFileSystem("o", "t", host=cs_server.url, cache_max_size=0)
+    fs.cat_file("1/inputs")
+    assert decoded == []
+
+
+def test_deprecated_arguments(cs_server):
+    adjustment = {"policy": {"STD": [{"value": 0}]}}
+    cs_server.create("o", "t", {"adjustment": adjustment})
+    with pytest.warns(DeprecationWarning):
+        fs = CSFileSystem(
+            "o", "t", 1, resource="inputs", field="adjustment", host=cs_server.url
+        )
+    with fs._open("") as f:
+        assert json.loads(f.read()) == adjustment
+    with fs._open("policy") as f:
+        assert json.loads(f.read()) == adjustment["policy"]
+    # Paths with a simulation ID are not affected.
+    assert json.loads(fs.cat_file("1/title")) == {"title": "t"}
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+
+import fsspec
+import pytest
+
+from cs_kit import ComputeStudio, HedgingPolicy, MetricsCollector
+import cs_kit.filespec  # noqa: F401 registers the cs:// protocol
+
+REMOTE = "/{owner}/{title}/api/v1/{model_pk}/remote/"
+
+
+def test_hedging_policy_delay():
+    policy = HedgingPolicy(quantile=0.9, initial_delay=2, min_samples=10)
+    assert policy.delay(REMOTE) == 2
+    for _ in range(9):
+        policy.observe(REMOTE, 0.02)
+    policy.observe(REMOTE, 7)
+    assert policy.delay(REMOTE) == 0.025
+    assert policy.applies("GET", REMOTE)
+    assert policy.applies("GET", "/{owner}/{title}/api/v1/{model_pk}/")
+    assert not policy.applies("PUT", "/{owner}/{title}/api/v1/{model_pk}/")
+    assert not policy.applies("GET", "/{owner}/{title}/api/v1/inputs/")
+    assert not policy.applies("POST", "/{owner}/{title}/api/v1/")
+
+
+def test_hedging_policy_call():
+    policy = HedgingPolicy(initial_delay=0.05)
+    discarded = []
+    released = threading.Event()
+
+    def send(hedge):
+        if not hedge:
+            released.wait(5)
+            return "primary"
+        return "hedge"
+
+    assert policy.call(REMOTE, send, discard=discarded.append) == (
+        "hedge",
+        True,
+        True,
+    )
+    released.set()
+    time.sleep(0.05)
+    assert discarded == ["primary"]
+    assert policy.call(REMOTE, lambda hedge: "fast") == ("fast", False, False)
+    policy.close()
+
+
+def test_hedging_policy_many_callers():
+    # Primaries do not wait for the hedge threads, so callers that outnumber
+    # them get their answers before the delay and never hedge.
+    policy = HedgingPolicy(initial_delay=0.2, max_workers=1)
+    sent = []
+
+    def send(hedge):
+        sent.append(hedge)
+        time.sleep(0.05)
+        return hedge
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(policy.call(REMOTE, send)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [(False, False, False)] * 8
+    assert sent == [False] * 8
+    policy.close()
+
+
+def test_hedging_policy_errors():
+    policy = HedgingPolicy(initial_delay=0.01)
+
+    def send(hedge):
+        if hedge:
+            raise ValueError("hedge failed")
+        time.sleep(0.1)
+        return "primary"
+
+    assert policy.call(REMOTE, send) == ("primary", True, False)
+
+    def fail(hedge):
+        time.sleep(0.05)
+        raise ValueError(hedge)
+
+    with pytest.raises(ValueError):
+        policy.call(REMOTE, fail)
+    policy.close()
+
+
+def test_client_hedging(cs_server):
+    metrics = MetricsCollector()
+    client = ComputeStudio(
+        "o",
+        "t",
+        api_token="x",
+        host=cs_server.url,
+        hooks=[metrics],
+        hedging=HedgingPolicy(initial_delay=0.1),
+    )
+    model_pk = client.create(wait=False).model_pk
+    cs_server.stall_next, cs_server.stall = 1, 3
+    start = time.monotonic()
+    assert client.detail(model_pk, wait=False)["model_pk"] == model_pk
+    assert time.monotonic() - start < 1
+    labels = ("GET", REMOTE)
+    assert metrics.hedges[labels] == 1
+    assert metrics.hedge_wins[labels] == 1
+    assert "cs_kit_hedges_total" in metrics.to_prometheus()
+    client.close()
+
+
+def test_filesystem_hedging(cs_server):
+    cs_server.create("o", "t", {"adjustment": {"section": {}}})
+    cs_server.stall_next, cs_server.stall = 1, 3
+    start = time.monotonic()
+    with fsspec.open(
+        "cs://o:t@1/inputs/adjustment",
+        "r",
+        host=cs_server.url,
+        hedging=HedgingPolicy(initial_delay=0.1),
+    ) as f:
+        assert json.loads(f.read()) == {"section": {}}
+    assert time.monotonic() - start < 1
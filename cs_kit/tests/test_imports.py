@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = (
+    "pandas",
+    "paramtools",
+    "marshmallow",
+    "numpy",
+    "cs_storage",
+    "fsspec",
+    "aiohttp",
+)
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def run_imports(imports):
+    root = Path(__file__).resolve().parents[2]
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(imports=imports)],
+        cwd=root,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(out)
+
+
+@pytest.mark.parametrize(
+    "imports,budget",
+    [
+        ("import cs_kit", 0.1),
+        ("from cs_kit import ComputeStudio, PollingPolicy, ResultCache", 0.5),
+        ("import cs_kit.cli", 0.5),
+    ],
+)
+def test_import_is_light(imports, budget):
+    result = run_imports(imports)
+    loaded = [name for name in HEAVY if name in result["modules"]]
+    assert loaded == []
+    assert result["elapsed"] < budget
+
+
+def test_lazy_attributes():
+    import cs_kit
+
+    assert "ComputeStudio" in dir(cs_kit)
+    assert cs_kit.ComputeStudio.__module__ == "cs_kit.api"
+    with pytest.raises(AttributeError):
+        cs_kit.NotAThing
+    for name in cs_kit.__all__:
+        assert getattr(cs_kit, name) is not None
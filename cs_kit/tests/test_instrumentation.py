@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from cs_kit import (
+    ComputeStudio,
+    MetricsCollector,
+    PollingPolicy,
+    RequestEvent,
+    StateChangeEvent,
+)
+from cs_kit.instrumentation import Histogram, url_template
+
+
+def test_url_template():
+    sim_url = "https://compute.studio/PSLmodels/Tax-Brain/api/v1/"
+    assert url_template(sim_url, sim_url + "12/remote/") == (
+        "/{owner}/{title}/api/v1/{model_pk}/remote/",
+        12,
+    )
+    assert url_template(sim_url, sim_url) == ("/{owner}/{title}/api/v1/", None)
+    assert url_template(sim_url, "https://example.com/") == (
+        "https://example.com/",
+        None,
+    )
+
+
+def test_histogram_quantile():
+    hist = Histogram((1, 2, 5))
+    assert hist.quantile(0.5) is None
+    for value in (0.5, 0.5, 1.5, 4, 10):
+        hist.observe(value)
+    assert hist.quantile(0.4) == 1
+    assert hist.quantile(0.6) == 2
+    assert hist.quantile(1) == float("inf")
+    assert hist.to_dict()["buckets"][-1] == (float("inf"), 5)
+
+
+def test_hooks(cs_server, monkeypatch):
+    monkeypatch.setattr(ComputeStudio, "host", cs_server.url)
+    events = []
+    metrics = MetricsCollector()
+    client = ComputeStudio(
+        "PSLmodels",
+        "Tax-Brain",
+        api_token="abc",
+        backoff_factor=0,
+        polling_policy=PollingPolicy.fixed(0.05),
+        hooks=[events.append, metrics],
+    )
+    cs_server.run_time = 0.2
+    sim = client.create()
+    cs_server.fail_next = 2
+    client.detail(sim["model_pk"])
+
+    requests = [event for event in events if isinstance(event, RequestEvent)]
+    assert requests[0].method == "POST"
+    assert requests[0].url == "/{owner}/{title}/api/v1/"
+    retried = [event for event in requests if event.attempt > 1]
+    assert [event.attempt for event in retried] == [3]
+    assert retried[0].model_pk == sim["model_pk"]
+    assert all(event.latency > 0 for event in requests)
+
+    changes = [
+        (event.stage, event.previous, event.status)
+        for event in events
+        if isinstance(event, StateChangeEvent)
+    ]
+    assert ("inputs", None, "SUCCESS") in changes
+    assert changes[-2:] == [
+        ("simulation", None, "PENDING"),
+        ("simulation", "PENDING", "SUCCESS"),
+    ]
+
+    data = metrics.to_dict()
+    remote = ("GET", "/{owner}/{title}/api/v1/{model_pk}/remote/")
+    assert data["retries_total"][remote] == 2
+    assert data["requests_total"][remote + (202,)] >= 1
+    assert data["polls_per_simulation"]["count"] == 1
+    assert data["state_changes_total"][("simulation", "SUCCESS")] == 1
+
+    text = metrics.to_prometheus()
+    assert "# TYPE cs_kit_request_duration_seconds histogram" in text
+    assert (
+        'cs_kit_retries_total{method="GET",'
+        'url="/{owner}/{title}/api/v1/{model_pk}/remote/"} 2'
+    ) in text
+    assert 'cs_kit_polls_per_simulation_bucket{le="+Inf"} 1' in text
+
+
+def test_documents_decoded_once(client, cs_server, monkeypatch):
+    import requests
+
+    decoded = []
+    json = requests.Response.json
+    monkeypatch.setattr(
+        requests.Response, "json", lambda self: decoded.append(self.url) or json(self)
+    )
+    model_pk = client.create(wait=False).model_pk
+    for hooks in ([], [MetricsCollector()]):
+        client.events.hooks = hooks
+        decoded[:] = []
+        client.inputs(model_pk)
+        client.detail(model_pk, include_outputs=True)
+        assert len(decoded) == 2
+
+
+def test_results_polls(client, cs_server):
+    metrics = MetricsCollector()
+    client.add_hook(metrics)
+    client.polling_policy = PollingPolicy.fixed(0.02)
+    cs_server.run_time = 0.2
+    model_pk = client.create(wait=False).model_pk
+    client.results(model_pk)
+    polls = metrics.to_dict()["polls_per_simulation"]
+    assert polls["count"] == 1
+    assert polls["sum"] > 2
+    # Finished simulations are not kept in the status table, and observing
+    # them again is not reported as a change.
+    assert client.events._statuses == {}
+    client.detail(model_pk)
+    assert metrics.to_dict()["polls_per_simulation"]["count"] == 1
+    assert metrics.state_changes[("simulation", "SUCCESS")] == 1
+
+
+def test_broken_hook_warns(client, cs_server):
+    def broken(event):
+        raise RuntimeError("oops")
+
+    client.add_hook(broken)
+    with pytest.warns(UserWarning, match="oops"):
+        sim = client.create()
+    assert sim["status"] == "SUCCESS"
+
+
+def test_async_hooks(cs_server, monkeypatch):
+    pytest.importorskip("aiohttp")
+    from cs_kit import AsyncComputeStudio
+
+    monkeypatch.setattr(AsyncComputeStudio, "host", cs_server.url)
+    metrics = MetricsCollector()
+    aclient = AsyncComputeStudio(
+        "PSLmodels", "Tax-Brain", api_token="abc", backoff_factor=0, hooks=[metrics]
+    )
+
+    async def run():
+        async with aclient:
+            sim = await aclient.create()
+            cs_server.fail_next = 1
+            await aclient.detail(sim["model_pk"])
+
+    asyncio.run(run())
+    data = metrics.to_dict()
+    remote = ("GET", "/{owner}/{title}/api/v1/{model_pk}/remote/")
+    assert data["retries_total"][remote] == 1
+    assert data["state_changes_total"][("simulation", "SUCCESS")] == 1
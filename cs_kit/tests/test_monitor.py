@@ -0,0 +1,70 @@
+from concurrent.futures import wait
+import threading
+import time
+
+import pytest
+
+from cs_kit import APIException, PollingPolicy, SimulationMonitor
+
+
+def test_monitor_many_simulations(client, cs_server):
+    cs_server.run_time = 0.3
+    sims = [client.create(wait=False) for _ in range(30)]
+    threads = threading.active_count()
+    done = []
+    with SimulationMonitor(
+        client, polling_policy=PollingPolicy.fixed(0.1), max_rate=1000
+    ) as monitor:
+        futures = [
+            monitor.watch(sim.model_pk, callback=lambda f: done.append(f.result()))
+            for sim in sims
+        ]
+        assert monitor.watch(sims[0].model_pk) is futures[0]
+        assert threading.active_count() == threads + 1
+        finished, _ = wait(futures, timeout=10)
+        assert len(finished) == 30
+        assert len(monitor) == 0
+    assert sorted(data["model_pk"] for data in done) == [s.model_pk for s in sims]
+    assert all(data["status"] == "SUCCESS" for data in done)
+
+
+def test_monitor_rate_limit(client, cs_server):
+    cs_server.run_time = 10
+    sims = [client.create(wait=False) for _ in range(5)]
+    cs_server.requests[:] = []
+    with SimulationMonitor(
+        client, polling_policy=PollingPolicy.fixed(0), max_rate=20
+    ) as monitor:
+        for sim in sims:
+            monitor.watch(sim.model_pk)
+        time.sleep(0.5)
+    # One request every 50ms.
+    assert 5 <= len(cs_server.requests) <= 12
+
+
+def test_monitor_errors_and_cancel(client, cs_server):
+    cs_server.run_time = 10
+    invalid = client.create(meta_parameters={"invalid": True}, wait=False)
+    slow = client.create(wait=False)
+    cancelled = client.create(wait=False)
+    monitor = SimulationMonitor(
+        client, polling_policy=PollingPolicy.fixed(0.05), timeout=0.2
+    )
+    with pytest.raises(APIException):
+        monitor.watch(invalid.model_pk).result(timeout=5)
+    with pytest.raises(TimeoutError):
+        monitor.watch(slow.model_pk).result(timeout=5)
+
+    future = monitor.watch(cancelled.model_pk)
+    assert future.cancel()
+    assert cancelled.model_pk not in monitor
+    monitor.close()
+    with pytest.raises(RuntimeError):
+        monitor.watch(slow.model_pk)
+
+
+def test_simulation_watch(client, cs_server):
+    client.polling_policy = PollingPolicy.fixed(0.05)
+    cs_server.run_time = 0.2
+    sim = client.create(wait=False)
+    assert sim.watch().result(timeout=5)["status"] == "SUCCESS"
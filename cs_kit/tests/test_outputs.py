@@ -0,0 +1,62 @@
+import warnings
+
+import pandas as pd
+import pytest
+
+from cs_kit import outputs as outputs_module
+from cs_kit.outputs import Outputs
+
+DOWNLOADABLE = [
+    {"title": "A", "media_type": "CSV", "filename": "a.csv", "data": "x,y\n1,2\n"},
+    {"title": "B", "media_type": "CSV", "filename": "b.csv", "data": "x,y\n3,4\n"},
+    {"title": "C", "media_type": "Markdown", "filename": "c.md", "data": "# hi"},
+]
+
+
+def test_outputs_are_decoded_lazily(monkeypatch):
+    calls = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(
+        outputs_module.pd,
+        "read_csv",
+        lambda *args, **kwargs: calls.append(1) or read_csv(*args, **kwargs),
+    )
+    outputs = Outputs(DOWNLOADABLE)
+    assert list(outputs) == ["A", "B", "C"]
+    assert calls == []
+
+    assert outputs["A"]["y"].tolist() == [2]
+    assert outputs["A"] is outputs["A"]
+    assert outputs["C"] == "# hi"
+    assert len(calls) == 1
+
+    outputs.load(max_workers=2)
+    assert len(calls) == 2
+    assert outputs.raw("B")["filename"] == "b.csv"
+
+
+def test_outputs_dtype_and_engine():
+    outputs = Outputs(DOWNLOADABLE, dtype={"x": "float64"})
+    assert str(outputs["A"]["x"].dtype) == "float64"
+
+    pytest.importorskip("pyarrow")
+    outputs = Outputs(DOWNLOADABLE, engine="pyarrow").load()
+    assert outputs["B"]["x"].tolist() == [3]
+
+
+def test_outputs_warn_without_pandas(monkeypatch):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        Outputs(DOWNLOADABLE)
+
+    monkeypatch.setattr(outputs_module, "pd", None)
+    with pytest.warns(UserWarning, match="Install pandas"):
+        outputs = Outputs(DOWNLOADABLE)
+    assert outputs["A"] == "x,y\n1,2\n"
+
+
+def test_client_results(client):
+    sim = client.create()
+    outputs = client.results(sim["model_pk"], eager=True)
+    assert isinstance(outputs, Outputs)
+    assert outputs["Table"]["b"].tolist() == [2, 4]
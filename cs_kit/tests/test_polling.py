@@ -0,0 +1,65 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+import time
+
+import pytest
+
+from cs_kit import PollingPolicy
+from cs_kit.polling import parse_retry_after
+
+
+def test_polling_policy_delay():
+    policy = PollingPolicy(initial=1, factor=2, max_interval=5, jitter=0)
+    assert [policy.delay(i) for i in range(5)] == [1, 2, 4, 5, 5]
+    assert policy.delay(3, retry_after=0.5) == 0.5
+
+    policy = PollingPolicy(initial=1, factor=2, max_interval=5, jitter=0.5)
+    for i in range(10):
+        assert 0.5 <= policy.delay(0) <= 1.5
+
+    assert PollingPolicy.fixed(3).delay(10) == 3
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("not a date") is None
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+
+
+def test_detail_backs_off(client, cs_server):
+    cs_server.run_time = 1
+    sim = client.create()
+    cs_server.requests[:] = []
+    policy = PollingPolicy(initial=0.05, factor=2, max_interval=0.4)
+    assert client.detail(sim["model_pk"], polling_policy=policy)["status"] == "SUCCESS"
+    # 0.05 + 0.1 + 0.2 + 0.4 + 0.4 ... instead of a tight loop.
+    assert len(cs_server.requests) < 10
+
+
+def test_detail_respects_retry_after(client, cs_server):
+    cs_server.run_time = 0.5
+    cs_server.retry_after = "0.1"
+    sim = client.create()
+    start = time.time()
+    policy = PollingPolicy(initial=60)
+    assert client.detail(sim["model_pk"], polling_policy=policy)["status"] == "SUCCESS"
+    assert time.time() - start < 5
+
+
+def test_detail_timeout(client, cs_server):
+    cs_server.run_time = 5
+    sim = client.create()
+    start = time.time()
+    with pytest.raises(TimeoutError):
+        client.detail(sim["model_pk"], polling_interval=10, timeout=0.2)
+    assert time.time() - start < 2
+
+
+def test_create_polls_inputs_with_policy(client, cs_server):
+    cs_server.inputs_time = 0.5
+    client.polling_policy = PollingPolicy(initial=0.05, factor=2, max_interval=0.2)
+    sim = client.create()
+    assert sim["status"] == "SUCCESS"
+    assert len(cs_server.requests) < 10
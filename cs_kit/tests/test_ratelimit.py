@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import time
+
+import pytest
+
+from cs_kit import ComputeStudio, FileTokenBucket, RateLimiter, TokenBucket
+from cs_kit.ratelimit import endpoint_class
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=50, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+    for _ in range(10):
+        bucket.acquire()
+    # 10 requests past the burst at 50/s.
+    assert time.monotonic() - start >= 0.18
+
+
+def test_token_bucket_threads():
+    bucket = TokenBucket(rate=100, burst=1)
+    start = time.monotonic()
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: bucket.acquire(), range(40)))
+    assert time.monotonic() - start >= 0.38
+
+
+def test_token_bucket_reserve_queues():
+    bucket = TokenBucket(rate=10, burst=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_validation():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def _take_tokens(path, n):
+    bucket = FileTokenBucket(path, rate=100, burst=1)
+    for _ in range(n):
+        bucket.acquire()
+
+
+def test_file_token_bucket_processes(tmp_path):
+    path = tmp_path / "bucket"
+    ctx = multiprocessing.get_context("fork")
+    start = time.monotonic()
+    procs = [ctx.Process(target=_take_tokens, args=(path, 10)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert all(proc.exitcode == 0 for proc in procs)
+    # 40 tokens shared at 100/s, even though each process alone needs 0.1s.
+    assert time.monotonic() - start >= 0.38
+
+
+def test_file_token_bucket_state_persists(tmp_path):
+    path = tmp_path / "bucket"
+    first = FileTokenBucket(path, rate=10, burst=2)
+    assert first.reserve() == 0
+    assert first.reserve() == 0
+    first.close()
+    second = FileTokenBucket(path, rate=10, burst=2)
+    assert second.reserve() == pytest.approx(0.1, abs=0.02)
+    second.close()
+
+
+def test_endpoint_class():
+    assert endpoint_class("POST", "/o/t/api/v1/") == "submit"
+    assert endpoint_class("GET", "/o/t/api/v1/{model_pk}/edit/") == "poll"
+    assert endpoint_class("GET", "/o/t/api/v1/{model_pk}/remote/") == "poll"
+    assert endpoint_class("GET", "/o/t/api/v1/{model_pk}/") == "download"
+    assert endpoint_class("PUT", "/o/t/api/v1/{model_pk}/") == "other"
+    assert endpoint_class("GET", "/o/t/api/v1/inputs/") == "other"
+
+
+def test_rate_limiter_buckets():
+    submit, default = TokenBucket(1), TokenBucket(1)
+    limiter = RateLimiter(default, submit=submit)
+    assert limiter.bucket("POST", "/o/t/api/v1/") is submit
+    assert limiter.bucket("GET", "/o/t/api/v1/{model_pk}/remote/") is default
+    assert RateLimiter(poll=submit).bucket("POST", "/o/t/api/v1/") is None
+    assert RateLimiter().reserve("POST", "/o/t/api/v1/") == 0
+
+
+def test_client_rate_limit(cs_server):
+    cs_server.run_time = 10
+    limiter = RateLimiter(poll=TokenBucket(rate=20, burst=1))
+    client = ComputeStudio(
+        "o", "t", api_token="x", host=cs_server.url, rate_limiter=limiter
+    )
+    sims = [client.create(wait=False) for _ in range(3)]
+    cs_server.requests[:] = []
+    start = time.monotonic()
+    with ThreadPoolExecutor(3) as pool:
+        for _ in range(3):
+            list(pool.map(lambda sim: client.inputs(sim.model_pk), sims))
+    elapsed = time.monotonic() - start
+    assert len(cs_server.requests) == 9
+    # Submissions have their own quota; the 9 polls share 20/s.
+    assert elapsed >= 0.38
@@ -0,0 +1,97 @@
+import base64
+import json
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from cs_kit.streaming import iter_downloadable
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256))
+
+
+def test_iter_downloadable(tmp_path):
+    doc = {
+        "title": "sim",
+        "outputs": {
+            "renderable": [{"data": '<div>[{\\"}]'}],
+            "downloadable": [
+                {"data": 'a,b\n"x",é\n', "title": "T", "media_type": "CSV"},
+                {"title": "M", "filename": "m.md", "data": "\U0001f600"},
+                {"media_type": "PNG", "data": base64.b64encode(PNG).decode()},
+                # The media type can also come after the data.
+                {"data": base64.b64encode(PNG[:-1]).decode(), "media_type": "PNG"},
+            ],
+        },
+        "status": "SUCCESS",
+    }
+    raw = json.dumps(doc).encode("utf-8")
+    chunks = [raw[i : i + 3] for i in range(0, len(raw), 3)]
+    outputs = list(iter_downloadable(chunks, tmp_path))
+    assert [output.get("title") for output in outputs] == ["T", "M", None, None]
+    assert outputs[0]["path"].read_text("utf-8") == 'a,b\n"x",é\n'
+    assert outputs[1]["path"].read_text("utf-8") == "\U0001f600"
+    assert outputs[2]["path"].read_bytes() == PNG
+    assert outputs[3]["path"].read_bytes() == PNG[:-1]
+    assert len(list(tmp_path.iterdir())) == 4
+
+
+def test_iter_downloadable_bounded_memory(tmp_path):
+    # JSON encoded CSV rows, without the surrounding quotes.
+    rows = json.dumps('name,"quoted",1.5\n' * 2000)[1:-1].encode("utf-8")
+    nchunks = 400  # ~14 MB of output data
+
+    def chunks():
+        yield b'{"outputs": {"downloadable": [{"title": "big", "data": "'
+        for _ in range(nchunks):
+            yield rows
+        yield b'"}]}}'
+
+    tracemalloc.start()
+    (output,) = iter_downloadable(chunks(), tmp_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert output["path"].stat().st_size > 10 * 2**20
+    # Peak memory depends on the chunk size, not on the size of the output.
+    assert peak < 4 * 2**20
+
+
+def test_download(client, cs_server, tmp_path):
+    cs_server.outputs = cs_server.outputs + [
+        {
+            "title": "Plot",
+            "media_type": "PNG",
+            "filename": "plot.png",
+            "data": base64.b64encode(PNG).decode(),
+        }
+    ]
+    sim = client.create()
+    paths = client.download(sim["model_pk"], tmp_path / "out", chunk_size=4)
+    assert paths == {
+        "Table": tmp_path / "out" / "table.csv",
+        "Message": tmp_path / "out" / "message.md",
+        "Plot": tmp_path / "out" / "plot.png",
+    }
+    assert paths["Table"].read_text() == "a,b\n1,2\n3,4\n"
+    assert paths["Plot"].read_bytes() == PNG
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "message.md",
+        "plot.png",
+        "table.csv",
+    ]
+
+    path = tmp_path / "message.txt"
+    assert client.download(sim["model_pk"], path, title="Message") == {"Message": path}
+    assert path.read_text() == "# hello"
+
+    with pytest.raises(KeyError):
+        client.download(sim["model_pk"], tmp_path / "x.csv", title="missing")
+
+
+def test_download_parquet(client, cs_server, tmp_path):
+    pytest.importorskip("pyarrow")
+    sim = client.create()
+    paths = client.download(sim["model_pk"], tmp_path, format="parquet")
+    assert paths["Table"].name == "table.parquet"
+    assert pd.read_parquet(paths["Table"])["b"].tolist() == [2, 4]
+    assert paths["Message"].read_text() == "# hello"
@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from cs_kit import JobJournal, PollingPolicy, SubmissionIndex
+from cs_kit.submissions import submission_key
+
+
+def test_submission_key():
+    key = submission_key("h", "o", "t", {"a": {"x": 1, "y": 2}}, {"year": 1})
+    assert key == submission_key("h", "o", "t", {"a": {"y": 2, "x": 1}}, {"year": 1})
+    assert key != submission_key("h", "o", "t", {"a": {"x": 1, "y": 2}}, {"year": 2})
+    assert key != submission_key(
+        "h", "o", "t", {"a": {"x": 1, "y": 2}}, {"year": 1}, app_version="2.0"
+    )
+    assert submission_key("h", "o", "t", None, None) == submission_key(
+        "h", "o", "t", {}, {}
+    )
+
+
+def test_submission_index(tmp_path):
+    index = SubmissionIndex(tmp_path / "index.sqlite3")
+    assert index.get("abc") is None
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda i: index.add(f"key{i}", i), range(20)))
+    assert len(index) == 20
+    assert index.get("key3") == 3
+    index.remove("key3")
+    assert index.get("key3") is None
+    index.close()
+
+    # Entries persist across processes and instances.
+    assert SubmissionIndex(tmp_path / "index.sqlite3").get("key4") == 4
+
+
+def test_create_dedupes(client, cs_server, tmp_path):
+    client.submission_index = SubmissionIndex(tmp_path / "index.sqlite3")
+    adjustment = {"section": {"param": [{"value": 2}]}}
+    first = client.create(adjustment)
+    second = client.create(adjustment, meta_parameters={})
+    assert first["model_pk"] == second["model_pk"]
+    assert len(cs_server.sims) == 1
+
+    third = client.create(adjustment, wait=False)
+    assert third.model_pk == first["model_pk"]
+
+    client.create(adjustment, dedupe=False)
+    client.app_version = "2.0"
+    client.create(adjustment)
+    assert len(cs_server.sims) == 3
+
+    # Deleted simulations are run again.
+    del cs_server.sims[first["model_pk"]]
+    client.app_version = None
+    assert client.create(adjustment)["model_pk"] == 4
+
+    # Failed simulations are run again, too.
+    cs_server.sims[4]["status"] = "WORKER_FAILURE"
+    assert client.create(adjustment)["model_pk"] == 5
+    assert client.create(adjustment)["model_pk"] == 5
+
+
+def test_job_journal(tmp_path):
+    journal = JobJournal(tmp_path / "journal.sqlite3")
+    assert journal.get("a") is None
+    journal.record("a", "SUBMITTING")
+    journal.record("a", "VALIDATING", model_pk=1)
+    journal.record("a", "ERROR", error="TimeoutError()")
+    entry = journal.get("a")
+    assert (entry.model_pk, entry.status, entry.error) == (1, "ERROR", "TimeoutError()")
+    assert entry.updated >= entry.created
+    journal.record("b", "DONE", model_pk=2)
+    assert [e.key for e in journal.entries()] == ["a", "b"]
+    assert [e.key for e in journal.entries("DONE")] == ["b"]
+    journal.close()
+    assert len(JobJournal(tmp_path / "journal.sqlite3")) == 2
+
+
+def test_create_many_resumes_from_journal(client, cs_server, tmp_path):
+    client.journal = JobJournal(tmp_path / "journal.sqlite3")
+    client.polling_policy = PollingPolicy.fixed(0.05)
+    cs_server.run_time = 0.3
+    items = [({"section": {"param": [{"value": i}]}}, {}) for i in range(4)]
+
+    # The orchestrator dies after the first result.
+    batch = client.create_many(items, max_workers=4, results=True)
+    first = next(batch)
+    batch.close()
+    assert len(cs_server.sims) == 4
+    statuses = [entry.status for entry in client.journal.entries()]
+    assert statuses.count("DONE") == 1
+
+    # An item whose submission may not have reached the server is resubmitted.
+    extra = ({"section": {"param": [{"value": 3}]}}, {"year": 2020})
+    client.journal.record(client._submission_key(*extra), "SUBMITTING")
+
+    cs_server.requests[:] = []
+    results = list(client.create_many(items + [extra], max_workers=4, results=True))
+    assert len(cs_server.sims) == 5
+    assert not [path for method, path in cs_server.requests if method == "POST"][1:]
+    assert sorted(res.model_pk for res in results) == [1, 2, 3, 4, 5]
+    assert all(res.error is None for res in results)
+    assert first.model_pk in [res.model_pk for res in results]
+    assert {entry.status for entry in client.journal.entries()} == {"DONE"}
@@ -0,0 +1,58 @@
+import itertools
+
+import pytest
+
+from cs_kit import PollingPolicy
+from cs_kit.sweep import build_adjustments, find_param, iter_grid
+
+
+def test_find_param():
+    model_parameters = {"a": {"x": {}, "y": {}}, "b": {"x": {}}}
+    assert find_param(model_parameters, "y") == ("a", "y")
+    assert find_param(model_parameters, "b.x") == ("b", "x")
+    with pytest.raises(KeyError):
+        find_param(model_parameters, "x")
+    with pytest.raises(KeyError):
+        find_param(model_parameters, "b.y")
+
+
+def test_iter_grid_and_dedup():
+    values = {("a", "x"): [1, 2, 3], ("b", "y"): ["u", "v"]}
+    full = list(iter_grid(values))
+    assert full == list(itertools.product([1, 2, 3], ["u", "v"]))
+
+    sample = list(iter_grid(values, sample=4, seed=1))
+    assert len(set(sample)) == 4
+    assert set(sample) <= set(full)
+    assert sample == list(iter_grid(values, sample=4, seed=1))
+
+    adjustments = build_adjustments({("a", "x"): [1, 1, 2]}, [(1,), (1,), (2,)])
+    assert adjustments == [
+        ((1,), {"a": {"x": [{"value": 1}]}}),
+        ((2,), {"a": {"x": [{"value": 2}]}}),
+    ]
+
+
+def test_sweep(client, cs_server):
+    client.polling_policy = PollingPolicy(initial=0.05, max_interval=0.1)
+    df = client.sweep(["param"])
+    assert df.index.name == "param"
+    assert df.index.tolist() == [0, 0, 1, 1, 2, 2, 3, 3]
+    assert df.columns.tolist() == ["output", "a", "b"]
+    assert set(df["output"]) == {"Table"}
+    assert len(cs_server.sims) == 4
+    assert sorted(
+        sim["adjustment"]["section"]["param"][0]["value"]
+        for sim in cs_server.sims.values()
+    ) == [0, 1, 2, 3]
+
+
+def test_sweep_values_and_sample(client, cs_server):
+    client.polling_policy = PollingPolicy(initial=0.05, max_interval=0.1)
+    df = client.sweep({"section.param": [2, 2, 3]}, outputs=["Table"])
+    assert sorted(set(df.index)) == [2, 3]
+    assert len(cs_server.sims) == 2
+
+    df = client.sweep(["section.param"], sample=2, seed=0)
+    assert len(set(df.index)) == 2
+    assert len(cs_server.sims) == 4
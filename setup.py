@@ -21,7 +21,11 @@ setuptools.setup(
             "csk-init=cs_kit.cli:init",
             "csk-token=cs_kit.cli:cs_token",
             "csk=cs_kit.cli:cli",
-        ]
+        ],
+        "fsspec.specs": [
+            "cs=cs_kit.filespec:CSFileSystem",
+            "cs-async=cs_kit.async_filespec:AsyncCSFileSystem",
+        ],
     },
     classifiers=[
         "Programming Language :: Python :: 3",